@@ -0,0 +1,221 @@
+"""
+Shared CSS/JS bundle and precompressed siblings for the generated site.
+
+The stylesheets and scripts in ``assets/`` are minified and written to ``static_site/assets/`` under a
+content-hashed name (``recipe.3f2a9c1d.css``), so browsers can cache them indefinitely and share them
+between pages; templates link them through the ``assets`` global, e.g. ``{{ assets['recipe.css'] }}``.
+
+``precompress`` writes a ``.gz`` (and, when the optional ``brotli`` package is installed, a ``.br``)
+next to every compressible file of the site, for hosts that serve precompressed files.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Callable
+
+try:
+    import brotli
+except ImportError:  # optional: only .gz siblings are written without it
+    brotli = None
+
+ASSET_SOURCE_DIR = "assets"
+ASSET_URL_DIR = "assets"
+COMPRESSIBLE_SUFFIXES = (".html", ".css", ".js", ".svg", ".json")
+COMPRESSED_SUFFIXES = (".gz", ".br")  # both three characters long, see precompress
+
+
+def minify_css(text: str) -> str:
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    text = re.sub(r"\s+", " ", text)
+    text = re.sub(r"\s*([{};,])\s*", r"\1", text)
+    return text.replace(";}", "}").replace(": ", ":").strip()
+
+
+# After these (or at the start), a ``/`` opens a regular expression literal rather than dividing.
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_KEYWORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "instanceof", "yield", "await"}
+
+
+def _skip_quoted(text: str, i: int, end: str) -> int:
+    """The index just past the ``end`` character closing the string or regex literal whose body starts at ``i``."""
+    in_class = False  # inside a regex [...] class, where ``/`` does not close it
+    while i < len(text):
+        c = text[i]
+        if c == "\\":
+            i += 2
+            continue
+        if c == "\n" and end != "`":
+            break  # unterminated: leave the rest of the line as it is
+        if end == "/" and c in "[]":
+            in_class = c == "["
+        elif c == end and not in_class:
+            return i + 1
+        i += 1
+    return i
+
+
+def _skip_template(text: str, i: int) -> tuple[int, bool]:
+    """Scan the template literal text starting at ``i``: the index past its closing backtick or ``${``, and which it was."""
+    while i < len(text):
+        if text[i] == "\\":
+            i += 2
+        elif text[i] == "`":
+            return i + 1, False
+        elif text.startswith("${", i):
+            return i + 2, True
+        else:
+            i += 1
+    return i, False
+
+
+def minify_js(text: str) -> str:
+    """
+    Drop indentation, trailing whitespace, blank lines and comments; line breaks are kept so no
+    statement changes meaning. The text is tokenized far enough to leave string, template and
+    regular expression literals exactly as written, so a ``//`` or an indented line inside one survives.
+    """
+    out: list[str] = []
+    pending = ""  # whitespace inside a line, written only if more code follows on that line
+    substitutions: list[int] = []  # brace depth inside each enclosing ``${ }`` of a template literal
+    previous = ""  # the last code token written, to tell a regex literal from a division
+    i, n = 0, len(text)
+
+    def emit(token: str) -> None:
+        nonlocal pending, previous
+        if pending and out and out[-1] != "\n":
+            out.append(pending)
+        pending = ""
+        out.append(token)
+        previous = token
+
+    def newline() -> None:
+        nonlocal pending
+        pending = ""
+        if out and out[-1] != "\n":
+            out.append("\n")
+
+    while i < n:
+        c = text[i]
+        if c in " \t\r\n":
+            j = i
+            while j < n and text[j] in " \t\r\n":
+                j += 1
+            if "\n" in text[i:j]:
+                newline()
+            else:
+                pending = text[i:j]
+            i = j
+        elif text.startswith("//", i):
+            while i < n and text[i] != "\n":
+                i += 1
+        elif text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            end = n if end < 0 else end + 2
+            if "\n" in text[i:end]:
+                newline()
+            else:
+                pending = pending or " "
+            i = end
+        elif c in "'\"":
+            end = _skip_quoted(text, i + 1, c)
+            emit(text[i:end])
+            i = end
+        elif c == "/" and (not previous or previous[-1] in REGEX_PRECEDERS or previous in REGEX_KEYWORDS):
+            end = _skip_quoted(text, i + 1, "/")
+            emit(text[i:end])
+            i = end
+        elif c == "`" or (c == "}" and substitutions and substitutions[-1] == 0):
+            if c == "}":
+                substitutions.pop()
+            end, opened = _skip_template(text, i + 1)
+            emit(text[i:end])
+            if opened:
+                substitutions.append(0)
+            i = end
+        elif c.isalnum() or c in "_$":
+            j = i
+            while j < n and (text[j].isalnum() or text[j] in "_$"):
+                j += 1
+            emit(text[i:j])
+            i = j
+        else:
+            if substitutions and c in "{}":
+                substitutions[-1] += 1 if c == "{" else -1
+            emit(c)
+            i += 1
+    newline()
+    return "".join(out)
+
+
+MINIFIERS = {".css": minify_css, ".js": minify_js}
+
+
+def build_assets(source_dir: str = ASSET_SOURCE_DIR) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Minify and fingerprint every asset in ``source_dir``. Returns the URL of each asset by source
+    name (for the ``assets`` template global) and the content of each output file by path relative
+    to the site root.
+    """
+    urls, files = {}, {}
+    for path in sorted(Path(source_dir).iterdir()):
+        minify = MINIFIERS.get(path.suffix)
+        if minify is None:
+            continue
+        content = minify(path.read_text(encoding="utf-8"))
+        fingerprint = hashlib.sha256(content.encode()).hexdigest()[:8]
+        relpath = f"{ASSET_URL_DIR}/{path.stem}.{fingerprint}{path.suffix}"
+        urls[path.name] = f"/{relpath}"
+        files[relpath] = content
+    return urls, files
+
+
+Compressor = Callable[[bytes], bytes]
+
+
+def _compressors() -> dict[str, Compressor]:
+    compressors: dict[str, Compressor] = {".gz": lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressors[".br"] = lambda data: brotli.compress(data, quality=11)
+    return compressors
+
+
+def precompress(directory: str) -> tuple[int, int]:
+    """
+    Bring the compressed siblings in ``directory`` up to date: (re)write those older than their file
+    and remove those whose file is gone. A sibling that would not be smaller than the file is not
+    kept. Returns the number of siblings written and removed.
+    """
+    compressors = _compressors()
+    written = removed = 0
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            path = os.path.join(root, filename)
+            if filename.endswith(COMPRESSED_SUFFIXES):
+                if not os.path.exists(path[:-3]):
+                    os.remove(path)
+                    removed += 1
+                continue
+            if not filename.endswith(COMPRESSIBLE_SUFFIXES):
+                continue
+            mtime = os.stat(path).st_mtime_ns
+            data = None
+            for suffix, compress in compressors.items():
+                sibling = path + suffix
+                if os.path.exists(sibling) and os.stat(sibling).st_mtime_ns >= mtime:
+                    continue
+                if data is None:
+                    with open(path, "rb") as f:
+                        data = f.read()
+                compressed = compress(data)
+                if len(compressed) >= len(data):
+                    if os.path.exists(sibling):
+                        os.remove(sibling)
+                        removed += 1
+                    continue
+                with open(sibling, "wb") as f:
+                    f.write(compressed)
+                written += 1
+    return written, removed
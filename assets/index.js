@@ -0,0 +1,119 @@
+function toggleAccordion(element) {
+    let content = element.nextElementSibling;
+    content.style.display = (content.style.display === "block") ? "none" : "block";
+}
+// Search runs against search_index.json (see search_index.py), fetched on first use. Only the
+// links whose visibility changes are touched, so typing stays fast on large catalogues. When the
+// index only links to category pages, links for matching recipes are created as they are found.
+const MACRO_ALIASES = {
+    protein: 'protein_100g', eiwit: 'protein_100g', calories: 'calories_100g', kcal: 'calories_100g',
+    fat: 'fat_100g', vet: 'fat_100g', carbs: 'carbs_100g', koolhydraten: 'carbs_100g'
+};
+const OPERATORS = {
+    '<=': (a, b) => a <= b, '>=': (a, b) => a >= b, '<': (a, b) => a < b, '>': (a, b) => a > b, '=': (a, b) => a === b
+};
+const MACRO_FILTER = /^([a-z]+)(<=|>=|<|>|=)(\d+(?:[.,]\d+)?)$/;
+let searchIndex = null;
+let linksByDoc = null;
+
+function normalize(text) {
+    return text.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+}
+function tokenize(text) {
+    return normalize(text).split(/[^\p{L}\p{N}]+/u).filter(Boolean);
+}
+function loadSearchIndex() {
+    if (!searchIndex) {
+        searchIndex = fetch('search_index.json').then(response => response.json()).then(index => {
+            const links = {};
+            document.querySelectorAll('.recipe-link').forEach(link => { links[link.getAttribute('href')] = link; });
+            linksByDoc = index.docs.map(doc => links[doc[0]]);
+            return index;
+        });
+    }
+    return searchIndex;
+}
+function createLink(doc) {
+    const link = document.createElement('a');
+    link.className = 'recipe-link';
+    link.href = doc[0];
+    link.textContent = doc[1];
+    link.dataset.found = 'true';
+    document.querySelector(`.accordion-item[data-category="${CSS.escape(doc[2])}"] .accordion-content`).appendChild(link);
+    return link;
+}
+function matchingDocs(index, term) {
+    let candidates = null;
+    if (term.length >= 3) {
+        for (let i = 0; i + 3 <= term.length; i++) {
+            const tokenIds = new Set(index.trigrams[term.slice(i, i + 3)] || []);
+            candidates = candidates === null ? tokenIds : new Set([...candidates].filter(id => tokenIds.has(id)));
+            if (candidates.size === 0) return candidates;
+        }
+    } else {
+        candidates = index.tokens.keys();
+    }
+    const docs = new Set();
+    for (const id of candidates) {
+        if (index.tokens[id].includes(term)) index.postings[id].forEach(doc => docs.add(doc));
+    }
+    return docs;
+}
+function search(index, query) {
+    let result = new Set(index.docs.keys());
+    for (const term of normalize(query).split(/\s+/).filter(Boolean)) {
+        const match = term.match(MACRO_FILTER);
+        if (match && MACRO_ALIASES[match[1]]) {
+            const column = index.fields.indexOf(MACRO_ALIASES[match[1]]);
+            const compare = OPERATORS[match[2]], bound = parseFloat(match[3].replace(',', '.'));
+            result = new Set([...result].filter(doc => compare(index.docs[doc][column], bound)));
+            continue;
+        }
+        for (const word of tokenize(term)) {
+            const docs = matchingDocs(index, word);
+            result = new Set([...result].filter(doc => docs.has(doc)));
+        }
+    }
+    return result;
+}
+document.getElementById('searchBar').addEventListener('input', async function() {
+    const query = this.value;
+    const index = await loadSearchIndex();
+    if (query !== this.value) return;  // a newer keystroke will handle it
+    const docs = query.trim() === '' ? null : search(index, query);
+
+    linksByDoc.forEach((link, doc) => {
+        const visible = docs === null ? Boolean(link) && !link.dataset.found : docs.has(doc);
+        if (!link) {
+            if (!visible) return;
+            link = linksByDoc[doc] = createLink(index.docs[doc]);
+        }
+        const wasVisible = link.style.display !== 'none';
+        if (visible !== wasVisible) link.style.display = visible ? 'block' : 'none';
+    });
+    document.querySelectorAll('.page-link').forEach(link => { link.style.display = docs === null ? 'block' : 'none'; });
+
+    const matchesPerCategory = {};
+    if (docs !== null) docs.forEach(doc => {
+        const category = index.docs[doc][2];
+        matchesPerCategory[category] = (matchesPerCategory[category] || 0) + 1;
+    });
+    document.querySelectorAll('.accordion-item').forEach(item => {
+        const content = item.querySelector('.accordion-content');
+        const category = item.dataset.category;
+
+        if (docs === null) {
+            // ✅ Reset: collapse everything
+            item.style.display = "block";
+            content.style.display = "none";
+        } else if (matchesPerCategory[category]) {
+            // ✅ Keep expanded if there’s a match
+            item.style.display = "block";
+            content.style.display = "block";
+        } else {
+            // ✅ Hide categories without matches
+            item.style.display = "none";
+            content.style.display = "none";
+        }
+    });
+});
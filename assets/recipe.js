@@ -0,0 +1,155 @@
+// Servings scaling and variant switching work from the structured payload in #recipe-data (see
+// _recipe_payload in generate_static_website.py): quantities are scaled as numbers and formatted the
+// same way the generator formats them, so spoon measures switch between theelepel and eetlepel.
+// Pages of other site flavours name the spoons and word the servings warning through data-*
+// attributes (data-tablespoon and data-teaspoon on #recipe-data, data-warning on .servings-control).
+let servings = 1;
+const MAX_SERVINGS = 100;
+let warningTimeout = null;
+let recipeData = null;
+let activeVariant = null;
+
+function loadRecipeData() {
+    if (!recipeData) {
+        recipeData = JSON.parse(document.getElementById('recipe-data').textContent);
+        activeVariant = Object.keys(recipeData.variants)[0];
+    }
+    return recipeData;
+}
+
+function formatNumber(value) {
+    // Two decimals at most, ties to even like Python's round()
+    const scaled = value * 100;
+    let rounded = Math.round(scaled);
+    if (Math.abs(scaled % 1) === 0.5 && rounded % 2 !== 0) rounded -= 1;
+    return String(rounded / 100);
+}
+
+function slugify(name) {
+    // Mirrors slugify in generate_static_website.py
+    return name.toLowerCase().replace(/ /g, '-').replace(/[^a-z0-9-]/g, '');
+}
+
+function formatQuantity(row, quantity) {
+    // Mirrors display_ingredient
+    const [name, unit, , weightPerUnit] = row;
+    if (unit === 'el_tl') {
+        // Mirrors _grams_to_spoon
+        const labels = document.getElementById('recipe-data').dataset;
+        const spoons = quantity >= 8
+            ? formatNumber(quantity / 8) + ' ' + (labels.tablespoon || 'eetlepel(s)')
+            : formatNumber(quantity / 2) + ' ' + (labels.teaspoon || 'theelepel(s)');
+        return spoons + ' ' + name;
+    }
+    if (weightPerUnit) return formatNumber(quantity) + ' ' + unit + ' ' + name;
+    // Shown as written in the recipe, like the page itself; rounded only once scaled
+    return (servings === 1 ? String(quantity) : formatNumber(quantity)) + ' ' + unit + ' ' + name;
+}
+
+function renderIngredients(data, variant) {
+    const container = document.getElementById('ingredients-container');
+    const fragment = document.createDocumentFragment();
+    variant.components.forEach(([componentName, lines]) => {
+        if (componentName) {
+            const heading = document.createElement('h3');
+            heading.textContent = componentName;
+            fragment.appendChild(heading);
+        }
+        const list = document.createElement('ul');
+        list.className = 'ingredients-list';
+        lines.forEach(([rowId, quantity]) => {
+            const row = data.ingredients[rowId];
+            const link = document.createElement('a');
+            link.href = row[2] ? `/${row[2]}.html` : `/ingredients/${slugify(row[0])}.html`;
+            link.className = row[2] ? 'component-link' : 'ingredient-link';
+            link.textContent = formatQuantity(row, quantity * servings);
+            const item = document.createElement('li');
+            item.appendChild(link);
+            list.appendChild(item);
+        });
+        fragment.appendChild(list);
+    });
+    container.replaceChildren(fragment);
+}
+
+function updateDisplay() {
+    const data = loadRecipeData();
+    const variant = data.variants[activeVariant];
+    document.getElementById("servings").textContent = servings;
+
+    ["total-calories", "total-protein", "total-fat", "total-carbs"].forEach((id, i) => {
+        // Add " g" for everything except calories
+        document.getElementById(id).textContent = Math.round(variant.totals[i] * servings) + (i === 0 ? "" : " g");
+    });
+    renderIngredients(data, variant);
+}
+
+function showWarningMessage() {
+    const container = document.querySelector(".servings-control");
+    let warning = document.getElementById("serving-warning");
+
+    // Create warning element if it doesn't exist yet
+    if (!warning) {
+        warning = document.createElement("div");
+        warning.id = "serving-warning";
+        warning.style.color = "#e57373";
+        warning.style.fontSize = "0.95rem";
+        warning.style.marginTop = "0.5rem";
+        warning.style.fontWeight = "normal";
+        container.insertAdjacentElement("afterend", warning);
+    }
+
+    const template = container.dataset.warning || 'Misschien moet je maar een restaurant openen! Laten we het onder de {max} porties houden, oké?';
+    warning.textContent = template.replace('{max}', MAX_SERVINGS);
+    warning.style.opacity = 1;
+
+    // Clear existing timeout if the user keeps clicking
+    if (warningTimeout) clearTimeout(warningTimeout);
+
+    // Hide message after 3 seconds
+    warningTimeout = setTimeout(() => {
+        warning.style.opacity = 0;
+    }, 3000);
+}
+
+function increaseServings() {
+    servings++;
+    if (servings > MAX_SERVINGS) {
+        servings = 1;
+        showWarningMessage();
+    }
+    updateDisplay();
+}
+
+function decreaseServings() {
+    if (servings > 1) {
+        servings--;
+        updateDisplay();
+    }
+}
+
+function toggleVariant() {
+    const variantKeys = Object.keys(loadRecipeData().variants);
+    const active = document.querySelector('.variant-btn.active').dataset.variant;
+    const nextIdx = (variantKeys.indexOf(active) + 1) % variantKeys.length;
+    switchVariant(variantKeys[nextIdx]);
+}
+
+function switchVariant(name) {
+    activeVariant = name;
+    const variant = loadRecipeData().variants[name];
+
+    // Update per-100g cells
+    ["calories-100g", "protein-100g", "fat-100g", "carbs-100g"].forEach((id, i) => {
+        document.getElementById(id).textContent = formatNumber(variant.per_100g[i]) + (i === 0 ? "" : " g");
+    });
+
+    // Slide thumb to the matching button's position in the DOM
+    const btns = Array.from(document.querySelectorAll('.variant-btn'));
+    const idx = btns.findIndex(btn => btn.dataset.variant === name);
+    document.querySelector('.toggle-thumb').style.left = (idx * (100 / btns.length)) + '%';
+    btns.forEach(btn => btn.classList.toggle('active', btn.dataset.variant === name));
+
+    // Re-render ingredients and totals for the current servings
+    updateDisplay();
+}
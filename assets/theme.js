@@ -0,0 +1,31 @@
+// Default mode is dark. Other site flavours word the tooltips through data-tooltip-light and
+// data-tooltip-dark on the toggle button.
+document.body.classList.add('dark-mode');
+
+function toggleTheme() {
+    const body = document.body;
+    const toggleButton = document.querySelector('.theme-toggle');
+
+    body.classList.toggle('light-mode');
+    body.classList.toggle('dark-mode');
+
+    // Save theme preference to localStorage
+    if (body.classList.contains('light-mode')) {
+        toggleButton.textContent = '☀️';
+        toggleButton.setAttribute('data-tooltip', toggleButton.dataset.tooltipLight || 'Welkom terug in de beschaving!');
+        localStorage.setItem('theme', 'light');
+    } else {
+        toggleButton.textContent = '🌙';
+        toggleButton.setAttribute('data-tooltip', toggleButton.dataset.tooltipDark || 'Light mode, echt?');
+        localStorage.setItem('theme', 'dark');
+    }
+}
+
+// Load stored theme preference
+(function() {
+    const savedTheme = localStorage.getItem('theme');
+    if (savedTheme === 'light') {
+        document.body.classList.add('light-mode');
+        document.querySelector('.theme-toggle').textContent = '☀️';
+    }
+})();
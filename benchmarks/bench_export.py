@@ -0,0 +1,92 @@
+"""
+Time reading the computed nutrition of a built site back: from the bulk export tables, from the
+per-recipe JSON API files and by scraping the payload out of every recipe page, as analytics jobs
+did before the export existed.
+
+Usage: python benchmarks/bench_export.py [SITE_DIR] [--repeat 5]   (default: static_site, built first)
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nutrition_export import EXPORT_DIR, RECIPE_API_DIR  # noqa: E402
+
+PAYLOAD = re.compile(r'<script type="application/json" id="recipe-data">(.*?)</script>', re.S)
+
+
+def timed(function: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median milliseconds of ``repeat`` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("site_dir", nargs="?", default="static_site")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    export_dir = os.path.join(args.site_dir, EXPORT_DIR)
+    api_dir = os.path.join(args.site_dir, RECIPE_API_DIR)
+    api_files = sorted(name for name in os.listdir(api_dir) if name.endswith(".json"))
+    pages = [os.path.join(args.site_dir, os.path.splitext(name)[0] + ".html") for name in api_files]
+
+    def read_csv() -> int:
+        rows = 0
+        for table in ("recipe_variants", "recipe_lines"):
+            with open(os.path.join(export_dir, f"{table}.csv"), newline="", encoding="utf-8") as f:
+                rows += sum(1 for _ in csv.DictReader(f))
+        return rows
+
+    def read_ndjson() -> int:
+        rows = 0
+        for table in ("recipe_variants", "recipe_lines"):
+            with open(os.path.join(export_dir, f"{table}.ndjson"), encoding="utf-8") as f:
+                rows += sum(1 for line in f if json.loads(line))
+        return rows
+
+    def read_api() -> int:
+        rows = 0
+        for name in api_files:
+            with open(os.path.join(api_dir, name), encoding="utf-8") as f:
+                export = json.load(f)
+            rows += len(export["variants"]) + len(export["lines"])
+        return rows
+
+    def scrape() -> int:
+        variants = 0
+        for page in pages:
+            with open(page, encoding="utf-8") as f:
+                match = PAYLOAD.search(f.read())
+            if match:
+                variants += len(json.loads(match.group(1))["variants"])
+        return variants
+
+    print(f"{len(api_files):,} recipes in {args.site_dir}\n")
+    print(f"{'source':<40}{'ms':>8}{'rows':>9}{'µs/recipe':>11}")
+    for label, function in [
+        ("export tables, CSV", read_csv),
+        ("export tables, NDJSON", read_ndjson),
+        ("per-recipe JSON API", read_api),
+        ("scraping recipe pages (variants only)", scrape),
+    ]:
+        ms, rows = timed(function, args.repeat)
+        print(f"{label:<40}{ms:>8.1f}{rows:>9,}{ms * 1000 / max(1, len(api_files)):>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measure the wall-clock latency of the check-data-entries pre-commit hook and the start-up of the build.
+
+Runs ``python check_data_entries.py`` repeatedly in a fresh interpreter, the way pre-commit does,
+and reports the median. The build's start-up is timed the same way: importing
+generate_static_website, loading every template in a fresh process (cold without the Jinja bytecode
+cache, warm with it, and from precompiled templates) and a no-op build of an up-to-date site. With ``--baseline REV`` the same
+is done for the tree as it was at that git revision (exported to a temporary directory), giving a
+before/after comparison (revisions whose hook imports pandas need it installed).
+
+Usage: python benchmarks/bench_hook_startup.py [--runs 10] [--baseline REV]
+"""
+
+import argparse
+import importlib.util
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+from typing import Callable
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+JINJA_CACHE_DIR = Path(".nomstats_cache") / "jinja"
+COMPILED_TEMPLATES_DIR = Path(".nomstats_cache") / "compiled_templates"
+# Revisions before the lazy environment have a module-level ``env`` instead of ``get_env``.
+LOAD_TEMPLATES = (
+    "import os, generate_static_website as g; env = g.get_env() if hasattr(g, 'get_env') else g.env; "
+    "[env.get_template(name) for name in os.listdir(g.TEMPLATE_DIR)]"
+)
+
+
+def time_command(command: list[str], cwd: Path, runs: int, setup: Callable[[], None] | None = None) -> float:
+    timings = []
+    for _ in range(runs):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, check=False, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def export_revision(rev: str, destination: Path) -> None:
+    archive = subprocess.run(["git", "archive", rev], cwd=REPO_ROOT, check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=BytesIO(archive)) as tar:
+        tar.extractall(destination, filter="data")
+
+
+def time_build_startup(cwd: Path, runs: int, label: str) -> dict[str, float]:
+    """Start-up timings of the build in ``cwd``; precompiled templates only where the tree supports them."""
+    build = [sys.executable, "generate_static_website.py"]
+    load_templates = [sys.executable, "-c", LOAD_TEMPLATES]
+    subprocess.run(build, cwd=cwd, check=True, stdout=subprocess.DEVNULL)
+
+    def clear_template_caches() -> None:
+        shutil.rmtree(cwd / JINJA_CACHE_DIR, ignore_errors=True)
+        shutil.rmtree(cwd / COMPILED_TEMPLATES_DIR, ignore_errors=True)
+
+    results = {
+        f"import build ({label})": time_command([sys.executable, "-c", "import generate_static_website"], cwd, runs),
+        f"templates cold ({label})": time_command(load_templates, cwd, runs, setup=clear_template_caches),
+        f"templates warm ({label})": time_command(load_templates, cwd, runs),
+    }
+    precompile = subprocess.run([*build, "--precompile-templates"], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if precompile.returncode == 0:
+        results[f"templates precompiled ({label})"] = time_command(load_templates, cwd, runs)
+    clear_template_caches()
+    results[f"no-op build ({label})"] = time_command(build, cwd, runs)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--baseline", metavar="REV", help="git revision to compare against, e.g. HEAD~1")
+    args = parser.parse_args()
+
+    hook = [sys.executable, "check_data_entries.py"]
+    results = {
+        "python startup": time_command([sys.executable, "-c", "pass"], REPO_ROOT, args.runs),
+        "hook (current)": time_command(hook, REPO_ROOT, args.runs),
+    }
+    if importlib.util.find_spec("pandas"):  # what the hook used to pay before it stopped importing pandas
+        results["import pandas"] = time_command([sys.executable, "-c", "import pandas"], REPO_ROOT, args.runs)
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.baseline, Path(tmp))
+            results[f"hook ({args.baseline})"] = time_command(hook, Path(tmp), args.runs)
+    results.update(time_build_startup(REPO_ROOT, args.runs, "current"))
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as tmp:
+            export_revision(args.baseline, Path(tmp))
+            results.update(time_build_startup(Path(tmp), args.runs, args.baseline))
+
+    width = max(len(label) for label in results) + 2
+    for label, seconds in results.items():
+        print(f"{label:<{width}}{seconds * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Time the SQLite ingredient store against ingredients.csv on a synthetic food-composition dataset.
+
+Writes a dataset of ``--rows`` foods the way national databases ship them (semicolon separated,
+decimal commas, energy in kJ, trace values, a share of duplicate names), imports it into a fresh
+store and compares what the build needs: loading every row of an equally large ingredients.csv
+versus looking up the ``--referenced`` names a recipe tree uses.
+
+Usage: python benchmarks/bench_ingredient_store.py [--rows 50000] [--referenced 300] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_static_website import INGREDIENTS_FILE, ingredients_from_rows, load_ingredients_csv  # noqa: E402
+from ingredient_store import COLUMNS, IngredientStore, parse_mapping  # noqa: E402
+
+HEADER = ["Voedingsmiddelnaam", "Eenheid", "ENERCJ (kJ)", "PROT (g)", "FAT (g)", "CHO (g)", "ALC (g)"]
+MAPPING = [
+    "name=Voedingsmiddelnaam",
+    "measurement_unit=Eenheid",
+    "calories_per_100g=ENERCJ (kJ):kj",
+    "protein_per_100g=PROT (g)",
+    "fat_per_100g=FAT (g)",
+    "carbohydrates_per_100g=CHO (g)",
+    "alcohol_percentage=ALC (g):g",
+]
+WORDS = ["rauw", "gekookt", "gebakken", "diepvries", "blik", "gedroogd", "gezouten", "ongezouten", "light", "volkoren", "biologisch"]
+
+
+def _decimal(value: float) -> str:
+    return f"{value:.1f}".replace(".", ",")
+
+
+def write_dataset(path: str, real_names: list[str], n_rows: int, rng: random.Random) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(HEADER)
+        for i in range(n_rows):
+            name = real_names[i] if i < len(real_names) else f"{rng.choice(real_names)} {rng.choice(WORDS)} {i // 50}"
+            if rng.random() < 0.02:
+                name = name.upper()  # a duplicate once names are normalized
+            protein, fat, carbs = rng.uniform(0, 30), rng.uniform(0, 40), rng.uniform(0, 70)
+            kj = (protein * 4 + fat * 9 + carbs * 4) * 4.184
+            writer.writerow([name, rng.choice(["per 100g", "per 100 ml"]), _decimal(kj), _decimal(protein), _decimal(fat), _decimal(carbs), "tr"])
+
+
+def timed(function: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median milliseconds of ``repeat`` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--referenced", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    real_names = sorted(load_ingredients_csv(INGREDIENTS_FILE))
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset, store_file, csv_file = (os.path.join(tmp, name) for name in ("dataset.csv", "store.sqlite", "ingredients.csv"))
+        write_dataset(dataset, real_names, args.rows, rng)
+
+        store = IngredientStore(store_file)
+        start = time.perf_counter()
+        with open(dataset, newline="", encoding="utf-8") as f:
+            stats = store.import_rows(csv.DictReader(f, delimiter=";"), parse_mapping(MAPPING), "synthetic", decimal=",")
+        seconds = time.perf_counter() - start
+        print(f"import: {stats.read:,} rows in {seconds:.2f} s ({stats.read / seconds:,.0f} rows/s)")
+        print(f"        {stats.imported:,} imported, {stats.duplicates} duplicates, {stats.invalid} invalid")
+        print(f"        store size {os.path.getsize(store_file) / 2**20:.1f} MiB\n")
+
+        with open(csv_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            writer.writerows(store.lookup(store.names()))
+        names = rng.sample(store.names(), min(args.referenced, len(store)))
+
+        def load_csv() -> int:
+            with open(csv_file, newline="") as f:
+                return len(ingredients_from_rows(csv.DictReader(f)))
+
+        csv_ms, csv_rows = timed(load_csv, args.repeat)
+        store_ms, store_rows = timed(lambda: len(ingredients_from_rows(store.lookup(names))), args.repeat)
+        names_ms, _ = timed(store.names, args.repeat)
+        print(f"{'ingredient table':<44}{'ms':>8}{'rows':>9}")
+        print(f"{'ingredients.csv, every row':<44}{csv_ms:>8.1f}{csv_rows:>9,}")
+        print(f"{'store, referenced names in batches':<44}{store_ms:>8.1f}{store_rows:>9,}")
+        print(f"{'store, every name (for suggestions)':<44}{names_ms:>8.1f}{len(store):>9,}")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare the per-recipe ``calculate_nutrition`` loop with ``calculate_nutrition_batch``.
+
+Builds a synthetic catalogue from the real ingredients.csv and checks that both engines return
+identical totals (down to int or float) before reporting timings. The batch engine runs the way the
+build uses it: one nutrient table per build, and one batch per ``--batch`` recipes (default
+``STREAM_CHUNK``, the build's batch size).
+
+Usage: python benchmarks/bench_nutrition.py [--recipes 100000] [--batch 256] [--seed 0]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_static_website import (  # noqa: E402
+    INGREDIENTS_FILE,
+    STREAM_CHUNK,
+    build_nutrient_table,
+    calculate_nutrition,
+    calculate_nutrition_batch,
+    load_ingredients_csv,
+)
+from models import RecipeIngredient  # noqa: E402
+
+
+def synthetic_ingredient_lists(names: list[str], n_recipes: int, seed: int) -> list[list[RecipeIngredient]]:
+    rng = random.Random(seed)
+    lists = []
+    for _ in range(n_recipes):
+        lines = []
+        for name in rng.sample(names, rng.randint(3, 15)):
+            quantity = rng.choice([rng.randint(1, 500), round(rng.uniform(0.5, 4), 1)])
+            lines.append(RecipeIngredient(name, quantity))
+        lists.append(lines)
+    return lists
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=STREAM_CHUNK, help=f"ingredient lists per batch (default: {STREAM_CHUNK})")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    all_ingredients = load_ingredients_csv(INGREDIENTS_FILE)
+    lists = synthetic_ingredient_lists(list(all_ingredients), args.recipes, args.seed)
+
+    start = time.perf_counter()
+    expected = [calculate_nutrition(lst, all_ingredients) for lst in lists]
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = build_nutrient_table(all_ingredients)
+    table_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = [result for i in range(0, len(lists), args.batch) for result in calculate_nutrition_batch(lists[i : i + args.batch], table)]
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = sum(repr(a) != repr(e) for a, e in zip(actual, expected))
+    print(f"recipes:        {args.recipes}")
+    print(f"table:          {table_seconds:.3f} s (once per build, including the NumPy import)")
+    print(f"loop:           {loop_seconds:.3f} s ({args.recipes / loop_seconds:,.0f} recipes/s)")
+    print(f"batch of {args.batch:<6} {batch_seconds:.3f} s ({args.recipes / batch_seconds:,.0f} recipes/s)")
+    print(f"speed-up:       {loop_seconds / batch_seconds:.1f}x")
+    print(f"mismatches:     {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Time recipe_query on a synthetic table of recipe variants.
+
+The table holds ``--rows`` variants with macros drawn around those of the real catalogue (totals of
+a few hundred to a few thousand kcal, protein correlated with calories), random dietary labels,
+spice levels and preparation times. Each filter, top-k and meal-plan query is timed over
+``--repeat`` runs; meal plans also report how many search nodes they visited.
+
+Usage: python benchmarks/bench_recipe_query.py [--rows 100000] [--repeat 5] [--seed 0]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from recipe_query import RecipeTable, plan_meals  # noqa: E402
+
+CATEGORIES = ["Aziatisch", "Bbq", "Italiaans", "Mexicaans", "Overig", "Ontbijt"]
+LABELS = ["vegetarian", "vegan", "spicy", "gluten_free"]
+
+FIND_QUERIES: list[tuple[str, dict[str, Any]]] = [
+    ("protein>=40, first 10", {"filters": ["protein>=40"], "limit": 10}),
+    ("vegetarian, spice<=2, time<=30, first 10", {"filters": ["spice_level<=2", "preparation_time<=30"], "labels": ["vegetarian"], "limit": 10}),
+    ("top 10 protein_100g", {"order_by": "protein_100g", "limit": 10}),
+    ("top 10 kcal, vegan, Aziatisch", {"labels": ["vegan"], "category": "Aziatisch", "order_by": "calories", "limit": 10}),
+]
+PLAN_QUERIES: list[tuple[str, dict[str, Any]]] = [
+    (
+        "3 meals protein>=150 kcal<=2000, vegetarian spice<=2",
+        {"totals": ["protein>=150", "calories<=2000"], "filters": ["spice_level<=2"], "labels": ["vegetarian"]},
+    ),
+    ("3 meals protein>=150 kcal<=2000", {"totals": ["protein>=150", "calories<=2000"]}),
+    ("3 meals min kcal, protein>=150", {"totals": ["protein>=150"], "objective": "calories", "minimize": True}),
+    (
+        "3 meals min kcal, protein>=150, fat<=60, servings 0.5/1/2",
+        {"totals": ["protein>=150", "fat<=60"], "objective": "calories", "minimize": True, "servings": (0.5, 1, 2)},
+    ),
+    ("4 meals max protein, kcal 2200-2500, top 5", {"totals": ["calories>=2200", "calories<=2500"], "meals": 4, "limit": 5}),
+    ("2 meals max carbs, fat<20, kcal<=900", {"totals": ["fat<20", "calories<=900"], "meals": 2, "objective": "carbs"}),
+    ("3 meals protein>=150 kcal<=1000 (infeasible)", {"totals": ["protein>=150", "calories<=1000"]}),
+]
+
+
+def synthetic_table(n_rows: int, seed: int) -> RecipeTable:
+    rng = np.random.default_rng(seed)
+    calories = np.round(rng.lognormal(np.log(700), 0.55, n_rows))
+    protein = np.round(calories * rng.uniform(0.02, 0.12, n_rows), 1)
+    fat = np.round(calories * rng.uniform(0.01, 0.05, n_rows), 1)
+    carbs = np.round(np.maximum(calories - protein * 4 - fat * 9, 0) / 4, 1)
+    grams = calories / rng.uniform(0.8, 2.5, n_rows)
+    labels = rng.random((n_rows, len(LABELS))) < [0.4, 0.15, 0.2, 0.1]
+    spice = rng.integers(0, 5, n_rows)
+    minutes = rng.choice([5, 10, 15, 20, 30, 40, 45, 60, 90, 480], n_rows)
+    rows = [
+        {
+            "filename": f"recipe_{i // 2}.html",  # two variants per recipe
+            "name": f"Recipe {i // 2}",
+            "variant": "vega" if i % 2 else None,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "dietary_labels": [label for label, has in zip(LABELS, labels[i]) if has],
+            "calories": calories[i],
+            "protein": protein[i],
+            "fat": fat[i],
+            "carbs": carbs[i],
+            "calories_100g": round(calories[i] / grams[i] * 100),
+            "protein_100g": round(protein[i] / grams[i] * 100, 1),
+            "fat_100g": round(fat[i] / grams[i] * 100, 1),
+            "carbs_100g": round(carbs[i] / grams[i] * 100, 1),
+            "spice_level": spice[i],
+            "preparation_time": minutes[i],
+            "rating": i % 6,
+        }
+        for i in range(n_rows)
+    ]
+    return RecipeTable(rows)
+
+
+def timed(function: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """Median milliseconds of ``repeat`` calls, and the last result."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = synthetic_table(args.rows, args.seed)
+    print(f"{len(table):,} rows built in {time.perf_counter() - start:.2f} s\n")
+
+    print(f"{'find':<62}{'ms':>8}{'matches':>9}")
+    for label, query in FIND_QUERIES:
+        ms, _ = timed(lambda: table.find(**query), args.repeat)
+        matches = int(table.mask(query.get("filters", ()), query.get("labels", ()), query.get("category")).sum())
+        print(f"{label:<62}{ms:>8.1f}{matches:>9}")
+
+    print(f"\n{'plan':<62}{'ms':>8}{'nodes':>8}  best plan")
+    for label, query in PLAN_QUERIES:
+        stats: dict[str, int] = {}
+        ms, plans = timed(lambda: plan_meals(table, stats=stats, **query), args.repeat)
+        best = ", ".join(f"{column} {value:.0f}" for column, value in plans[0].totals.items()) if plans else "none"
+        print(f"{label:<62}{ms:>8.1f}{stats['nodes']:>8}  {best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Time the pipeline on synthetic catalogues of increasing size and compare with stored baselines.
+
+For every size a catalogue is written with synthetic_catalogue.py into a scratch directory, then
+each stage runs in a fresh interpreter so its peak RSS is its own:
+
+  load_ingredients_csv    parse the (scaled) ingredients.csv
+  process_all_recipes     parse every recipe and compute its macros, no cache
+  generate_static_pages   a cold build of the complete site, serial
+  generate (warm)         the same build again, nothing changed
+  check_data_entries      check_data_entries.main() on a cold recipe cache
+
+Throughput is recipes per second of wall time. Results are compared with
+benchmarks/baselines/scaling.json; ``--save-baseline`` replaces the entries for the measured sizes.
+
+Usage: python benchmarks/bench_scaling.py [--sizes 1000 10000 100000] [--stages STAGE ...] [--seed 0] [--save-baseline]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from synthetic_catalogue import write_catalogue  # noqa: E402
+
+BASELINE_FILE = Path(__file__).resolve().parent / "baselines" / "scaling.json"
+STAGES = ["load_ingredients_csv", "process_all_recipes", "generate_static_pages", "generate (warm)", "check_data_entries"]
+SHARED_DIRS = ("templates", "assets")  # resolved relative to the working directory by the generator
+
+
+def directory_size(path: Path) -> int:
+    return sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+
+
+def run_stage(stage: str, root: Path) -> dict[str, Any]:
+    """Run one stage inside ``root`` (the current process) and return its measurements."""
+    from catalogue import Catalogue
+    from generate_static_website import generate_static_pages, ingredients_from_rows, load_ingredients_csv, process_all_recipes
+    from recipe_cache import CACHE_DIR
+
+    os.chdir(root)
+    config_dir = root / "configuration"
+    ingredients_file = config_dir / "ingredients.csv"
+    if stage != "generate (warm)":
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+        shutil.rmtree("static_site", ignore_errors=True)
+
+    def load_csv() -> None:
+        load_ingredients_csv(str(ingredients_file))
+
+    def process() -> None:
+        catalogue = Catalogue(config_dir, ingredients_file)
+        process_all_recipes(catalogue, ingredients_from_rows(catalogue.ingredient_records()))
+
+    def generate() -> None:
+        generate_static_pages(catalogue=Catalogue(config_dir, ingredients_file))
+
+    def check() -> None:
+        import check_data_entries
+
+        sys.argv = ["check_data_entries.py"]
+        if check_data_entries.main() != 0:
+            raise SystemExit("synthetic catalogue failed check_data_entries")
+
+    stages: dict[str, Callable[[], None]] = {
+        "load_ingredients_csv": load_csv,
+        "process_all_recipes": process,
+        "generate_static_pages": generate,
+        "generate (warm)": generate,
+        "check_data_entries": check,
+    }
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stages[stage]()
+    seconds = time.perf_counter() - start
+    result: dict[str, Any] = {"seconds": round(seconds, 4), "peak_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+    if stage.startswith("generate"):
+        result["output_mib"] = round(directory_size(root / "static_site") / 2**20, 2)
+    return result
+
+
+def measure(n_recipes: int, seed: int, stages: list[str]) -> dict[str, dict[str, Any]]:
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nomstats-bench-") as scratch:
+        root = Path(scratch)
+        write_catalogue(root, n_recipes, seed)
+        for name in SHARED_DIRS:
+            (root / name).symlink_to(REPO_DIR / name)
+        for stage in stages:
+            output = subprocess.run(
+                [sys.executable, __file__, "--stage", stage, "--root", str(root)], check=True, capture_output=True, text=True
+            ).stdout
+            results[stage] = json.loads(output.splitlines()[-1])
+            results[stage]["recipes_per_s"] = round(n_recipes / results[stage]["seconds"])
+    return results
+
+
+def _delta(value: float, baseline: float | None) -> str:
+    if not baseline:
+        return ""
+    return f" ({(value - baseline) / baseline:+.0%})"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES, metavar="STAGE", help="run only these stages (in order)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store the results in {BASELINE_FILE.relative_to(REPO_DIR)}")
+    parser.add_argument("--stage", choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument("--root", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stage:
+        print(json.dumps(run_stage(args.stage, args.root)))
+        return
+
+    baselines = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    for n_recipes in args.sizes:
+        results = measure(n_recipes, args.seed, args.stages)
+        baseline = baselines.get(str(n_recipes), {})
+        print(f"{n_recipes} recipes:")
+        print(f"  {'stage':<24}{'seconds':>10}{'recipes/s':>12}{'peak RSS MiB':>14}{'output MiB':>12}")
+        for stage, result in results.items():
+            previous = baseline.get(stage, {})
+            output = f"{result['output_mib']:>12.1f}" if "output_mib" in result else ""
+            print(
+                f"  {stage:<24}{result['seconds']:>10.3f}{result['recipes_per_s']:>12,}{result['peak_rss_mib']:>14.1f}{output}"
+                f"{_delta(result['seconds'], previous.get('seconds'))}"
+            )
+        baselines[str(n_recipes)] = {**baseline, **results}
+
+    if args.save_baseline:
+        BASELINE_FILE.parent.mkdir(exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(baselines, indent=2) + "\n")
+        print(f"Baseline written to {BASELINE_FILE.relative_to(REPO_DIR)}")
+
+
+if __name__ == "__main__":
+    main()
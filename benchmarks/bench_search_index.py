@@ -0,0 +1,104 @@
+"""
+Measure the size of the prebuilt search index and its query latency on a synthetic catalogue.
+
+Generates recipes from the real ingredient names, builds the index, and times ``search`` against a
+linear scan over every recipe's text (what the index page did before). Both must agree.
+
+Usage: python benchmarks/bench_search_index.py [--recipes 5000] [--queries 200] [--seed 0]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_static_website import INGREDIENTS_FILE, load_ingredients_csv  # noqa: E402
+from search_index import build_search_index, normalize, search, tokenize  # noqa: E402
+
+WORDS = ["pittige", "romige", "snelle", "klassieke", "groene", "zoete", "krokante", "verse", "ovenschotel", "bowl", "soep", "salade", "wrap"]
+CATEGORIES = ["Aziatisch", "Bbq", "Italiaans", "Mexicaans", "Overig", "Ontbijt"]
+
+
+def synthetic_catalogue(names: list[str], n_recipes: int, seed: int) -> tuple[list[dict], dict[str, list[str]]]:
+    rng = random.Random(seed)
+    recipes, ingredients = [], {}
+    for i in range(n_recipes):
+        used = rng.sample(names, rng.randint(3, 15))
+        filename = f"recipe_{i}.html"
+        recipes.append(
+            {
+                "filename": filename,
+                "name": f"{rng.choice(WORDS).title()} {used[0]} {rng.choice(WORDS)}",
+                "description": " ".join(rng.choices(WORDS, k=6)),
+                "category": rng.choice(CATEGORIES),
+                "dietary_labels": rng.sample(["vegetarian", "vegan", "spicy"], rng.randint(0, 2)),
+                "protein_100g": rng.randint(0, 30),
+                "calories_100g": rng.randint(20, 500),
+                "fat_100g": round(rng.uniform(0, 30), 1),
+                "carbs_100g": round(rng.uniform(0, 60), 1),
+            }
+        )
+        ingredients[filename] = used
+    return recipes, ingredients
+
+
+def linear_search(texts: list[tuple[str, list[str]]], query: str) -> list[str]:
+    words = [word for term in normalize(query).split() for word in tokenize(term)]
+    return [filename for filename, tokens in texts if all(any(word in token for token in tokens) for word in words)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    names = list(load_ingredients_csv(INGREDIENTS_FILE))
+    recipes, ingredients = synthetic_catalogue(names, args.recipes, args.seed)
+
+    start = time.perf_counter()
+    index = build_search_index(recipes, ingredients)
+    build_seconds = time.perf_counter() - start
+    payload = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode()
+
+    rng = random.Random(args.seed)
+    vocabulary = index["tokens"]
+    queries = [
+        " ".join(token[: rng.randint(min(2, len(token)), len(token))] for token in rng.sample(vocabulary, rng.randint(1, 2)))
+        for _ in range(args.queries)
+    ]
+    texts = sorted(
+        (r["filename"], tokenize(" ".join([r["name"], r["description"], r["category"], *r["dietary_labels"], *ingredients[r["filename"]]])))
+        for r in recipes
+    )
+
+    index_timings, scan_timings, mismatches = [], [], 0
+    for query in queries:
+        start = time.perf_counter()
+        found = search(index, query)
+        index_timings.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        expected = linear_search(texts, query)
+        scan_timings.append(time.perf_counter() - start)
+        mismatches += sorted(found) != sorted(expected)
+
+    print(f"recipes:        {args.recipes}")
+    print(f"tokens:         {len(vocabulary)}")
+    print(f"build:          {build_seconds * 1000:.1f} ms")
+    print(f"index size:     {len(payload) / 1024:.1f} KiB ({len(gzip.compress(payload)) / 1024:.1f} KiB gzipped)")
+    print(f"query (index):  {statistics.median(index_timings) * 1000:.3f} ms median")
+    print(f"query (scan):   {statistics.median(scan_timings) * 1000:.3f} ms median")
+    print(f"mismatches:     {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Report the size of a generated site: total bytes, average page size per page type, and the same
+gzipped, i.e. what a visitor downloads per page once shared assets are cached.
+
+Usage: python benchmarks/bench_site_size.py [SITE_DIR ...]   (default: static_site)
+"""
+
+import argparse
+import gzip
+import os
+from collections import defaultdict
+
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def page_type(relpath: str) -> str:
+    if relpath.startswith("assets/"):
+        return "assets"
+    if relpath.startswith("ingredients/"):
+        return "ingredient pages"
+    if relpath.startswith("api/"):
+        return "nutrition export"
+    if relpath.startswith("categories/"):
+        return "category pages"
+    if relpath == "index.html":
+        return "index"
+    if relpath.endswith(".html"):
+        return "recipe pages"
+    return "other"
+
+
+def measure(site_dir: str) -> dict[str, list[tuple[int, int]]]:
+    sizes: dict[str, list[tuple[int, int]]] = defaultdict(list)
+    for root, _, filenames in os.walk(site_dir):
+        for filename in filenames:
+            if filename.endswith(COMPRESSED_SUFFIXES):
+                continue
+            path = os.path.join(root, filename)
+            with open(path, "rb") as f:
+                data = f.read()
+            sizes[page_type(os.path.relpath(path, site_dir))].append((len(data), len(gzip.compress(data, mtime=0))))
+    return sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("sites", nargs="*", default=["static_site"])
+    args = parser.parse_args()
+
+    for site_dir in args.sites:
+        sizes = measure(site_dir)
+        total = sum(raw for entries in sizes.values() for raw, _ in entries)
+        total_gzip = sum(gz for entries in sizes.values() for _, gz in entries)
+        print(f"{site_dir}: {total / 1024:.0f} KiB ({total_gzip / 1024:.0f} KiB gzipped)")
+        for kind, entries in sorted(sizes.items()):
+            raw = sum(size for size, _ in entries) / len(entries)
+            gz = sum(size for _, size in entries) / len(entries)
+            print(f"  {kind:<18}{len(entries):5} files, {raw / 1024:7.1f} KiB avg ({gz / 1024:5.1f} KiB gzipped)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Time "did you mean" suggestions for unknown ingredient names on a synthetic ingredient table.
+
+The table holds ``--names`` names made from the real ingredient names plus brand and variety words.
+Queries are names from the table with one to three random edits. Every query is answered by the
+trigram index (``suggestions.SuggestionIndex``) and the first ``--scan-queries`` also by computing
+the edit distance to every name, which is what the index replaces; the best match of both must be
+equally close whenever the scan finds one within ``max_distance``.
+
+Usage: python benchmarks/bench_suggestions.py [--names 100000] [--queries 500] [--scan-queries 3] [--seed 0]
+"""
+
+import argparse
+import random
+import statistics
+import string
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_static_website import INGREDIENTS_FILE, load_ingredients_csv  # noqa: E402
+from search_index import normalize  # noqa: E402
+from suggestions import SuggestionIndex, edit_distance, max_distance  # noqa: E402
+
+BRANDS = ["ah", "jumbo", "lidl", "plus", "go-tan", "conimex", "bonduelle", "alpro", "campina", "g'woon", "la place", "unox"]
+VARIETIES = ["biologische", "light", "extra", "verse", "gerookte", "halfvolle", "volkoren", "zero", "gezouten", "ongezouten", "gemalen"]
+
+
+def synthetic_names(real_names: list[str], n_names: int, rng: random.Random) -> list[str]:
+    names = set(real_names)
+    while len(names) < n_names:
+        parts = [rng.choice(BRANDS), rng.choice(VARIETIES), rng.choice(real_names)]
+        if rng.random() < 0.3:
+            parts.insert(2, rng.choice(VARIETIES))
+        names.add(" ".join(parts if rng.random() < 0.8 else parts[1:]) + (f" {rng.randint(2, 99)}" if rng.random() < 0.5 else ""))
+    return sorted(names)
+
+
+def typo(name: str, rng: random.Random) -> str:
+    for _ in range(rng.randint(1, 3)):
+        i = rng.randrange(len(name))
+        edit = rng.choice(["insert", "delete", "substitute", "swap"])
+        if edit == "insert":
+            name = name[:i] + rng.choice(string.ascii_lowercase) + name[i:]
+        elif edit == "delete" and len(name) > 3:
+            name = name[:i] + name[i + 1 :]
+        elif edit == "substitute":
+            name = name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1 :]
+        elif i + 1 < len(name):
+            name = name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+    return name
+
+
+def scan(names: list[str], query: str) -> list[tuple[int, str]]:
+    """Every name by edit distance to ``query``."""
+    normalized = normalize(query).strip()
+    return sorted((edit_distance(normalized, normalize(name).strip()), name) for name in names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--scan-queries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    real_names = sorted(load_ingredients_csv(INGREDIENTS_FILE))
+    names = synthetic_names(real_names, args.names, rng)
+    queries = [typo(rng.choice(names), rng) for _ in range(args.queries)]
+
+    index = SuggestionIndex(names)
+    start = time.perf_counter()
+    index.suggest("")
+    print(f"{len(names):,} names indexed in {time.perf_counter() - start:.2f} s")
+
+    times, found, corrected = [], 0, 0
+    for query in queries:
+        start = time.perf_counter()
+        matches = index.suggest(query)
+        times.append((time.perf_counter() - start) * 1000)
+        found += bool(matches)
+        corrected += index.correction(query) is not None
+    print(f"index: {statistics.median(times):.2f} ms median, {max(times):.1f} ms max per query")
+    print(f"       {found} of {len(queries)} queries got suggestions, {corrected} an unambiguous correction")
+
+    scan_times, agree = [], 0
+    for query in queries[: args.scan_queries]:
+        start = time.perf_counter()
+        best_distance, _ = scan(names, query)[0]
+        scan_times.append((time.perf_counter() - start) * 1000)
+        ranked = index.ranked(query)
+        if best_distance > max_distance(normalize(query).strip()) or (ranked and ranked[0][0] == best_distance):
+            agree += 1
+    if scan_times:
+        print(f"scan:  {statistics.median(scan_times):.0f} ms median per query; best match agrees on {agree} of {len(scan_times)} queries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time building several flavours of the site (``TARGETS`` in generate_static_website.py) on a
+synthetic catalogue: one build per target, as before targets existed, against a single build that
+computes the recipes once and renders every target.
+
+Every build is a ``--force`` build in a fresh interpreter sharing one recipe cache, so the separate
+builds parse each recipe once but load the ingredients and compute the nutrition once per target.
+
+Usage: python benchmarks/bench_targets.py [--recipes 2000] [--targets nl en print] [--jobs 1] [--seed 0]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from synthetic_catalogue import write_catalogue  # noqa: E402
+
+from generate_static_website import TARGETS  # noqa: E402
+
+SHARED_DIRS = ("assets",) + tuple(dict.fromkeys(target.template_dir for target in TARGETS.values()))
+
+
+def run_build(root: Path, targets: list[str], jobs: int) -> float:
+    """Build ``targets`` of the catalogue in ``root`` (the current process) and return the seconds it took."""
+    from catalogue import Catalogue
+    from generate_static_website import generate_static_pages
+
+    os.chdir(root)
+    config_dir = root / "configuration"
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_static_pages(force=True, jobs=jobs, catalogue=Catalogue(config_dir, config_dir / "ingredients.csv"), targets=targets)
+    return time.perf_counter() - start
+
+
+def timed_build(root: Path, targets: list[str], jobs: int) -> float:
+    command = [sys.executable, __file__, "--root", str(root), "--jobs", str(jobs), "--build", *targets]
+    return float(subprocess.run(command, check=True, capture_output=True, text=True).stdout.splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=2000)
+    parser.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--build", nargs="+", help=argparse.SUPPRESS)
+    parser.add_argument("--root", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.build:
+        print(json.dumps(run_build(args.root, args.build, args.jobs)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="nomstats-bench-") as scratch:
+        root = Path(scratch)
+        write_catalogue(root, args.recipes, args.seed)
+        for name in SHARED_DIRS:
+            (root / name).symlink_to(REPO_DIR / name)
+        timed_build(root, args.targets[:1], args.jobs)  # fills the recipe cache
+
+        separate = {target: timed_build(root, [target], args.jobs) for target in args.targets}
+        together = timed_build(root, args.targets, args.jobs)
+
+    print(f"{args.recipes:,} recipes, {args.jobs} job(s)\n")
+    print(f"{'build':<52}{'seconds':>10}")
+    for target, seconds in separate.items():
+        print(f"{'--target ' + target:<52}{seconds:>10.2f}")
+    print(f"{'separate builds, total':<52}{sum(separate.values()):>10.2f}")
+    print(f"{'one build, ' + ' '.join('--target ' + target for target in args.targets):<52}{together:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Write a synthetic NomStats catalogue (``configuration/`` with ingredients.csv and recipe YAML) of any size.
+
+Ingredient rows are the real ingredients.csv plus jittered copies of randomly drawn real rows, so the
+unit mix (g, ml, el_tl, stuks, ...) and macro ranges follow the real data. Recipes mix the
+``ingredients``, ``components`` and ``variants`` shapes in the real catalogue's proportions and a
+share of them use rubs and sauces from ``componenten/`` through ``recipe_reference``, some of which
+reference other components in turn. Every generated catalogue passes check_data_entries.py.
+
+Usage: python benchmarks/synthetic_catalogue.py TARGET_DIR [--recipes 10000] [--seed 0]
+"""
+
+import argparse
+import csv
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from generate_static_website import INGREDIENTS_FILE  # noqa: E402
+
+CATEGORIES = ["aziatisch", "bbq", "italiaans", "mexicaans", "nederlands", "overig", "pizzas", "soepen", "toetjes"]
+COMPONENT_CATEGORY = "componenten"
+WORDS = ["pittige", "romige", "snelle", "klassieke", "groene", "zoete", "krokante", "verse", "ovenschotel", "bowl", "soep", "salade", "wrap"]
+MACRO_COLUMNS = ["protein_per_100g", "calories_per_100g", "fat_per_100g", "carbohydrates_per_100g"]
+
+SHAPES = (("ingredients", 0.75), ("variants", 0.15), ("components", 0.10))
+COMPONENT_SHARE = 0.05  # recipes that are rubs/sauces in componenten/
+REFERENCE_SHARE = 0.3  # recipes (and components) that use one or two components
+RECIPES_PER_INGREDIENT = 10  # extra rows are added once the catalogue outgrows the real table
+
+
+def synthetic_ingredient_rows(real_rows: list[dict[str, str]], n_rows: int, rng: random.Random) -> list[dict[str, str]]:
+    rows = list(real_rows)
+    for i in range(len(real_rows), n_rows):
+        row = dict(rng.choice(real_rows))
+        row["name"] = f"{row['name']} {i}"
+        for column in MACRO_COLUMNS:
+            row[column] = str(round(float(row[column]) * rng.uniform(0.8, 1.2), 1))
+        rows.append(row)
+    return rows
+
+
+def _quantity(unit: str, rng: random.Random) -> float | int:
+    if unit in ("g", "ml"):
+        return rng.randint(5, 500)
+    if unit == "el_tl":
+        return rng.randint(1, 16)
+    return rng.choice([0.5, 1, 1, 2, 3])
+
+
+def _ingredient_lines(names: list[str], units: dict[str, str], rng: random.Random, low: int = 3, high: int = 12) -> list[dict[str, Any]]:
+    return [{"name": name, "quantity": _quantity(units[name], rng)} for name in rng.sample(names, rng.randint(low, high))]
+
+
+def _reference_lines(components: list[tuple[str, str]], rng: random.Random) -> list[dict[str, Any]]:
+    picked = rng.sample(components, min(len(components), rng.randint(1, 2)))
+    return [{"name": name, "quantity": rng.randint(10, 40), "recipe_reference": filename} for filename, name in picked]
+
+
+def synthetic_recipe(
+    title: str, names: list[str], units: dict[str, str], components: list[tuple[str, str]], rng: random.Random, shape: str
+) -> dict[str, Any]:
+    def lines() -> list[dict[str, Any]]:
+        ingredients = _ingredient_lines(names, units, rng)
+        if components and rng.random() < REFERENCE_SHARE:
+            ingredients.extend(_reference_lines(components, rng))
+        return ingredients
+
+    recipe: dict[str, Any] = {"recipe_name": title, "description": " ".join(rng.choices(WORDS, k=6))}
+    if shape == "ingredients":
+        recipe["ingredients"] = lines()
+    elif shape == "components":
+        recipe["components"] = [{"name": part.title(), "ingredients": lines()} for part in rng.sample(WORDS, rng.randint(2, 3))]
+    else:
+        recipe["variants"] = {variant: {"ingredients": lines()} for variant in rng.sample(["lean", "bulk", "vega", "spicy"], rng.randint(2, 3))}
+    recipe["steps"] = [f"Stap {step}: {' '.join(rng.choices(WORDS, k=5))}" for step in range(1, rng.randint(3, 9))]
+    recipe["rating"] = rng.randint(0, 5)
+    recipe["spice_level"] = rng.randint(0, 5)
+    recipe["preparation_time"] = rng.choice([5, 10, 20, 30, 45, 60, 90])
+    if rng.random() < 0.4:
+        recipe["dietary_labels"] = ["vegetarian"]
+    return recipe
+
+
+def write_catalogue(target_dir: Path, n_recipes: int, seed: int = 0) -> Path:
+    """Write ``target_dir/configuration`` with ``n_recipes`` recipes and return that directory."""
+    rng = random.Random(seed)
+    config_dir = target_dir / "configuration"
+    with open(INGREDIENTS_FILE, newline="") as f:
+        reader = csv.DictReader(f)
+        fieldnames = list(reader.fieldnames or [])
+        real_rows = list(reader)
+    rows = synthetic_ingredient_rows(real_rows, max(len(real_rows), n_recipes // RECIPES_PER_INGREDIENT), rng)
+    names = [row["name"] for row in rows]
+    units = {row["name"]: row["measurement_unit"] for row in rows}
+
+    for category in [*CATEGORIES, COMPONENT_CATEGORY]:
+        (config_dir / category).mkdir(parents=True, exist_ok=True)
+
+    components: list[tuple[str, str]] = []
+    weights = [weight for _, weight in SHAPES]
+    for i in range(n_recipes):
+        if rng.random() < COMPONENT_SHARE:
+            # Components only reference earlier components, so reference chains never form a cycle.
+            filename, title = f"component_{i}", f"Component {i}"
+            recipe = synthetic_recipe(title, names, units, components, rng, "ingredients")
+            rows.append({**dict.fromkeys(fieldnames, "0"), "name": title.lower(), "measurement_unit": "el_tl", "weight_per_unit": ""})
+            components.append((filename, title.lower()))
+            category = COMPONENT_CATEGORY
+        else:
+            shape = rng.choices([name for name, _ in SHAPES], weights)[0]
+            filename, title = f"recipe_{i}", f"{rng.choice(WORDS).title()} {rng.choice(names)} {i}"
+            recipe = synthetic_recipe(title, names, units, components, rng, shape)
+            category = rng.choice(CATEGORIES)
+        with open(config_dir / category / f"{filename}.yaml", "w") as f:
+            yaml.safe_dump(recipe, f, sort_keys=False, allow_unicode=True)
+
+    with open(config_dir / "ingredients.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    return config_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("target_dir", type=Path)
+    parser.add_argument("--recipes", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(f"Wrote {write_catalogue(args.target_dir, args.recipes, args.seed)}")
+
+
+if __name__ == "__main__":
+    main()
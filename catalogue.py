@@ -0,0 +1,185 @@
+"""
+In-memory catalogue of the NomStats configuration, shared by check_data_entries.py and
+generate_static_website.py.
+
+ingredients.csv is read from disk once and the recipe tree is walked once; recipe YAML is parsed
+lazily through the on-disk ``RecipeCache``, which also memoizes it for the rest of the process. Running
+the validator and the build on the same ``Catalogue`` therefore reads and parses everything only once.
+
+With an ``IngredientStore`` (``store_file``), ingredients.csv is mirrored into the store and
+``lookup_ingredients`` fetches the rows the recipes need from it instead of from the CSV.
+"""
+
+import csv
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from ingredient_store import IngredientStore
+from recipe_cache import RecipeCache
+
+CONFIG_DIR = Path(__file__).parent / "configuration"
+INGREDIENTS_FILENAME = "ingredients.csv"
+
+
+class ReferenceCycleError(ValueError):
+    """Raised when recipes reference each other, directly or transitively, through ``recipe_reference``."""
+
+
+def _ingredient_lines(data: dict[str, Any]) -> Iterator[tuple[Any, Any, dict[str, Any]]]:
+    """Yield ``(variant, component, ingredient line)`` for every ingredient line of a parsed recipe."""
+    sources = list(data["variants"].items()) if "variants" in data else [(None, data)]
+    for variant, source in sources:
+        components = (
+            [(c.get("name"), c.get("ingredients", [])) for c in source["components"]]
+            if "components" in source
+            else [(None, source.get("ingredients", []))]
+        )
+        for component, ingredients in components:
+            for item in ingredients:
+                yield variant, component, item
+
+
+def ingredient_usages(data: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Every ingredient line of a parsed recipe, across all variants and components, as
+    ``{"name", "variant", "component", "quantity"}`` (variant/component are None when not applicable).
+    """
+    return [
+        {"name": item["name"], "variant": variant, "component": component, "quantity": item.get("quantity", 0)}
+        for variant, component, item in _ingredient_lines(data)
+    ]
+
+
+def recipe_references(data: dict[str, Any]) -> list[tuple[str, str]]:
+    """The distinct ``(ingredient name, referenced recipe)`` pairs of a parsed recipe's ``recipe_reference`` lines."""
+    pairs = {(item["name"], item["recipe_reference"]) for _, _, item in _ingredient_lines(data) if item.get("recipe_reference")}
+    return sorted(pairs)
+
+
+def dependency_levels(graph: dict[str, set[str]]) -> list[list[str]]:
+    """
+    Group the nodes of a dependency graph (node -> nodes it depends on) into evaluation levels: every
+    node only depends on nodes of earlier levels. Raises ``ReferenceCycleError`` naming one cycle.
+    """
+    remaining = {node: set(deps) & graph.keys() for node, deps in graph.items()}
+    dependents: dict[str, list[str]] = {node: [] for node in remaining}
+    for node, deps in remaining.items():
+        for dep in deps:
+            dependents[dep].append(node)
+
+    levels = []
+    level = sorted(node for node, deps in remaining.items() if not deps)
+    while level:
+        levels.append(level)
+        next_level = []
+        for node in level:
+            del remaining[node]
+            for dependent in dependents[node]:
+                remaining[dependent].discard(node)
+                if not remaining[dependent]:
+                    next_level.append(dependent)
+        level = sorted(next_level)
+    if remaining:
+        raise ReferenceCycleError(f"recipe_reference cycle: {' -> '.join(_find_cycle(remaining))}")
+    return levels
+
+
+def _find_cycle(graph: dict[str, set[str]]) -> list[str]:
+    path: list[str] = []
+    node = min(graph)
+    while node not in path:
+        path.append(node)
+        node = min(graph[node])
+    return path[path.index(node) :] + [node]
+
+
+@dataclass(frozen=True)
+class RecipeFile:
+    path: Path
+    relpath: Path  # relative to the configuration directory
+
+    @property
+    def category(self) -> str:
+        return self.relpath.parts[0]
+
+    @property
+    def filename(self) -> str:
+        return self.relpath.name
+
+
+class Catalogue:
+    def __init__(
+        self,
+        config_dir: Path = CONFIG_DIR,
+        ingredients_file: Path | None = None,
+        cache: RecipeCache | None = None,
+        store_file: Path | None = None,
+    ) -> None:
+        self.config_dir = Path(config_dir)
+        self.ingredients_file = Path(ingredients_file) if ingredients_file else self.config_dir / INGREDIENTS_FILENAME
+        self.cache = cache if cache is not None else RecipeCache()
+        self.store = IngredientStore(store_file) if store_file else None
+        with self.ingredients_file.open(newline="") as f:
+            self._set_ingredients_text(f.read())
+        self.recipe_files = [
+            RecipeFile(path, path.relative_to(self.config_dir)) for path in sorted(self.config_dir.rglob("*.yaml"), key=lambda path: path.parts)
+        ]
+
+    # -- ingredients.csv ------------------------------------------------------
+
+    def _set_ingredients_text(self, text: str) -> None:
+        self.ingredients_text = text
+        self.ingredient_rows = list(csv.reader(io.StringIO(text)))
+        if self.store is not None:
+            self.store.sync_csv(self.ingredient_records(), text)
+
+    @property
+    def ingredient_header(self) -> list[str]:
+        return self.ingredient_rows[0] if self.ingredient_rows else []
+
+    def ingredient_records(self) -> list[dict[str, Any]]:
+        """The data rows as ``csv.DictReader`` would return them (blank lines skipped, missing fields None)."""
+        header = self.ingredient_header
+        records = []
+        for row in self.ingredient_rows[1:]:
+            if not row:
+                continue
+            record: dict[str, Any] = dict(zip(header, row))
+            for column in header[len(row) :]:
+                record[column] = None
+            records.append(record)
+        return records
+
+    def lookup_ingredients(self, names: Iterable[str]) -> list[dict[str, Any]]:
+        """
+        The rows of the ingredients called ``names`` that exist, as ``ingredient_records`` returns them:
+        looked up in the store in batches when the catalogue has one, else taken from ingredients.csv.
+        """
+        if self.store is not None:
+            return list(self.store.lookup(names))
+        wanted = set(names)
+        return [record for record in self.ingredient_records() if record["name"] in wanted]
+
+    def ingredient_names(self) -> list[str]:
+        """Every ingredient name, from the store when the catalogue has one."""
+        if self.store is not None:
+            return self.store.names()
+        return [record["name"] for record in self.ingredient_records() if record["name"]]
+
+    def write_ingredient_rows(self, rows: list[list[str]]) -> None:
+        """Replace ingredients.csv, both on disk and in memory."""
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        with self.ingredients_file.open("w", newline="") as f:
+            f.write(buffer.getvalue())
+        self._set_ingredients_text(buffer.getvalue())
+
+    # -- recipes --------------------------------------------------------------
+
+    def load_recipe(self, recipe_file: RecipeFile) -> Any:
+        return self.cache.load(recipe_file.path)
+
+    def save(self) -> None:
+        self.cache.save()
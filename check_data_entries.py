@@ -4,36 +4,58 @@ Pre-commit checks for NomStats configuration files.
 Runs three jobs in sequence:
   1. Strip leading/trailing whitespace from all fields in ingredients.csv (auto-fix).
   2. Validate the structure and content of ingredients.csv.
-  3. Validate all recipe YAML files for correct structure, types, and ingredient references.
+  3. Validate all recipe YAML files for correct structure, types, and ingredient and recipe references.
 
-Exits 1 if the CSV was modified (user must re-stage) or if any issues are found.
+Unknown ingredient references come with the closest names in ingredients.csv (see ``suggestions``);
+with ``--fix``, references that are an unambiguous typo of one of them are corrected in place first.
+
+Exits 1 if the CSV or a recipe was modified (user must re-stage) or if any issues are found.
 """
 
-import csv
+import argparse
+import copy
+import json
+import math
+import os
+import re
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import Any
 
-import pandas as pd
-import yaml
+from catalogue import Catalogue, ReferenceCycleError, dependency_levels
+from ingredient_store import STORE_FILE
+from models import Ingredient, Recipe
+from profiling import DEFAULT_TRACE_FILE, profiler
+from recipe_cache import CACHE_DIR, CacheLookup, RecipeCache, parse_yaml, read_recipe_file
+from suggestions import SuggestionIndex
 
 INGREDIENTS_CSV = Path("configuration/ingredients.csv")
 RECIPES_DIR = Path("configuration")
+USAGE_INDEX_FILE = Path(CACHE_DIR) / "usage_index.json"
+USAGE_INDEX_VERSION = 1
+PARALLEL_MIN_FILES = 256  # below this, starting worker processes costs more than it saves
+CACHE_MIN_FILES = 64
 
 VALID_DIETARY_LABELS = {"alcoholic", "non_alcoholic", "vegetarian"}
 
-CSV_SCHEMA = pd.DataFrame(
-    [
-        {"column": "name", "is_numeric": False, "allowed_empty": False},
-        {"column": "measurement_unit", "is_numeric": False, "allowed_empty": False},
-        {"column": "weight_per_unit", "is_numeric": True, "allowed_empty": True},
-        {"column": "protein_per_100g", "is_numeric": True, "allowed_empty": False},
-        {"column": "fat_per_100g", "is_numeric": True, "allowed_empty": False},
-        {"column": "carbohydrates_per_100g", "is_numeric": True, "allowed_empty": False},
-        {"column": "calories_per_100g", "is_numeric": True, "allowed_empty": False},
-        {"column": "alcohol_percentage", "is_numeric": True, "allowed_empty": False},
-    ]
-)
+# Derivable columns may all be left empty in the row of an ingredient made from a component recipe
+# (a ``recipe_reference``): the build computes them from that recipe instead.
+CSV_SCHEMA = [
+    {"column": "name", "is_numeric": False, "allowed_empty": False, "derivable": False},
+    {"column": "measurement_unit", "is_numeric": False, "allowed_empty": False, "derivable": False},
+    {"column": "weight_per_unit", "is_numeric": True, "allowed_empty": True, "derivable": False},
+    {"column": "protein_per_100g", "is_numeric": True, "allowed_empty": False, "derivable": True},
+    {"column": "fat_per_100g", "is_numeric": True, "allowed_empty": False, "derivable": True},
+    {"column": "carbohydrates_per_100g", "is_numeric": True, "allowed_empty": False, "derivable": True},
+    {"column": "calories_per_100g", "is_numeric": True, "allowed_empty": False, "derivable": True},
+    {"column": "alcohol_percentage", "is_numeric": True, "allowed_empty": False, "derivable": True},
+]
+DERIVABLE_COLUMNS = [str(col["column"]) for col in CSV_SCHEMA if col["derivable"]]
+DERIVED_MACRO_TOLERANCE = 0.05  # relative difference between a row's macros and its component recipe's that is still rounding
+
+BASE_UNITS = {"g", "ml", "el_tl"}
 
 
 # ---------------------------------------------------------------------------
@@ -41,19 +63,14 @@ CSV_SCHEMA = pd.DataFrame(
 # ---------------------------------------------------------------------------
 
 
-def fix_csv_spaces(path: Path) -> bool:
+def fix_csv_spaces(catalogue: Catalogue) -> bool:
     """Strip leading/trailing whitespace from every field in the CSV. Returns True if changed."""
-    with path.open(newline="") as f:
-        rows = list(csv.reader(f))
-
+    rows = catalogue.ingredient_rows
     cleaned = [[field.strip() for field in row] for row in rows]
     if cleaned == rows:
         return False
 
-    with path.open("w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerows(cleaned)
-
+    catalogue.write_ingredient_rows(cleaned)
     return True
 
 
@@ -62,95 +79,118 @@ def fix_csv_spaces(path: Path) -> bool:
 # ---------------------------------------------------------------------------
 
 
-def check_required_columns(df: pd.DataFrame, schema: pd.DataFrame) -> list[str]:
+def check_required_columns(header: list[str], schema: list[dict[str, Any]]) -> list[str]:
     """Return issues for any schema columns missing from the CSV."""
-    return [f"Missing required column: '{col}'" for col in schema["column"] if col not in df.columns]
+    return [f"Missing required column: '{col['column']}'" for col in schema if col["column"] not in header]
 
 
-def check_unexpected_columns(df: pd.DataFrame, schema: pd.DataFrame) -> list[str]:
+def check_unexpected_columns(header: list[str], schema: list[dict[str, Any]]) -> list[str]:
     """Return a warning if the CSV contains columns not defined in the schema."""
-    extra = set(df.columns) - set(schema["column"])
+    extra = set(header) - {col["column"] for col in schema}
     if extra:
         return [f"Unexpected columns found: {', '.join(extra)}. Remove them or update the schema if they are intentional."]
     return []
 
 
-def check_missing_values(df: pd.DataFrame, schema: pd.DataFrame) -> list[str]:
-    """Return issues for empty values in columns that do not allow them."""
-    issues = []
-    for _, row in schema.iterrows():
-        col = row["column"]
-        if row["allowed_empty"] or col not in df.columns:
-            continue
-        missing = df[df[col].isnull() | (df[col].astype(str).str.strip() == "")]
-        for i, r in missing.iterrows():
-            issues.append(f"Line {i + 2}: missing value for '{col}' (ingredient '{r.get('name', '?')}')")
-    return issues
-
-
-def check_numeric_columns(df: pd.DataFrame, schema: pd.DataFrame) -> list[str]:
-    """Return issues for non-numeric or negative values in numeric columns."""
-    issues = []
-    for col in schema[schema["is_numeric"]]["column"]:
-        if col not in df.columns:
-            continue
-        non_numeric = df[~df[col].apply(lambda x: str(x).replace(".", "", 1).isdigit() or pd.isna(x))]
-        if not non_numeric.empty:
-            issues.append(f"Column '{col}' contains non-numeric values.")
-        negatives = df[pd.to_numeric(df[col], errors="coerce") < 0]
-        if not negatives.empty:
-            issues.append(f"Column '{col}' contains negative values.")
-    return issues
-
+def _is_number(value: str) -> bool:
+    """Plain non-negative decimals only, like ``12`` or ``0.5``: no sign, exponent or surrounding whitespace."""
+    return value.replace(".", "", 1).isdigit()
 
-def check_measurement_units(df: pd.DataFrame) -> list[str]:
-    """Return issues for non-base units that are missing a weight_per_unit conversion."""
-    if "measurement_unit" not in df.columns:
-        return []
-    base_units = {"g", "ml", "el_tl"}
-    mismatches = df[(~df["measurement_unit"].isin(base_units)) & (df["weight_per_unit"].isnull() | (df["weight_per_unit"] == ""))]
-    return [
-        f"Line {i + 2}: '{row['name']}' uses unit '{row['measurement_unit']}' but has no weight_per_unit conversion."
-        for i, row in mismatches.iterrows()
-    ]
 
+def _is_negative(value: str) -> bool:
+    try:
+        return float(value) < 0
+    except ValueError:
+        return False
 
-def check_lowercase_names(df: pd.DataFrame) -> list[str]:
-    """Return issues for ingredient names containing uppercase letters."""
-    if "name" not in df.columns:
-        return []
-    bad = df[df["name"].astype(str).str.contains(r"[A-Z]", regex=True)]
-    return [f"Ingredient name contains uppercase letters: '{row['name']}'" for _, row in bad.iterrows()]
 
+def check_rows(header: list[str], rows: list[list[str]], schema: list[dict[str, Any]]) -> list[str]:
+    """
+    Validate every data row in a single pass.
 
-def check_duplicate_names(df: pd.DataFrame) -> list[str]:
-    """Return issues for duplicate or missing ingredient names."""
-    if "name" not in df.columns:
-        return ["Missing column: 'name'"]
-    issues = []
-    duplicates = df["name"][df["name"].duplicated()].unique()
-    if len(duplicates):
-        issues.append(f"Duplicate ingredient names found: {', '.join(duplicates)}")
-    if df["name"].isnull().any():
-        issues.append("Some ingredients have no name.")
+    Covers missing values, numeric and negative values, units without a weight_per_unit conversion,
+    uppercase names and duplicate or missing names. Issues are grouped per check, in the order the
+    checks are listed here, and rows are numbered by their line in the file (header = line 1). A row
+    that leaves every derivable column empty is not missing them (see ``check_derived_rows``).
+    """
+    present = [col for col in schema if col["column"] in header]
+    required = [col["column"] for col in present if not col["allowed_empty"]]
+    derivable = {col["column"] for col in present if col["derivable"]}
+    numeric = [col["column"] for col in present if col["is_numeric"]]
+
+    missing: dict[str, list[str]] = {col: [] for col in required}
+    non_numeric: set[str] = set()
+    negative: set[str] = set()
+    unit_issues = []
+    uppercase = []
+    seen: set[str] = set()
+    duplicates: dict[str, None] = {}
+    nameless = False
+
+    for i, row in enumerate(rows):
+        record = dict(zip(header, (field.strip() for field in row)))
+        line = i + 2
+        name = record.get("name", "")
+
+        derived = bool(derivable) and not any(record.get(col) for col in derivable)
+        for col in required:
+            if not record.get(col) and not (derived and col in derivable):
+                missing[col].append(f"Line {line}: missing value for '{col}' (ingredient '{name or '?'}')")
+
+        for col in numeric:
+            value = record.get(col)
+            if not value:
+                continue
+            if not _is_number(value):
+                non_numeric.add(col)
+            if _is_negative(value):
+                negative.add(col)
+
+        unit = record.get("measurement_unit")
+        if "measurement_unit" in header and unit not in BASE_UNITS and not record.get("weight_per_unit"):
+            unit_issues.append(f"Line {line}: '{name}' uses unit '{unit or ''}' but has no weight_per_unit conversion.")
+
+        if re.search(r"[A-Z]", name):
+            uppercase.append(f"Ingredient name contains uppercase letters: '{name}'")
+
+        if not name:
+            nameless = True
+        elif name in seen:
+            duplicates[name] = None
+        seen.add(name)
+
+    issues = [issue for col in required for issue in missing[col]]
+    for col in numeric:
+        if col in non_numeric:
+            issues.append(f"Column '{col}' contains non-numeric values.")
+        if col in negative:
+            issues.append(f"Column '{col}' contains negative values.")
+    issues.extend(unit_issues)
+    issues.extend(uppercase)
+    if "name" not in header:
+        issues.append("Missing column: 'name'")
+    else:
+        if duplicates:
+            issues.append(f"Duplicate ingredient names found: {', '.join(duplicates)}")
+        if nameless:
+            issues.append("Some ingredients have no name.")
     return issues
 
 
-def validate_ingredients_csv(path: Path) -> list[str]:
+def validate_ingredients_csv(catalogue: Catalogue) -> list[str]:
     """Run all CSV checks. Returns a list of issue strings (empty means clean)."""
-    try:
-        df = pd.read_csv(path)
-    except Exception as e:
-        return [f"Could not read CSV: {e}"]
+    header = catalogue.ingredient_header
+    if not header:
+        return ["Could not read CSV: No columns to parse from file"]
+    rows = [row for row in catalogue.ingredient_rows[1:] if row]
+    for i, row in enumerate(rows):
+        if len(row) > len(header):
+            return [f"Could not read CSV: Expected {len(header)} fields in line {i + 2}, saw {len(row)}"]
 
     issues = []
-    issues.extend(check_required_columns(df, CSV_SCHEMA))
-    issues.extend(check_unexpected_columns(df, CSV_SCHEMA))
-    issues.extend(check_missing_values(df, CSV_SCHEMA))
-    issues.extend(check_numeric_columns(df, CSV_SCHEMA))
-    issues.extend(check_measurement_units(df))
-    issues.extend(check_lowercase_names(df))
-    issues.extend(check_duplicate_names(df))
+    issues.extend(check_required_columns(header, CSV_SCHEMA))
+    issues.extend(check_unexpected_columns(header, CSV_SCHEMA))
+    issues.extend(check_rows(header, rows, CSV_SCHEMA))
     return issues
 
 
@@ -159,19 +199,36 @@ def validate_ingredients_csv(path: Path) -> list[str]:
 # ---------------------------------------------------------------------------
 
 
-def _load_known_ingredients(path: Path) -> set[str]:
+def _load_known_ingredients(catalogue: Catalogue) -> set[str]:
     """Return the set of ingredient names from ingredients.csv."""
-    try:
-        df = pd.read_csv(path)
-    except Exception as e:
-        print(f"Cannot read ingredients.csv: {e}")
-        sys.exit(1)
-
-    if "name" not in df.columns:
+    if "name" not in catalogue.ingredient_header:
         print("ingredients.csv is missing the required 'name' column.")
         sys.exit(1)
 
-    return set(df["name"].dropna().astype(str).str.strip())
+    return {name.strip() for record in catalogue.ingredient_records() if (name := record["name"])}
+
+
+def _derived_only_ingredients(records: list[dict[str, Any]]) -> set[str]:
+    """The names of the rows that leave every ``DERIVABLE_COLUMNS`` value to a component recipe."""
+    return {name for record in records if (name := record["name"]) and not any(record.get(col) for col in DERIVABLE_COLUMNS)}
+
+
+def _known_in_store(catalogue: Catalogue, names: set[str]) -> set[str]:
+    """Those of ``names`` that are in the catalogue's ingredient store, found in batched lookups."""
+    return {record["name"] for record in catalogue.lookup_ingredients(names)}
+
+
+def _referenced_ingredients(paths: list[Path], cache: RecipeCache | None = None) -> set[str]:
+    """The ingredient names used by the recipes in ``paths`` that parse. Parsed through ``cache`` when given, which keeps the parse."""
+    names: set[str] = set()
+    for path in paths:
+        try:
+            data = cache.load(path) if cache else parse_yaml(path.read_bytes())
+        except Exception:
+            continue  # reported by the YAML validator
+        if isinstance(data, dict):
+            names.update(item["name"] for item in _get_flat_ingredients(data) if isinstance(item, dict) and isinstance(item.get("name"), str))
+    return names
 
 
 def _check_ingredient_entry(item: Any, location: str) -> list[str]:
@@ -208,7 +265,7 @@ def _get_flat_ingredients(data: dict) -> list[dict]:
     return data.get("ingredients", [])
 
 
-def check_recipe(file: Path, known: set[str]) -> list[str]:
+def check_recipe(file: Path, known: set[str], cache: RecipeCache | None = None, suggestions: SuggestionIndex | None = None) -> list[str]:
     """
     Validate a single recipe YAML against the expected schema.
 
@@ -218,16 +275,22 @@ def check_recipe(file: Path, known: set[str]) -> list[str]:
     - description and steps are the correct types when present
     - dietary_labels only contains known values
     - exactly one of 'ingredients', 'components', or 'variants' is present, with valid entries
-    - all ingredient names exist in ingredients.csv
+    - all ingredient names exist in ingredients.csv (suggesting the closest ones from ``suggestions`` if not),
+      except on lines made from a component recipe (``recipe_reference``)
+
+    The YAML is read through ``cache`` when given, so unchanged files are not parsed again.
     """
     loc = str(file)
 
     try:
-        with file.open() as f:
-            data = yaml.safe_load(f)
+        data = cache.load(file) if cache else parse_yaml(file.read_bytes())
     except Exception as e:
         return [f"{loc}: could not parse YAML: {e}"]
+    return check_recipe_data(loc, data, known, suggestions)
+
 
+def check_recipe_data(loc: str, data: Any, known: set[str], suggestions: SuggestionIndex | None = None) -> list[str]:
+    """The checks of ``check_recipe`` on already parsed YAML; ``loc`` prefixes every issue."""
     if not isinstance(data, dict):
         return [f"{loc}: expected a YAML mapping at the top level"]
 
@@ -334,39 +397,399 @@ def check_recipe(file: Path, known: set[str]) -> list[str]:
 
     for item in _get_flat_ingredients(data):
         name = item.get("name") if isinstance(item, dict) else None
-        if name and name not in known:
-            issues.append(f"{loc}: ingredient '{name}' not found in ingredients.csv")
+        if name and name not in known and not item.get("recipe_reference"):
+            issue = f"{loc}: ingredient '{name}' not found in ingredients.csv"
+            matches = suggestions.suggest(name) if suggestions and isinstance(name, str) else []
+            if matches:
+                issue += "; did you mean " + ", ".join(f"'{match}'" for match in matches) + "?"
+            issues.append(issue)
+
+    return issues
+
+
+# ---------------------------------------------------------------------------
+# Ingredient typo fixer
+# ---------------------------------------------------------------------------
+
+YAML_NAME_LINE = r"^([ \t]*(?:-[ \t]+)?name:[ \t]*){value}([ \t]*(?:#.*)?)$"
+
+
+def _yaml_scalars(value: str) -> list[str]:
+    """The ways ``value`` is written as a YAML scalar in the recipe files: single-quoted, double-quoted and plain."""
+    return ["'" + value.replace("'", "''") + "'", json.dumps(value, ensure_ascii=False), value]
+
+
+def _rename_ingredients(data: Any, renames: dict[str, str]) -> Any:
+    """A copy of the parsed recipe ``data`` with the ingredient names in ``renames`` replaced."""
+    renamed = copy.deepcopy(data)
+    for item in _get_flat_ingredients(renamed):
+        if isinstance(item, dict) and item.get("name") in renames:
+            item["name"] = renames[item["name"]]
+    return renamed
+
+
+def fix_ingredient_typos(
+    paths: list[Path], known: set[str], suggestions: SuggestionIndex, cache: RecipeCache | None = None
+) -> dict[Path, dict[str, str]]:
+    """
+    Correct the unknown ingredient references in ``paths`` that are an unambiguous typo of a known name
+    (``SuggestionIndex.correction``). Only the ``name:`` lines are edited, keeping comments and layout,
+    and a file is only written if the edited YAML parses to the recipe with the corrected names.
+    Returns the corrections made, by file.
+    """
+    fixed = {}
+    for path in paths:
+        try:
+            data = cache.load(path) if cache else parse_yaml(path.read_bytes())
+        except Exception:
+            continue  # reported by the YAML validator
+        if not isinstance(data, dict):
+            continue
+        renames = {}
+        for item in _get_flat_ingredients(data):
+            name = item.get("name") if isinstance(item, dict) else None
+            if isinstance(name, str) and name not in known and not item.get("recipe_reference") and (correction := suggestions.correction(name)):
+                renames[name] = correction
+        if not renames:
+            continue
+
+        text = path.read_text(encoding="utf-8")
+        for name, correction in renames.items():
+            for written, replacement in zip(_yaml_scalars(name), _yaml_scalars(correction)):
+                pattern = re.compile(YAML_NAME_LINE.format(value=re.escape(written)), re.MULTILINE)
+                text = pattern.sub(lambda match: match.group(1) + replacement + match.group(2), text)
+        try:
+            matches = parse_yaml(text) == _rename_ingredients(data, renames)
+        except Exception:
+            matches = False
+        if matches:
+            path.write_text(text, encoding="utf-8")
+            fixed[path] = renames
+    return fixed
+
+
+def check_unused_ingredients(known: set[str], used: set[str]) -> list[str]:
+    """Return warnings for ingredients.csv rows that no recipe uses."""
+    return [f"Warning: ingredient '{name}' in ingredients.csv is not used by any recipe" for name in sorted(known) if name not in used]
+
+
+def check_recipe_references(recipes: dict[Path, Recipe], others: dict[str, set[str]] | None = None) -> list[str]:
+    """
+    Check the ``recipe_reference`` lines of the given recipes: each must name a recipe file
+    (by filename without extension) and the references must not form a cycle. ``others`` holds the
+    references (recipe stem -> referenced stems) of valid recipes that were not re-checked this run.
+    """
+    graph: dict[str, set[str]] = dict(others or {})
+    stems = graph.keys() | {path.stem for path in recipes}
+    issues = []
+    for path, recipe in recipes.items():
+        graph[path.stem] = set()
+        for name, reference in recipe.references():
+            if reference in stems:
+                graph[path.stem].add(reference)
+            else:
+                issues.append(f"{path}: ingredient '{name}' references unknown recipe '{reference}'")
+    try:
+        dependency_levels(graph)
+    except ReferenceCycleError as e:
+        issues.append(str(e))
+    return issues
+
 
+def check_derived_rows(recipes: dict[Path, Recipe], derived_only: set[str]) -> list[str]:
+    """Ingredients whose row leaves its macros to a component recipe (see ``CSV_SCHEMA``) may only be used with a ``recipe_reference``."""
+    issues = []
+    for path, recipe in recipes.items():
+        for name in sorted({line.name for _, _, line in recipe.lines() if line.name in derived_only and not line.recipe_reference}):
+            issues.append(f"{path}: ingredient '{name}' has no macros in ingredients.csv; fill them in or add a recipe_reference")
     return issues
 
 
+def _macro_summary(ingredient: Ingredient) -> str:
+    return f"{ingredient.calories:g} kcal, {ingredient.protein:g} g protein, {ingredient.fat:g} g fat, {ingredient.carbohydrates:g} g carbohydrates"
+
+
+def check_derived_macros(recipes: dict[Path, Recipe], ingredients: dict[str, Ingredient], derived_only: set[str]) -> list[str]:
+    """
+    Warn about ingredients.csv rows with macros of their own (not in ``derived_only``) that disagree,
+    beyond ``DERIVED_MACRO_TOLERANCE``, with the component recipe their ``recipe_reference`` lines are
+    computed from (see ``derived_ingredients``); the build uses the computed ones. Only references
+    between the given recipes are compared.
+    """
+    from generate_static_website import derived_ingredients
+
+    try:
+        derived = derived_ingredients({path.stem: recipe for path, recipe in recipes.items()}, ingredients)
+    except ReferenceCycleError:
+        return []  # reported by check_recipe_references
+    warnings = []
+    for (name, reference), row in sorted(derived.items(), key=lambda item: item[0]):
+        csv_row = ingredients.get(name)
+        if csv_row is None or name in derived_only:
+            continue
+        if not all(math.isclose(own, computed, rel_tol=DERIVED_MACRO_TOLERANCE, abs_tol=1) for own, computed in zip(csv_row.macros, row.macros)):
+            warnings.append(
+                f"Warning: ingredient '{name}' in ingredients.csv has {_macro_summary(csv_row)} per 100 g, but recipe '{reference}' "
+                f"works out to {_macro_summary(row)}; leave its macro columns empty to use the computed values"
+            )
+    return warnings
+
+
+# ---------------------------------------------------------------------------
+# Changed-files mode
+# ---------------------------------------------------------------------------
+
+
+def load_usage_index(path: Path = USAGE_INDEX_FILE) -> dict[str, dict[str, list[str]]] | None:
+    """
+    The usage index written by the previous run: recipe path -> ``{"ingredients", "references"}`` for
+    every recipe that passed. None when there is no (current) index yet.
+    """
+    try:
+        index = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    return index["recipes"] if index.get("version") == USAGE_INDEX_VERSION else None
+
+
+def save_usage_index(recipes: dict[str, dict[str, list[str]]], path: Path = USAGE_INDEX_FILE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps({"version": USAGE_INDEX_VERSION, "recipes": recipes}, sort_keys=True))
+    tmp_path.replace(path)
+
+
+def _usage_entry(recipe: Recipe) -> dict[str, list[str]]:
+    return {
+        "ingredients": sorted({line.name for _, _, line in recipe.lines()}),
+        "references": sorted({reference for _, reference in recipe.references()}),
+    }
+
+
+def git_changed_files() -> list[str] | None:
+    """Paths changed relative to HEAD (staged or not), or None outside a git checkout."""
+    try:
+        result = subprocess.run(["git", "diff", "--name-only", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.splitlines()
+
+
+def affected_recipes(changed: list[str], index: dict[str, dict[str, list[str]]], known: set[str], recipe_paths: list[Path]) -> list[Path]:
+    """
+    The recipes to re-check for a change to ``changed``: the changed recipe files themselves, indexed
+    recipes that use an ingredient no longer in ingredients.csv (removed or renamed rows), and those
+    that reference a recipe that no longer exists.
+    """
+    existing = {str(path): path for path in recipe_paths}
+    stems = {path.stem for path in recipe_paths}
+    targets = {existing[key] for key in (str(Path(file)) for file in changed) if key in existing}
+    for key, entry in index.items():
+        if key in existing and not (known.issuperset(entry["ingredients"]) and stems.issuperset(entry["references"])):
+            targets.add(existing[key])
+    targets.update(path for key, path in existing.items() if key not in index)  # new since the last run
+    return sorted(targets)
+
+
+# ---------------------------------------------------------------------------
+# Recipe validation
+# ---------------------------------------------------------------------------
+
+_worker_known: set[str] = set()
+_worker_suggestions: SuggestionIndex | None = None
+
+
+def _init_worker(known: set[str], suggestions: SuggestionIndex | None = None) -> None:
+    global _worker_known, _worker_suggestions
+    _worker_known, _worker_suggestions = known, suggestions
+
+
+def _parse_and_check(task: tuple[str, bytes]) -> tuple[list[str], Any, bool]:
+    """Parse and validate one recipe file; returns its issues, the parsed YAML and whether parsing succeeded."""
+    loc, raw = task
+    try:
+        data = parse_yaml(raw)
+    except Exception as e:
+        return [f"{loc}: could not parse YAML: {e}"], None, False
+    return check_recipe_data(loc, data, _worker_known, _worker_suggestions), data, True
+
+
+def check_recipes(
+    paths: list[Path], known: set[str], cache: RecipeCache | None = None, jobs: int = 1, suggestions: SuggestionIndex | None = None
+) -> tuple[list[str], dict[Path, Recipe]]:
+    """
+    Validate recipe files. Files the cache still holds are checked in-process; the others are parsed
+    and checked in ``jobs`` worker processes when there are at least ``PARALLEL_MIN_FILES`` of them.
+    Returns the issues (in path order) and every recipe that passed, as a ``Recipe``.
+    """
+    results: dict[Path, tuple[list[str], Any]] = {}
+    misses: list[tuple[Path, CacheLookup]] = []
+    for path in paths:
+        lookup = cache.lookup(path) if cache else read_recipe_file(path)
+        if lookup.raw is None:
+            with profiler.span("check recipe", recipe=path.as_posix()):
+                results[path] = check_recipe_data(str(path), lookup.data, known, suggestions), lookup.data
+        else:
+            misses.append((path, lookup))
+
+    tasks = [(str(path), lookup.raw or b"") for path, lookup in misses]
+    if jobs > 1 and len(tasks) >= PARALLEL_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(known, suggestions)) as pool:
+            checked = list(pool.map(_parse_and_check, tasks, chunksize=max(1, len(tasks) // (jobs * 4))))
+    else:
+        _init_worker(known, suggestions)
+        checked = []
+        for task in tasks:
+            with profiler.span("check recipe", recipe=Path(task[0]).as_posix()):
+                checked.append(_parse_and_check(task))
+    for (path, lookup), (issues, data, parsed) in zip(misses, checked):
+        if parsed and cache:
+            cache.store(path, lookup, data)
+        results[path] = issues, data
+
+    issues = [issue for path in paths for issue in results[path][0]]
+    recipes = {path: Recipe.from_yaml(data) for path, (path_issues, data) in results.items() if not path_issues}
+    return issues, recipes
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
 
-def main() -> int:
-    csv_fixed = fix_csv_spaces(INGREDIENTS_CSV)
+def run_checks(catalogue: Catalogue, changed: list[str] | None = None, jobs: int = 1, fix: bool = False) -> int:
+    """
+    Run all three jobs against an already loaded catalogue. Returns the process exit code.
+
+    With ``changed`` (paths relative to the working directory), only the recipes affected by those
+    changes are validated, using the usage index of the previous run; without an index every recipe is.
+    With ``fix``, unambiguous ingredient typos in those recipes are corrected before they are validated.
+    A catalogue with an ingredient store has the recipes' ingredient references looked up in it; its
+    targets are then parsed up front (through the recipe cache when it is used) to collect them.
+    """
+    with profiler.span("fix csv"):
+        csv_fixed = fix_csv_spaces(catalogue)
     if csv_fixed:
         print("Stripped whitespace from ingredients.csv — file modified, please re-stage it.")
 
-    csv_issues = validate_ingredients_csv(INGREDIENTS_CSV)
+    with profiler.span("validate csv"):
+        csv_issues = validate_ingredients_csv(catalogue)
     for issue in csv_issues:
         print(issue)
 
-    known = _load_known_ingredients(INGREDIENTS_CSV)
-    yaml_issues = []
-    for file in RECIPES_DIR.rglob("*.yaml"):
-        yaml_issues.extend(check_recipe(file, known))
+    curated = _load_known_ingredients(catalogue)
+    recipe_paths = [recipe_file.path for recipe_file in catalogue.recipe_files]
+    index = load_usage_index() if changed is not None else None
+    # With an ingredient store only the names the recipes use are looked up: those of the indexed recipes now, of the targets below.
+    known = (
+        curated
+        if catalogue.store is None
+        else _known_in_store(catalogue, {name for entry in (index or {}).values() for name in entry["ingredients"]})
+    )
+    if changed is None or index is None:
+        if changed is not None:
+            print("No usage index from a previous run yet, checking every recipe.")
+        index, targets = {}, recipe_paths
+    else:
+        with profiler.span("affected recipes"):
+            targets = affected_recipes(changed, index, known, recipe_paths)
+        existing = {str(path) for path in recipe_paths}
+        index = {key: entry for key, entry in index.items() if key in existing}
+
+    # A handful of changed files is parsed directly: loading the whole recipe cache would take longer.
+    cache = catalogue.cache if len(targets) >= CACHE_MIN_FILES else None
+    if catalogue.store is not None:
+        with profiler.span("ingredient lookups"):
+            known |= _known_in_store(catalogue, _referenced_ingredients(targets, cache))
+    suggestions = SuggestionIndex(known if catalogue.store is None else catalogue.ingredient_names())
+    recipes_fixed = {}
+    if fix:
+        with profiler.span("fix ingredient typos"):
+            recipes_fixed = fix_ingredient_typos(targets, known, suggestions, cache)
+    for path, renames in recipes_fixed.items():
+        known.update(renames.values())
+        corrections = ", ".join(f"'{name}' -> '{correction}'" for name, correction in renames.items())
+        print(f"{path}: corrected {corrections} — file modified, please re-stage it.")
+    yaml_issues, recipes = check_recipes(targets, known, cache, jobs, suggestions)
+    catalogue.save()
+    for path in targets:
+        index.pop(str(path), None)
+    others = {os.path.splitext(os.path.basename(key))[0]: set(entry["references"]) for key, entry in index.items()}
+    index.update((str(path), _usage_entry(recipe)) for path, recipe in recipes.items())
+    with profiler.span("recipe references"):
+        yaml_issues.extend(check_recipe_references(recipes, others))
+    with profiler.span("derived rows"):
+        rows = catalogue.lookup_ingredients({line.name for recipe in recipes.values() for _, _, line in recipe.lines()})
+        derived_only = _derived_only_ingredients(rows)
+        yaml_issues.extend(check_derived_rows(recipes, derived_only))
+        derived_warnings = check_derived_macros(recipes, {row["name"]: Ingredient.from_row(row) for row in rows}, derived_only)
+    save_usage_index(index)
     for issue in yaml_issues:
         print(issue)
 
-    if csv_fixed or csv_issues or yaml_issues:
+    # Unused rows and stale macros of component-recipe rows are reported but do not fail the hook: ingredients may be kept for archived recipes.
+    used = {name for entry in index.values() for name in entry["ingredients"]}
+    for warning in check_unused_ingredients(curated, used) + derived_warnings:
+        print(warning)
+
+    if csv_fixed or recipes_fixed or csv_issues or yaml_issues:
         return 1
 
-    print("All checks passed.")
+    print(f"All checks passed ({len(targets)} of {len(recipe_paths)} recipes checked)." if len(targets) < len(recipe_paths) else "All checks passed.")
     return 0
 
 
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate ingredients.csv and the recipe YAML files.")
+    parser.add_argument("files", nargs="*", help="changed files, as passed by pre-commit (used with --changed)")
+    parser.add_argument(
+        "--changed",
+        action="store_true",
+        help="only check recipes affected by FILES (default: files changed since HEAD), using the usage index of the previous run",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help=f"parse recipes in N worker processes when at least {PARALLEL_MIN_FILES} need parsing (default: CPU count)",
+    )
+    parser.add_argument(
+        "--ingredient-store",
+        nargs="?",
+        const=str(STORE_FILE),
+        metavar="FILE",
+        help=f"look ingredients up in an SQLite ingredient store kept in sync with ingredients.csv (default: {STORE_FILE})",
+    )
+    parser.add_argument(
+        "--fix",
+        action="store_true",
+        help="correct ingredient references that are an unambiguous typo of a name in ingredients.csv, in place",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_TRACE_FILE,
+        metavar="TRACE",
+        help=f"time every check, print a summary and write a Chrome trace (default: {DEFAULT_TRACE_FILE})",
+    )
+    args = parser.parse_args()
+    profiler.enabled = bool(args.profile)
+
+    changed = None
+    if args.changed:
+        changed = args.files or git_changed_files()
+
+    with profiler.span("checks"):
+        with profiler.span("load catalogue"):
+            catalogue = Catalogue(RECIPES_DIR, INGREDIENTS_CSV, store_file=Path(args.ingredient_store) if args.ingredient_store else None)
+        exit_code = run_checks(catalogue, changed, args.jobs, args.fix)
+    if args.profile:
+        profiler.write_trace(args.profile)
+        print(profiler.summary())
+        print(f"Trace written to {args.profile}")
+    return exit_code
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Deploy the generated site to the ``$web`` container of an Azure Storage static website.
+
+Every blob of the site gets a deploy key: a hash of the bytes uploaded for it (``deploy_key``) and of
+the headers it is served with. The keys of the last deployment are stored in a deploy manifest, in a private container next
+to the site's (``--manifest-container``, one blob per site container, see ``manifest_blob``) so that
+it is not served with the site. A deploy diffs the local keys against that manifest instead of
+listing the container: blobs whose key changed are uploaded, blobs that are gone are deleted and
+the new manifest is written last. An interrupted deploy therefore leaves the old manifest in place
+and the next one redoes its work.
+
+Compressible files are uploaded as their precompressed ``.gz`` sibling with ``Content-Encoding: gzip``
+(static website hosting cannot negotiate encodings and every browser accepts gzip); the siblings
+are not uploaded themselves. Fingerprinted assets are cached for a year, other files revalidate.
+Assets and other non-page files are uploaded before the pages that link them, and deletes come last.
+
+Uploads and deletes run in ``--workers`` threads sharing one client whose HTTP session pools that many
+connections. Requires the optional ``azure-storage-blob`` package (``pip install .[deploy]``). To try a
+deploy end to end against the Azurite emulator:
+
+    npx azurite-blob --inMemoryPersistence &
+    python deploy.py --connection-string UseDevelopmentStorage=true --create-container
+
+Usage: python deploy.py [--connection-string CONN] [--container '$web'] [--manifest-container nomstats-deploy]
+                        [--workers 16] [--full] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from asset_bundle import ASSET_URL_DIR, COMPRESSED_SUFFIXES
+from generate_static_website import OUTPUT_DIR
+
+if TYPE_CHECKING:
+    from azure.storage.blob import BlobServiceClient, ContainerClient
+
+DEFAULT_CONTAINER = "$web"
+DEFAULT_MANIFEST_CONTAINER = "nomstats-deploy"
+DEPLOY_MANIFEST_VERSION = 1
+DEFAULT_WORKERS = 16
+
+CONTENT_TYPES = {
+    ".html": "text/html; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".json": "application/json",
+    ".ndjson": "application/x-ndjson",
+    ".csv": "text/csv; charset=utf-8",
+    ".parquet": "application/vnd.apache.parquet",
+    ".svg": "image/svg+xml",
+    ".ico": "image/x-icon",
+    ".png": "image/png",
+    ".webmanifest": "application/manifest+json",
+}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"  # served from cache only after an ETag check
+FINGERPRINTED = re.compile(rf"^{re.escape(ASSET_URL_DIR)}/[^/]+\.[0-9a-f]{{8}}\.[a-z]+$")
+
+
+@dataclass(frozen=True)
+class SiteBlob:
+    name: str  # blob name, the path relative to the site root
+    path: str  # file whose bytes are uploaded: the .gz sibling when content_encoding is set
+    content_type: str
+    content_encoding: str | None
+    cache_control: str
+    key: str
+
+
+def deploy_key(path: str, content_type: str, content_encoding: str | None, cache_control: str) -> str:
+    """The deploy key of a blob uploaded from ``path``: a hash of the bytes uploaded and the headers set."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return hashlib.sha256(json.dumps([digest.hexdigest(), content_type, content_encoding, cache_control]).encode()).hexdigest()
+
+
+def site_blobs(site_dir: str = OUTPUT_DIR) -> dict[str, SiteBlob]:
+    """The blobs the site in ``site_dir`` consists of, by name."""
+    blobs = {}
+    for root, _, filenames in os.walk(site_dir):
+        for filename in filenames:
+            if filename.endswith(COMPRESSED_SUFFIXES):
+                continue
+            path = os.path.join(root, filename)
+            name = os.path.relpath(path, site_dir).replace(os.sep, "/")
+            suffix = os.path.splitext(filename)[1]
+            content_type = CONTENT_TYPES.get(suffix) or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            encoding = "gzip" if os.path.exists(path + ".gz") else None
+            cache_control = IMMUTABLE if FINGERPRINTED.match(name) else REVALIDATE
+            upload_path = path + ".gz" if encoding else path
+            blobs[name] = SiteBlob(
+                name, upload_path, content_type, encoding, cache_control, deploy_key(upload_path, content_type, encoding, cache_control)
+            )
+    return blobs
+
+
+def plan_deploy(local: dict[str, SiteBlob], deployed: dict[str, str]) -> tuple[list[SiteBlob], list[SiteBlob], list[str]]:
+    """
+    Diff the local blobs against the deployed keys. Returns the blobs to upload, split into non-page
+    files and pages (uploaded in that order, so no page links an asset that is not there yet), and
+    the names of the blobs to delete.
+    """
+    changed = [blob for name, blob in sorted(local.items()) if deployed.get(name) != blob.key]
+    files = [blob for blob in changed if not blob.name.endswith(".html")]
+    pages = [blob for blob in changed if blob.name.endswith(".html")]
+    return files, pages, sorted(deployed.keys() - local.keys())
+
+
+def service_client(connection_string: str, workers: int = DEFAULT_WORKERS) -> "BlobServiceClient":
+    """A client for the storage account whose HTTP session keeps up to ``workers`` connections open for reuse."""
+    from azure.core.pipeline.transport import RequestsTransport
+    from azure.storage.blob import BlobServiceClient
+    from requests import Session
+    from requests.adapters import HTTPAdapter
+
+    session = Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    transport = RequestsTransport(session=session, session_owner=False)
+    return BlobServiceClient.from_connection_string(connection_string, transport=transport)
+
+
+def manifest_blob(container: "ContainerClient") -> str:
+    """Name of the deploy manifest of ``container`` in the manifest container."""
+    return f"{container.container_name}.json"
+
+
+def load_deployed(container: "ContainerClient", manifest_container: "ContainerClient") -> dict[str, str] | None:
+    """The blob keys of the last deployment to ``container``, or None when there is no (current) deploy manifest."""
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        manifest = json.loads(manifest_container.download_blob(manifest_blob(container)).readall())
+    except (ResourceNotFoundError, ValueError):
+        return None
+    return manifest["blobs"] if manifest.get("version") == DEPLOY_MANIFEST_VERSION else None
+
+
+def _upload(container: "ContainerClient", blob: SiteBlob) -> int:
+    from azure.storage.blob import ContentSettings
+
+    with open(blob.path, "rb") as f:
+        data = f.read()
+    settings = ContentSettings(content_type=blob.content_type, content_encoding=blob.content_encoding, cache_control=blob.cache_control)
+    container.upload_blob(blob.name, data, overwrite=True, content_settings=settings)
+    return len(data)
+
+
+def _delete(container: "ContainerClient", name: str) -> None:
+    from azure.core.exceptions import ResourceNotFoundError
+
+    try:
+        container.delete_blob(name)
+    except ResourceNotFoundError:
+        pass
+
+
+def deploy(
+    container: "ContainerClient",
+    manifest_container: "ContainerClient",
+    local: dict[str, SiteBlob],
+    workers: int = DEFAULT_WORKERS,
+    full: bool = False,
+    dry_run: bool = False,
+) -> tuple[int, int, int, int]:
+    """
+    Bring ``container`` in line with ``local`` and record the deployment in ``manifest_container``.
+    Without a deploy manifest, or with ``full``, the container is listed and every blob is uploaded
+    (and anything else in it, such as a manifest an older deploy.py kept there, deleted). Returns the
+    number of blobs uploaded, bytes uploaded, blobs deleted and blobs left unchanged.
+    """
+    deployed = None if full else load_deployed(container, manifest_container)
+    if deployed is None:
+        # Nothing is known about the container: treat every existing blob as stale.
+        deployed = {blob.name: "" for blob in container.list_blobs()}
+    files, pages, deletes = plan_deploy(local, deployed)
+    if dry_run:
+        for blob in files + pages:
+            print(f"upload {blob.name} ({blob.content_type}{', ' + blob.content_encoding if blob.content_encoding else ''})")
+        for name in deletes:
+            print(f"delete {name}")
+        return len(files) + len(pages), sum(os.path.getsize(blob.path) for blob in files + pages), len(deletes), len(local) - len(files) - len(pages)
+
+    uploaded_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for batch in (files, pages):
+            uploaded_bytes += sum(pool.map(lambda blob: _upload(container, blob), batch))
+        list(pool.map(lambda name: _delete(container, name), deletes))
+    manifest = {"version": DEPLOY_MANIFEST_VERSION, "blobs": {name: blob.key for name, blob in sorted(local.items())}}
+    manifest_container.upload_blob(manifest_blob(container), json.dumps(manifest, sort_keys=True).encode(), overwrite=True)
+    return len(files) + len(pages), uploaded_bytes, len(deletes), len(local) - len(files) - len(pages)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--connection-string",
+        default=os.environ.get("AZURE_STORAGE_CONNECTION_STRING"),
+        help="storage account connection string (default: $AZURE_STORAGE_CONNECTION_STRING); UseDevelopmentStorage=true targets Azurite",
+    )
+    parser.add_argument("--container", default=DEFAULT_CONTAINER, help=f"container to deploy to (default: {DEFAULT_CONTAINER})")
+    parser.add_argument(
+        "--manifest-container",
+        default=DEFAULT_MANIFEST_CONTAINER,
+        help=f"private container holding the deploy manifest, created if missing (default: {DEFAULT_MANIFEST_CONTAINER})",
+    )
+    parser.add_argument("--site-dir", default=OUTPUT_DIR, help=f"directory with the generated site (default: {OUTPUT_DIR})")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, metavar="N", help=f"concurrent requests (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--full", action="store_true", help="ignore the deploy manifest in the container and upload everything")
+    parser.add_argument("--dry-run", action="store_true", help="print what would be uploaded and deleted without changing anything")
+    parser.add_argument("--create-container", action="store_true", help="create the container if it does not exist (e.g. in Azurite)")
+    args = parser.parse_args()
+
+    if not args.connection_string:
+        parser.error("pass --connection-string or set AZURE_STORAGE_CONNECTION_STRING")
+    try:
+        service = service_client(args.connection_string, args.workers)
+    except ImportError:
+        print("deploy.py needs the azure-storage-blob package: pip install .[deploy]")
+        return 1
+    container = service.get_container_client(args.container)
+    manifest_container = service.get_container_client(args.manifest_container)
+    if args.create_container and not container.exists():
+        container.create_container()
+    if not args.dry_run and not manifest_container.exists():
+        manifest_container.create_container()  # without public access
+
+    start = time.perf_counter()
+    local = site_blobs(args.site_dir)
+    uploaded, uploaded_bytes, deleted, unchanged = deploy(container, manifest_container, local, args.workers, args.full, args.dry_run)
+    verb = "would be" if args.dry_run else "were"
+    print(
+        f"{uploaded} blob(s) {verb} uploaded ({uploaded_bytes / 2**20:.1f} MiB), {deleted} deleted, {unchanged} unchanged "
+        f"in {time.perf_counter() - start:.1f} s."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
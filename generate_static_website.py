@@ -1,16 +1,63 @@
+import argparse
 import csv
+import filecmp
+import hashlib
+import json
 import os
 import re
-from typing import Any, Dict, List, Tuple
+import shutil
+import sys
+from collections import deque
+from contextlib import nullcontext
+from dataclasses import astuple, replace
+from functools import partial
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Set, Tuple
 
-import yaml
-from jinja2 import Environment, FileSystemLoader
+from asset_bundle import ASSET_SOURCE_DIR, ASSET_URL_DIR, build_assets, precompress
+from catalogue import Catalogue, dependency_levels, ingredient_usages, recipe_references
+from ingredient_store import STORE_FILE
+from models import MACROS, Component, Ingredient, Recipe, RecipeIngredient
+from nutrition_export import EXPORT_VERSION, LINE_FIELDS, RECIPE_API_DIR, VARIANT_FIELDS, ExportWriter, api_json, recipe_api_path
+from profiling import DEFAULT_TRACE_FILE, T, collect, profiler
+from recipe_cache import CACHE_DIR, RecipeCache, parse_yaml
+from search_index import SEARCH_INDEX_FILE, build_search_index
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor, Future
+
+    import numpy as np
+    from jinja2 import BaseLoader, BytecodeCache, Environment
 
 TEMPLATE_DIR = "templates"
 OUTPUT_DIR = "static_site"
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), "configuration")
 INGREDIENTS_FILE = os.path.join(CONFIG_DIR, "ingredients.csv")
-env = Environment(loader=FileSystemLoader(TEMPLATE_DIR))
+USAGE_INDEX_FILE = "ingredient_usage.json"
+CATEGORY_DIR = "categories"
+MANIFEST_FILE = os.path.join(CACHE_DIR, "build_manifest.json")
+MANIFEST_VERSION = 8
+JINJA_CACHE_DIR = os.path.join(CACHE_DIR, "jinja")
+COMPILED_TEMPLATES_DIR = os.path.join(CACHE_DIR, "compiled_templates")
+COMPILED_SOURCES_FILE = "sources.json"  # template hashes the compiled modules were built from
+STATIC_FILES = ("404.html", "icons")  # maintained by hand in OUTPUT_DIR and copied into the other targets
+
+
+class SiteTarget(NamedTuple):
+    """A flavour of the site, rendered from the same computed recipes as the other flavours."""
+
+    name: str
+    template_dir: str
+    output_dir: str
+    spoons: Optional[Tuple[str, str]]  # labels of el_tl quantities (tablespoons, teaspoons), or None to give them in grams
+
+
+TARGETS = {
+    "nl": SiteTarget("nl", TEMPLATE_DIR, OUTPUT_DIR, ("eetlepel(s)", "theelepel(s)")),
+    "en": SiteTarget("en", "templates_en", "static_site_en", ("tablespoon(s)", "teaspoon(s)")),
+    "print": SiteTarget("print", "templates_print", "static_site_print", None),
+}
+DEFAULT_TARGET = "nl"
 
 
 def _fmt_number(value):
@@ -21,147 +68,239 @@ def _fmt_number(value):
         return value
 
 
-env.filters["fmt"] = _fmt_number
-
-
 def slugify(name: str) -> str:
     return re.sub(r"[^a-z0-9-]", "", name.lower().replace(" ", "-"))
 
 
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-    print(f"'{OUTPUT_DIR}' didn't exist yet, folder created! Moving on...")
+def _environment(loader: "BaseLoader", bytecode_cache: "Optional[BytecodeCache]" = None, target: str = DEFAULT_TARGET) -> "Environment":
+    from jinja2 import Environment
 
+    environment = Environment(loader=loader, bytecode_cache=bytecode_cache)
+    environment.filters["fmt"] = _fmt_number
+    environment.filters["display"] = partial(display_ingredient, spoons=TARGETS[target].spoons)
+    return environment
 
-def load_ingredients_csv(ingredients_file: str) -> dict:
-    ingredients = {}
+
+def _compiled_template_hashes(compiled_dir: str) -> Optional[Dict[str, str]]:
+    try:
+        with open(os.path.join(compiled_dir, COMPILED_SOURCES_FILE)) as f:
+            hashes: Dict[str, str] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return hashes
+
+
+_envs: "Dict[str, Environment]" = {}
+_envs_compiled_from: Dict[str, Dict[str, str]] = {}  # template hashes of the precompiled modules an environment loads, by target
+
+
+def _compiled_dir(target: str) -> str:
+    return COMPILED_TEMPLATES_DIR if target == DEFAULT_TARGET else f"{COMPILED_TEMPLATES_DIR}_{target}"
+
+
+def get_env(target: str = DEFAULT_TARGET) -> "Environment":
+    """
+    The Jinja environment of a ``TARGETS`` flavour, created on first use so that importing this
+    module has no side effects.
+
+    Templates load from the modules ``precompile_templates`` wrote when those were compiled from
+    the current sources. Otherwise they are compiled from the target's template directory through a
+    bytecode cache in ``JINJA_CACHE_DIR``; Jinja checks each cached entry against the template
+    source's checksum, so an edited template is recompiled and the others are not.
+    """
+    if target not in _envs:
+        from jinja2 import FileSystemBytecodeCache, FileSystemLoader, ModuleLoader
+
+        template_dir = TARGETS[target].template_dir
+        compiled = _compiled_template_hashes(_compiled_dir(target))
+        if compiled is not None and compiled == load_template_hashes(template_dir):
+            _envs[target], _envs_compiled_from[target] = _environment(ModuleLoader(_compiled_dir(target)), target=target), compiled
+        else:
+            os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+            _envs[target] = _environment(FileSystemLoader(template_dir), FileSystemBytecodeCache(JINJA_CACHE_DIR), target)
+    return _envs[target]
+
+
+def precompile_templates(target: str = DEFAULT_TARGET) -> int:
+    """
+    Compile every template of a target into a Python module, which ``get_env`` then loads instead
+    of the sources for as long as they are unchanged. Returns the number of templates compiled.
+    """
+    from jinja2 import FileSystemLoader
+
+    template_dir, compiled_dir = TARGETS[target].template_dir, _compiled_dir(target)
+    shutil.rmtree(compiled_dir, ignore_errors=True)
+    environment = _environment(FileSystemLoader(template_dir), target=target)
+    environment.compile_templates(compiled_dir, zip=None, ignore_errors=False)
+    with open(os.path.join(compiled_dir, COMPILED_SOURCES_FILE), "w") as f:
+        json.dump(load_template_hashes(template_dir), f, sort_keys=True)
+    return len(environment.list_templates())
+
+
+def _sha256(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def ingredient_hashes_from_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, str]:
+    """Hash every ingredients.csv row so pages only rebuild when a row they use changes."""
+    return {row["name"]: _sha256(*row.values()) for row in rows}
+
+
+def load_ingredient_hashes(ingredients_file: str) -> Dict[str, str]:
     with open(ingredients_file, newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ingredients[row["name"]] = {
-                "name": row["name"],
-                "measurement_unit": row["measurement_unit"],
-                "weight_per_unit": float(row["weight_per_unit"]) if row["weight_per_unit"] else 0,
-                "components": [
-                    {
-                        "name": "protein",
-                        "quantity_per_100_g": float(row.get("protein_per_100g", 0) or 0),
-                    },
-                    {
-                        "name": "calories",
-                        "quantity_per_100_g": float(row.get("calories_per_100g", 0) or 0),
-                    },
-                    {
-                        "name": "fat",
-                        "quantity_per_100_g": float(row.get("fat_per_100g", 0) or 0),
-                    },
-                    {
-                        "name": "carbohydrates",
-                        "quantity_per_100_g": float(row.get("carbohydrates_per_100g", 0) or 0),
-                    },
-                ],
-                "alcohol_percentage": float(row["alcohol_percentage"]) if row.get("alcohol_percentage") else 0,
-            }
-    return ingredients
+        return ingredient_hashes_from_rows(csv.DictReader(f))
+
+
+def load_template_hashes(template_dir: str) -> Dict[str, str]:
+    hashes = {}
+    for name in sorted(os.listdir(template_dir)):
+        with open(os.path.join(template_dir, name), "rb") as f:
+            hashes[name] = _sha256(f.read())
+    return hashes
 
 
-def _get_flat_ingredients(yaml_content: Dict[str, Any]) -> List[Dict[str, Any]]:
-    if "components" in yaml_content:
-        return [i for c in yaml_content["components"] for i in c.get("ingredients", [])]
-    if "variants" in yaml_content:
-        first_variant = next(iter(yaml_content["variants"].values()))
-        if "components" in first_variant:
-            return [i for c in first_variant["components"] for i in c.get("ingredients", [])]
-        return first_variant.get("ingredients", [])
-    return yaml_content.get("ingredients", [])
+def prepare_templates(target: str = DEFAULT_TARGET, asset_dir: str = ASSET_SOURCE_DIR) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, str]]:
+    """
+    Build the asset bundle and expose its URLs to the target's templates as ``assets``. Returns the
+    template hashes, which cover the asset URLs since pages embed them, the asset URLs (for worker
+    processes, see ``_init_worker``) and the asset files to write. An environment loading precompiled templates that no longer match the sources is
+    dropped, so a long-lived process (``serve.py --watch``) picks up template edits.
+    """
+    source_hashes = load_template_hashes(TARGETS[target].template_dir)
+    if target in _envs_compiled_from and _envs_compiled_from[target] != source_hashes:
+        del _envs[target], _envs_compiled_from[target]
+    asset_urls, asset_files = build_assets(asset_dir)
+    get_env(target).globals["assets"] = asset_urls
+    asset_key = json.dumps(asset_urls, sort_keys=True)
+    return {name: _sha256(template_hash, asset_key) for name, template_hash in source_hashes.items()}, asset_urls, asset_files
 
 
-def _grams_to_spoon(grams: float) -> str:
+def _empty_manifest() -> Dict[str, Any]:
+    return {"version": MANIFEST_VERSION, "recipes": {}, "outputs": {}}
+
+
+def load_manifest(path: str) -> Dict[str, Any]:
+    try:
+        with open(path) as f:
+            manifest: Dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return _empty_manifest()
+    if manifest.get("version") != MANIFEST_VERSION:
+        return _empty_manifest()
+    return manifest
+
+
+def save_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def load_ingredients_csv(ingredients_file: str) -> Dict[str, Ingredient]:
+    with open(ingredients_file, newline="") as f:
+        return ingredients_from_rows(csv.DictReader(f))
+
+
+def ingredients_from_rows(rows: Iterable[Dict[str, Any]]) -> Dict[str, Ingredient]:
+    ingredients = {}
+    for row in rows:
+        ingredient = Ingredient.from_row(row)
+        ingredients[ingredient.name] = ingredient
+    return ingredients
+
+
+def _grams_to_spoon(grams: float, labels: Tuple[str, str]) -> str:
     if grams >= 8:
-        amount, unit = round(grams / 8, 2), "eetlepel(s)"
+        amount, unit = round(grams / 8, 2), labels[0]
     else:
-        amount, unit = round(grams / 2, 2), "theelepel(s)"
+        amount, unit = round(grams / 2, 2), labels[1]
     return f"{amount:g} {unit}"
 
 
-def _format_ingredient_display(recipe_ingredient: dict, ingredient: dict) -> dict:
-    quantity = recipe_ingredient.get("quantity", 0)
-    name = recipe_ingredient["name"]
-    weight_per_unit = ingredient.get("weight_per_unit", 0)
-    measurement_unit = ingredient.get("measurement_unit")
-    if measurement_unit == "el_tl":
-        display = f"{_grams_to_spoon(quantity)} {name}"
-    elif weight_per_unit:
-        display = f"{_fmt_number(quantity)} {measurement_unit} {name}"
-    else:
-        display = f"{quantity} {measurement_unit} {name}"
+def display_ingredient(line: Dict[str, Any], spoons: Optional[Tuple[str, str]]) -> str:
+    """
+    An ingredient line of a recipe page as the ``display`` template filter of a target shows it: el_tl
+    quantities in its ``spoons``, or in grams without them.
+    """
+    quantity, unit, name = line["quantity"], line["unit"], line["name"]
+    if unit == "el_tl":
+        return f"{_grams_to_spoon(quantity, spoons)} {name}" if spoons else f"{_fmt_number(quantity)} g {name}"
+    if line["weight_per_unit"]:
+        return f"{_fmt_number(quantity)} {unit} {name}"
+    return f"{quantity} {unit} {name}"
+
+
+def _format_ingredient_display(recipe_ingredient: RecipeIngredient, ingredient: Ingredient) -> dict:
     return {
-        "display": display,
-        "slug": slugify(name),
-        "recipe_reference": recipe_ingredient.get("recipe_reference"),
+        "name": recipe_ingredient.name,
+        "quantity": recipe_ingredient.quantity,
+        "unit": ingredient.measurement_unit,
+        "weight_per_unit": ingredient.weight_per_unit,
+        "slug": slugify(recipe_ingredient.name),
+        "recipe_reference": recipe_ingredient.recipe_reference,
     }
 
 
-def _build_display_components(
-    yaml_content: Dict[str, Any],
-    all_ingredients: Dict[str, Dict[str, Any]],
-) -> List[Dict[str, Any]]:
-    def resolve(ingredient_list):
+def _build_display_components(components: Tuple[Component, ...], all_ingredients: Dict[str, Ingredient]) -> List[Dict[str, Any]]:
+    def resolve(ingredient_list: Tuple[RecipeIngredient, ...]) -> List[Dict[str, Any]]:
         result = []
         for ri in ingredient_list:
-            ingredient = all_ingredients.get(ri["name"])
+            ingredient = _line_ingredient(ri, all_ingredients)
             if ingredient:
                 result.append(_format_ingredient_display(ri, ingredient))
         return result
 
-    if "components" in yaml_content:
-        return [{"name": c["name"], "ingredients": resolve(c.get("ingredients", []))} for c in yaml_content["components"]]
-    return [{"name": None, "ingredients": resolve(yaml_content.get("ingredients", []))}]
+    return [{"name": component.name, "ingredients": resolve(component.ingredients)} for component in components]
+
+
+def _display_components(components: Tuple[Component, ...], all_ingredients: Dict[str, Ingredient]) -> List[Dict[str, Any]]:
+    with profiler.span("display components"):
+        return _build_display_components(components, all_ingredients)
 
 
 def calculate_nutrition(
-    ingredient_list: List[Dict[str, Any]],
-    all_ingredients: Dict[str, Dict[str, Any]],
+    ingredient_list: Sequence[RecipeIngredient],
+    all_ingredients: Dict[str, Ingredient],
 ) -> Tuple[int, int, float, float, int, int, float, float, float]:
-    total_protein = total_calories = total_weight = 0
-    total_alcohol_ml = total_fat = total_carbs = 0
+    total_protein = total_calories = total_fat = total_carbs = 0
+    total_weight: float = 0
+    total_alcohol_ml: float = 0
 
     for recipe_ingredient in ingredient_list:
-        ingredient_name = recipe_ingredient["name"]
-        quantity = recipe_ingredient.get("quantity", 0)
-        ingredient = all_ingredients.get(ingredient_name)
+        quantity = recipe_ingredient.quantity
+        ingredient = all_ingredients.get(recipe_ingredient.name)
 
         if ingredient:
-            weight_per_unit = ingredient.get("weight_per_unit", 0)
-            if weight_per_unit:
-                quantity *= weight_per_unit
+            if ingredient.weight_per_unit:
+                quantity *= ingredient.weight_per_unit
             total_weight += quantity
 
-            protein_per_100g = next(
-                (c["quantity_per_100_g"] for c in ingredient["components"] if c["name"] == "protein"),
-                0,
-            )
-            calories_per_100g = next(
-                (c["quantity_per_100_g"] for c in ingredient["components"] if c["name"] == "calories"),
-                0,
-            )
-            fat_per_100g = next(
-                (c["quantity_per_100_g"] for c in ingredient["components"] if c["name"] == "fat"),
-                0,
-            )
-            carbs_per_100g = next(
-                (c["quantity_per_100_g"] for c in ingredient["components"] if c["name"] == "carbohydrates"),
-                0,
-            )
-            total_protein += round((quantity * protein_per_100g) / 100)
-            total_calories += round((quantity * calories_per_100g) / 100)
-            total_fat += round((quantity * fat_per_100g) / 100)
-            total_carbs += round((quantity * carbs_per_100g) / 100)
-
-            abv = ingredient.get("alcohol_percentage", 0)
+            total_protein += round((quantity * ingredient.protein) / 100)
+            total_calories += round((quantity * ingredient.calories) / 100)
+            total_fat += round((quantity * ingredient.fat) / 100)
+            total_carbs += round((quantity * ingredient.carbohydrates) / 100)
+
+            abv = ingredient.alcohol_percentage
             if abv > 0:
                 total_alcohol_ml += (quantity * abv) / 100
 
+    return _nutrition_totals(total_protein, total_calories, total_fat, total_carbs, total_weight, total_alcohol_ml)
+
+
+def _nutrition_totals(
+    total_protein: int,
+    total_calories: int,
+    total_fat: int,
+    total_carbs: int,
+    total_weight: float,
+    total_alcohol_ml: float,
+) -> Tuple[int, int, float, float, int, int, float, float, float]:
     protein_per_100g = round((total_protein / total_weight) * 100, 1) if total_weight else 0
     calories_per_100g = round((total_calories / total_weight) * 100) if total_weight else 0
     fat_per_100g = round((total_fat / total_weight) * 100, 1) if total_weight else 0
@@ -181,119 +320,1130 @@ def calculate_nutrition(
     )
 
 
+class NutrientTable(NamedTuple):
+    """Columnar view of the ingredient rows: row ``positions[name]`` of every array belongs to that ingredient."""
+
+    positions: Dict[str, int]
+    weight_per_unit: "np.ndarray"
+    macros: "np.ndarray"  # (n_ingredients, 4): protein, calories, fat, carbohydrates per 100 g
+    alcohol_percentage: "np.ndarray"
+
+
+def build_nutrient_table(all_ingredients: Dict[str, Ingredient]) -> NutrientTable:
+    import numpy as np
+
+    ingredients = all_ingredients.values()
+    return NutrientTable(
+        positions={name: i for i, name in enumerate(all_ingredients)},
+        weight_per_unit=np.array([i.weight_per_unit for i in ingredients], dtype=float),
+        macros=np.array([i.macros for i in ingredients], dtype=float).reshape(len(all_ingredients), len(MACROS)),
+        alcohol_percentage=np.array([i.alcohol_percentage for i in ingredients], dtype=float),
+    )
+
+
+def extend_nutrient_table(table: NutrientTable, ingredients: Dict[str, Ingredient]) -> NutrientTable:
+    """``table`` with the ``ingredients`` it does not have yet (rows derived from component recipes) appended."""
+    import numpy as np
+
+    added = {name: ingredient for name, ingredient in ingredients.items() if name not in table.positions}
+    if not added:
+        return table
+    rows = build_nutrient_table(added)
+    offset = len(table.positions)
+    return NutrientTable(
+        positions={**table.positions, **{name: offset + i for name, i in rows.positions.items()}},
+        weight_per_unit=np.concatenate([table.weight_per_unit, rows.weight_per_unit]),
+        macros=np.concatenate([table.macros, rows.macros]),
+        alcohol_percentage=np.concatenate([table.alcohol_percentage, rows.alcohol_percentage]),
+    )
+
+
+def calculate_nutrition_batch(
+    ingredient_lists: Sequence[Sequence[RecipeIngredient]],
+    table: NutrientTable,
+) -> List[Tuple[int, int, float, float, int, int, float, float, float]]:
+    """
+    Vectorised ``calculate_nutrition`` over many ingredient lists at once, with identical results.
+
+    Every recipe line of every list is compiled into one flat (ingredient index, quantity) array,
+    dropping unknown ingredients. The per-line macros are rounded before summing, like the loop does,
+    so they are computed elementwise and then summed per list with ``np.bincount``, which adds in
+    input order and therefore reproduces the loop's float totals exactly. The per-100g values are
+    divided out for all lists at once; only their rounding to one decimal runs per value in Python,
+    since NumPy's does not always agree with ``round``.
+    """
+    import numpy as np
+
+    n = len(ingredient_lists)
+    if not n:
+        return []
+    unknown = len(table.positions)
+    lines = [line for ingredient_list in ingredient_lists for line in ingredient_list]
+    indices = np.array([table.positions.get(line.name, unknown) for line in lines], dtype=np.intp)
+    quantities = np.array([line.quantity for line in lines], dtype=float)
+    segments = np.repeat(np.arange(n), [len(ingredient_list) for ingredient_list in ingredient_lists])
+    known = indices != unknown
+    indices, quantities, segments = indices[known], quantities[known], segments[known]
+
+    weight_per_unit = table.weight_per_unit[indices]
+    weights = quantities * np.where(weight_per_unit != 0, weight_per_unit, 1)
+    line_macros = np.rint((weights[:, None] * table.macros[indices]) / 100)
+    line_alcohol = (weights * table.alcohol_percentage[indices]) / 100
+
+    total_weight = np.bincount(segments, weights=weights, minlength=n)
+    totals = np.stack([np.bincount(segments, weights=line_macros[:, column], minlength=n) for column in range(len(MACROS))])
+    total_alcohol = np.bincount(segments, weights=line_alcohol, minlength=n)
+    has_weight = total_weight != 0
+    divisor = np.where(has_weight, total_weight, 1)
+    protein_100g, calories_100g, fat_100g, carbs_100g = ((totals / divisor) * 100).tolist()
+    alcohol_percentage = ((total_alcohol / divisor) * 100).tolist()
+    protein, calories, fat, carbs = totals.astype(np.int64).tolist()
+
+    # The same tuples as _nutrition_totals, which leaves every per-100g value an int 0 without weight.
+    return [
+        (
+            protein[i],
+            calories[i],
+            round(protein_100g[i], 1),
+            round(calories_100g[i]),
+            fat[i],
+            carbs[i],
+            round(fat_100g[i], 1),
+            round(carbs_100g[i], 1),
+            round(alcohol_percentage[i], 1),
+        )
+        if weighed
+        else (protein[i], calories[i], 0, 0, fat[i], carbs[i], 0, 0, 0)
+        for i, weighed in enumerate(has_weight.tolist())
+    ]
+
+
+def _reference_key(name: str, recipe_reference: str) -> str:
+    """Ingredient key of the row derived from a component recipe (see ``_derived_ingredient``)."""
+    return f"{name} <{recipe_reference}>"
+
+
+def _split_reference_key(key: str) -> Tuple[str, str]:
+    """The ``(name, recipe_reference)`` a ``_reference_key`` was made from."""
+    name, _, reference = key[:-1].rpartition(" <")
+    return name, reference
+
+
+def _line_ingredient(ri: RecipeIngredient, all_ingredients: Dict[str, Ingredient]) -> Optional[Ingredient]:
+    """The ingredients.csv row of a recipe line, or for a component-recipe line without one its derived row."""
+    ingredient = all_ingredients.get(ri.name)
+    if ingredient is None and ri.recipe_reference:
+        ingredient = all_ingredients.get(_reference_key(ri.name, ri.recipe_reference))
+    return ingredient
+
+
+def _resolve_references(ingredient_list: List[RecipeIngredient], all_ingredients: Dict[str, Ingredient]) -> List[RecipeIngredient]:
+    """Point ``recipe_reference`` lines at the row derived from the referenced recipe, when there is one."""
+    resolved = []
+    for ri in ingredient_list:
+        key = _reference_key(ri.name, ri.recipe_reference) if ri.recipe_reference else None
+        resolved.append(RecipeIngredient(key, ri.quantity) if key in all_ingredients else ri)
+    return resolved
+
+
+def _nutrition_inputs(recipe: Recipe, all_ingredients: Dict[str, Ingredient]) -> List[List[RecipeIngredient]]:
+    """The ingredient lists ``_process_recipe`` computes nutrition for: the recipe itself, then each variant."""
+    lists = [recipe.ingredients] + [variant.ingredients for variant in recipe.variants]
+    return [_resolve_references(ingredient_list, all_ingredients) for ingredient_list in lists]
+
+
+def _derived_ingredient(name: str, recipe_reference: str, per_100g: Dict[str, float], all_ingredients: Dict[str, Ingredient]) -> Ingredient:
+    """
+    An ingredient row for a ``recipe_reference`` line whose macros come from the referenced recipe's
+    per-100g values, keeping the unit conversion of the line's own ingredients.csv row (grams without one).
+    """
+    row = all_ingredients.get(name)
+    return Ingredient(
+        name=_reference_key(name, recipe_reference),
+        measurement_unit=row.measurement_unit if row else "g",
+        weight_per_unit=row.weight_per_unit if row else 0,
+        protein=per_100g["protein"],
+        calories=per_100g["calories"],
+        fat=per_100g["fat"],
+        carbohydrates=per_100g["carbohydrates"],
+        alcohol_percentage=per_100g["alcohol_percentage"],
+    )
+
+
+def derived_ingredients(recipes: Dict[str, Recipe], all_ingredients: Dict[str, Ingredient]) -> Dict[Tuple[str, str], Ingredient]:
+    """
+    The rows ``iter_recipes`` derives for the ``recipe_reference`` lines of ``recipes`` (keyed by
+    filename without extension) that point at one of them, by ``(name, recipe_reference)``. Raises
+    ``ReferenceCycleError`` on cycles.
+    """
+    dependants: Dict[str, Set[Tuple[str, str]]] = {}
+    for recipe in recipes.values():
+        for name, reference in recipe.references():
+            if reference in recipes:
+                dependants.setdefault(reference, set()).add((name, reference))
+    graph = {stem: {reference for _, reference in recipe.references() if reference in recipes} for stem, recipe in recipes.items()}
+
+    ingredients = dict(all_ingredients)
+    derived: Dict[Tuple[str, str], Ingredient] = {}
+    for level in dependency_levels(graph):
+        for stem in level:
+            if stem not in dependants:
+                continue
+            nutrition = calculate_nutrition(_nutrition_inputs(recipes[stem], ingredients)[0], ingredients)
+            per_100g = dict(zip(("protein", "calories", "fat", "carbohydrates", "alcohol_percentage"), (nutrition[i] for i in (2, 3, 6, 7, 8))))
+            for name, reference in sorted(dependants[stem]):
+                row = _derived_ingredient(name, reference, per_100g, all_ingredients)
+                derived[(name, reference)] = ingredients[row.name] = row
+    return derived
+
+
+PAYLOAD_MACROS = ("calories", "protein", "fat", "carbohydrates")
+
+
+def _recipe_payload(
+    sources: List[Tuple[str, Tuple[Component, ...], Tuple[int, int, float, float, int, int, float, float, float]]],
+    all_ingredients: Dict[str, Ingredient],
+) -> Dict[str, Any]:
+    """
+    The data the recipe page scales servings and switches variants with, for each
+    ``(variant name, components, nutrition)`` source ("" for recipes without variants):
+
+    - ``ingredients``: one ``[name, unit, recipe_reference or null, weight_per_unit, *macros per 100 g]``
+      row per distinct ingredient line, shared by all variants;
+    - ``variants``: ``{"totals", "per_100g", "components"}`` per variant, with macros in
+      ``PAYLOAD_MACROS`` order and components as ``[name or null, [[ingredient row, quantity], ...]]``.
+    """
+    rows: List[List[Any]] = []
+    row_ids: Dict[Tuple[str, Optional[str]], int] = {}
+    variants = {}
+    for variant_name, components, nutrition in sources:
+        payload_components = []
+        for component in components:
+            lines = []
+            for ri in component.ingredients:
+                ingredient = _line_ingredient(ri, all_ingredients)
+                if not ingredient:
+                    continue
+                reference = ri.recipe_reference
+                if (ri.name, reference) not in row_ids:
+                    source = all_ingredients.get(_reference_key(ri.name, reference), ingredient) if reference else ingredient
+                    row_ids[(ri.name, reference)] = len(rows)
+                    row = [ri.name, ingredient.measurement_unit, reference, ingredient.weight_per_unit]
+                    rows.append(row + [getattr(source, macro) for macro in PAYLOAD_MACROS])
+                lines.append([row_ids[(ri.name, reference)], ri.quantity])
+            payload_components.append([component.name, lines])
+        total_protein, total_calories, protein_100g, calories_100g, total_fat, total_carbs, fat_100g, carbs_100g, _ = nutrition
+        variants[variant_name] = {
+            "totals": [total_calories, total_protein, total_fat, total_carbs],
+            "per_100g": [calories_100g, protein_100g, fat_100g, carbs_100g],
+            "components": payload_components,
+        }
+    return {"ingredients": rows, "variants": variants}
+
+
+def _process_recipe(
+    recipe: Recipe,
+    filename: str,
+    category: str,
+    all_ingredients: Dict[str, Ingredient],
+    nutrition: Optional[Iterator[Tuple[int, int, float, float, int, int, float, float, float]]] = None,
+) -> Dict[str, Any]:
+    """
+    Compute the template data for one recipe. ``nutrition`` optionally yields precomputed results for
+    the lists of ``_nutrition_inputs`` (see ``calculate_nutrition_batch``), in that order.
+    """
+    if nutrition is None:
+        nutrition = (calculate_nutrition(ingredient_list, all_ingredients) for ingredient_list in _nutrition_inputs(recipe, all_ingredients))
+    (
+        total_protein,
+        total_calories,
+        protein_100g,
+        calories_100g,
+        total_fat,
+        total_carbs,
+        fat_100g,
+        carbs_100g,
+        alcohol_percentage,
+    ) = flat_nutrition = next(nutrition)
+
+    variants_data = None
+    payload_sources = [("", recipe.components, flat_nutrition)]
+    if recipe.variants:
+        variants_data = {}
+        payload_sources = []
+        for variant in recipe.variants:
+            variant_nutrition = next(nutrition)
+            payload_sources.append((variant.name, variant.components, variant_nutrition))
+            (vtp, vtc, vp100, vc100, vtf, vtcarb, vf100, vcarb100, _) = variant_nutrition
+            variants_data[variant.name] = {
+                "components": _display_components(variant.components, all_ingredients),
+                "total_protein": vtp,
+                "total_calories": vtc,
+                "protein_100g": vp100,
+                "calories_100g": vc100,
+                "total_fat": vtf,
+                "total_carbs": vtcarb,
+                "fat_100g": vf100,
+                "carbs_100g": vcarb100,
+            }
+
+    recipe_data: Dict[str, Any] = {
+        "name": recipe.name,
+        "description": recipe.description,
+        "protein_100g": protein_100g,
+        "calories_100g": calories_100g,
+        "total_protein": total_protein,
+        "total_calories": total_calories,
+        "fat_100g": fat_100g,
+        "carbs_100g": carbs_100g,
+        "total_fat": total_fat,
+        "total_carbs": total_carbs,
+        "components": next(iter(variants_data.values()))["components"] if variants_data else _display_components(recipe.components, all_ingredients),
+        "steps": list(recipe.steps),
+        "rating": recipe.rating,
+        "spice_level": recipe.spice_level,
+        "preparation_time": recipe.preparation_time,
+        "filename": filename.replace(".yaml", ".html"),
+        "dietary_labels": list(recipe.dietary_labels),
+        "category": category.title(),
+        "variants": variants_data,
+        "payload": _recipe_payload(payload_sources, all_ingredients),
+    }
+
+    labels = recipe_data["dietary_labels"]
+    if "alcoholic" in labels or "non_alcoholic" in labels:
+        recipe_data["alcohol_percentage"] = alcohol_percentage
+    recipe_data["export"] = _recipe_export(recipe_data, [source[2][8] for source in payload_sources])
+    return recipe_data
+
+
+def _referenced_ingredient_names(recipe: Recipe) -> List[str]:
+    """All ingredient names a recipe uses, across every variant, plus the keys of its component-recipe rows."""
+    names = {line.name for _, _, line in recipe.lines()}
+    names.update(_reference_key(name, reference) for name, reference in recipe.references())
+    return sorted(names)
+
+
+SUMMARY_FIELDS = ("name", "description", "filename", "category", "dietary_labels", "protein_100g", "calories_100g", "fat_100g", "carbs_100g")
+# One row per variant (a single row with variant None for recipes without variants), as recipe_query.py reads them.
+QUERY_FIELDS = ("variant", "total_calories", "total_protein", "total_fat", "total_carbs", "calories_100g", "protein_100g", "fat_100g", "carbs_100g")
+STREAM_CHUNK = 256  # recipes computed per batch (one calculate_nutrition_batch); bounds how much recipe data exists at once
+RENDER_BATCH = 16  # pages per render task sent to a worker
+
+# A recipe to compute: (parsed YAML, or the path to read it from; content hash; filename; category).
+RecipeTask = Tuple[Any, str, str, str]
+
+
+def _query_record(data: Dict[str, Any]) -> Dict[str, Any]:
+    """The macros of every variant of a recipe and the attributes ``recipe_query`` filters on."""
+    variants = list(data["variants"].items()) if data["variants"] else [(None, data)]
+    return {
+        "spice_level": data["spice_level"],
+        "preparation_time": data["preparation_time"],
+        "rating": data["rating"],
+        "variants": [[name] + [variant[field] for field in QUERY_FIELDS[1:]] for name, variant in variants],
+    }
+
+
+def _recipe_export(data: Dict[str, Any], alcohol: List[float]) -> Dict[str, Any]:
+    """
+    The computed nutrition of a recipe as ``nutrition_export`` writes it: its attributes, a
+    ``VARIANT_FIELDS`` row per variant (``alcohol`` holds their alcohol percentages) and a
+    ``LINE_FIELDS`` row per ingredient line, with the grams and rounded macros ``calculate_nutrition``
+    adds up for that line.
+    """
+    payload = data["payload"]
+    lines = []
+    for variant_name, variant in payload["variants"].items():
+        for component_name, component_lines in variant["components"]:
+            for row_id, quantity in component_lines:
+                name, unit, reference, weight_per_unit, *macros = payload["ingredients"][row_id]
+                grams = quantity * weight_per_unit if weight_per_unit else quantity
+                line = [variant_name or None, component_name, name, reference, quantity, unit, grams]
+                lines.append(dict(zip(LINE_FIELDS, line + [round(grams * macro / 100) for macro in macros])))
+    return {
+        "recipe": os.path.splitext(data["filename"])[0],
+        "name": data["name"],
+        "category": data["category"],
+        "filename": data["filename"],
+        "dietary_labels": data["dietary_labels"],
+        "rating": data["rating"],
+        "spice_level": data["spice_level"],
+        "preparation_time": data["preparation_time"],
+        "variants": [dict(zip(VARIANT_FIELDS, row + [abv])) for row, abv in zip(_query_record(data)["variants"], alcohol)],
+        "lines": lines,
+    }
+
+
+def _load_source(source: Any) -> Any:
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return parse_yaml(f.read())
+    return source
+
+
+def _compute_recipe_records(
+    tasks: List[RecipeTask],
+    all_ingredients: Dict[str, Ingredient],
+    nutrient_table: NutrientTable,
+    ingredient_hashes: Dict[str, str],
+) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    Return ``(build record, recipe data)`` for each task. The record holds the content hash, the
+    hashes of the ingredient rows the recipe uses, its ingredient usages (as ``[name, variant,
+    component, quantity]`` rows) and component-recipe
+    references, its per-100g macros for recipes that reference it, the ``SUMMARY_FIELDS`` of the
+    recipe data that the index, category pages and search index list and the ``QUERY_FIELDS`` of
+    every variant (see ``_query_record``). The full template data is returned next to it, and is None
+    (as are the summary and query fields) for YAML files that are not recipes.
+    Nutrition for the whole batch is computed in one ``calculate_nutrition_batch``.
+    """
+    contents = [_load_source(source) for source, *_ in tasks]
+    models = [Recipe.from_yaml(yaml_content) if "recipe_name" in yaml_content else None for yaml_content in contents]
+    recipes = [recipe for recipe in models if recipe is not None]
+    with profiler.span("nutrition batch", recipes=len(recipes)):
+        nutrition = calculate_nutrition_batch([lst for recipe in recipes for lst in _nutrition_inputs(recipe, all_ingredients)], nutrient_table)
+
+    results: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]] = []
+    position = 0
+    for recipe, (_, content_hash, filename, category) in zip(models, tasks):
+        if recipe is None:
+            record: Dict[str, Any] = {
+                "hash": content_hash,
+                "ingredients": {},
+                "usages": [],
+                "references": [],
+                "per_100g": None,
+                "summary": None,
+                "query": None,
+            }
+            results.append((record, None))
+            continue
+        count = 1 + len(recipe.variants)
+        recipe_nutrition = nutrition[position : position + count]
+        position += count
+        protein, calories, fat, carbohydrates, alcohol_percentage = (recipe_nutrition[0][i] for i in (2, 3, 6, 7, 8))
+        with profiler.span("recipe", recipe=filename):
+            data = _process_recipe(recipe, filename, category, all_ingredients, iter(recipe_nutrition))
+        record = {
+            "hash": content_hash,
+            "ingredients": {name: ingredient_hashes.get(name) for name in _referenced_ingredient_names(recipe)},
+            "usages": [[line.name, variant, component.name, line.quantity] for variant, component, line in recipe.lines()],
+            "references": recipe.references(),
+            "per_100g": {
+                "protein": protein,
+                "calories": calories,
+                "fat": fat,
+                "carbohydrates": carbohydrates,
+                "alcohol_percentage": alcohol_percentage,
+            },
+            "summary": {field: data[field] for field in SUMMARY_FIELDS},
+            "query": _query_record(data),
+        }
+        results.append((record, data))
+    return results
+
+
+def _compact_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Intern the ingredient, variant and component names of a build record. Records are kept for the
+    whole build and the same few hundred names recur in every one of them, each parsed separately.
+    """
+    record["ingredients"] = {sys.intern(name): row_hash for name, row_hash in record["ingredients"].items()}
+    record["usages"] = [
+        (sys.intern(name), variant and sys.intern(variant), component and sys.intern(component), quantity)
+        for name, variant, component, quantity in record["usages"]
+    ]
+    return record
+
+
+def _is_fresh(record: Optional[Dict[str, Any]], content_hash: str, ingredient_hashes: Dict[str, str]) -> bool:
+    """True when neither the recipe YAML nor any ingredient row it uses changed since ``record`` was made."""
+    return bool(
+        record and record["hash"] == content_hash and all(ingredient_hashes.get(name) == row_hash for name, row_hash in record["ingredients"].items())
+    )
+
+
+class RecipeScan(NamedTuple):
+    """What ``_scan_recipe`` learned about a recipe file without computing it."""
+
+    content_hash: str
+    stat: List[int]
+    references: List[Tuple[str, str]]
+    data: Any  # the parsed YAML when the recipe cache already holds it, else None
+
+
+def _scan_recipe(path: Path, record: Optional[Dict[str, Any]], cache: RecipeCache) -> RecipeScan:
+    """
+    Hash a recipe file and find its component-recipe references. A file whose mtime and size match
+    ``record`` is not read at all. Otherwise the references come from the record when the contents
+    are unchanged and the file is only parsed if it mentions ``recipe_reference``; that parse is not
+    kept, so scanning a large catalogue does not hold its YAML. The recipe cache is used when something
+    (e.g. the validator) already loaded it, but never loaded just for this.
+    """
+    st = os.stat(path)
+    stat = [st.st_mtime_ns, st.st_size]
+    if record and record.get("stat") == stat:
+        return RecipeScan(record["hash"], stat, [tuple(pair) for pair in record["references"]], None)
+    if cache.loaded:
+        lookup = cache.lookup(path)
+        data = lookup.data
+        if lookup.raw is not None:
+            data = parse_yaml(lookup.raw)
+            cache.store(path, lookup, data)
+        return RecipeScan(lookup.content_hash, stat, recipe_references(data) if "recipe_name" in data else [], data)
+
+    with open(path, "rb") as f:
+        raw = f.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if record and record["hash"] == content_hash:
+        return RecipeScan(content_hash, stat, [tuple(pair) for pair in record["references"]], None)
+    if b"recipe_reference" not in raw:
+        return RecipeScan(content_hash, stat, [], None)
+    data = parse_yaml(raw)
+    return RecipeScan(content_hash, stat, recipe_references(data) if "recipe_name" in data else [], None)
+
+
+# Read-only state shared by every task of a worker process, set once by _init_worker.
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_worker(all_ingredients: Dict[str, Ingredient], ingredient_hashes: Dict[str, str], asset_urls: Dict[str, Dict[str, str]]) -> None:
+    """Set up a worker process; ``asset_urls`` holds the ``assets`` global of each target it renders."""
+    _worker_state["all_ingredients"] = dict(all_ingredients)
+    _worker_state["nutrient_table"] = build_nutrient_table(all_ingredients)
+    _worker_state["ingredient_hashes"] = dict(ingredient_hashes)
+    for target, urls in asset_urls.items():
+        env = get_env(target)
+        env.globals["assets"] = urls
+        for name in ("recipe_detail.html", "ingredient_detail.html"):
+            env.get_template(name)
+
+
+def _compute_records_in_worker(
+    job: Tuple[List[RecipeTask], Dict[str, Ingredient], Dict[str, str]],
+) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    Worker side of ``_compute_recipe_records``; ``job`` adds the rows derived from component recipes so
+    far, which the worker's ingredients and nutrient table take on the first time it sees them.
+    """
+    tasks, derived, derived_hashes = job
+    if any(name not in _worker_state["all_ingredients"] for name in derived):
+        _worker_state["all_ingredients"].update(derived)
+        _worker_state["ingredient_hashes"].update(derived_hashes)
+        _worker_state["nutrient_table"] = extend_nutrient_table(_worker_state["nutrient_table"], derived)
+    return _compute_recipe_records(tasks, _worker_state["all_ingredients"], _worker_state["nutrient_table"], _worker_state["ingredient_hashes"])
+
+
+def _pool_imap(pool: "Executor", function: Callable[[Any], T], items: Iterable[Any], window: int = 0) -> Iterator[T]:
+    """
+    A lazy, order-preserving ``pool.map``: ``items`` is consumed as results are, with at most
+    ``window`` (default: twice the CPU count) tasks in flight. Spans recorded in the workers are
+    brought back when profiling.
+    """
+    task = partial(collect, function) if profiler.enabled else function
+    in_flight: "Deque[Future[Any]]" = deque()
+
+    def result() -> T:
+        value = in_flight.popleft().result()
+        if not profiler.enabled:
+            return value  # type: ignore[no-any-return]
+        value, events = value
+        profiler.absorb(events)
+        return value  # type: ignore[no-any-return]
+
+    for item in items:
+        in_flight.append(pool.submit(task, item))
+        if len(in_flight) >= (window or 2 * (os.cpu_count() or 1)):
+            yield result()
+    while in_flight:
+        yield result()
+
+
+def _chunksize(n_tasks: int) -> int:
+    return max(1, n_tasks // ((os.cpu_count() or 1) * 4))
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_recipes(
+    catalogue: Catalogue,
+    all_ingredients: Dict[str, Ingredient],
+    records: Dict[str, Dict[str, Any]],
+    ingredient_hashes: Optional[Dict[str, str]] = None,
+    pool: "Optional[Executor]" = None,
+    needs_data: Optional[Callable[[str, Dict[str, Any]], bool]] = None,
+    derived: Optional[Dict[str, Ingredient]] = None,
+) -> Iterator[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    Compute every recipe in the catalogue's category directories, yielding ``(key, record, recipe
+    data)`` as soon as each is ready so callers can render and drop the data right away.
+
+    ``records`` holds the build records of the previous run, keyed by the recipe path relative to the
+    configuration directory, and is updated in place with the current ones (in catalogue order once
+    the generator is exhausted). Recipes whose YAML and ingredient rows are unchanged keep their
+    record without being parsed and are yielded with None as data, unless ``needs_data(key, record)``
+    asks for it. Only ``STREAM_CHUNK`` recipes are computed at a time, so memory does not grow with
+    the catalogue beyond the records themselves.
+
+    Lines with a ``recipe_reference`` to another recipe take their macros from that recipe's computed
+    per-100g values instead of its hand-maintained ingredients.csv row. Recipes are evaluated in
+    dependency order (raising ``ReferenceCycleError`` on cycles), and because a derived row is hashed
+    like any other ingredient row, a changed component only invalidates its transitive dependents.
+    The derived rows are collected in ``derived``, when given, for the ingredient pages (see ``site_pages``).
+
+    With a ``pool`` (see ``_init_worker``) YAML parsing and nutrition run in its worker processes,
+    a bounded number of batches at a time. Either way recipes are yielded in the same order, level by
+    level and sorted within a level, whichever of them are fresh.
+    """
+    hashes = dict(ingredient_hashes or {})
+    previous = dict(records)
+    records.clear()
+
+    recipe_files = {
+        recipe_file.relpath.as_posix(): recipe_file
+        for recipe_file in catalogue.recipe_files
+        if len(recipe_file.relpath.parts) == 2 and recipe_file.filename != "ingredients.yaml"
+    }
+    with profiler.span("recipe scan", files=len(recipe_files)):
+        scans = {key: _scan_recipe(recipe_file.path, previous.get(key), catalogue.cache) for key, recipe_file in recipe_files.items()}
+
+    keys_by_stem = {Path(key).stem: key for key in recipe_files}
+    dependants: Dict[str, List[Tuple[str, str]]] = {}
+    for scan in scans.values():
+        for name, reference in scan.references:
+            if reference in keys_by_stem:
+                dependants.setdefault(keys_by_stem[reference], []).append((name, reference))
+    graph = {key: {keys_by_stem[reference] for _, reference in scan.references if reference in keys_by_stem} for key, scan in scans.items()}
+
+    if derived is None:
+        derived = {}
+    derived.clear()
+    derived_hashes: Dict[str, str] = {}
+    level_ingredients = dict(all_ingredients)  # plus the derived rows, like the nutrient table
+    table = build_nutrient_table(all_ingredients) if pool is None else None
+    for level in dependency_levels(graph):
+        tasks = []
+        fresh: Dict[str, Dict[str, Any]] = {}
+        for key in level:
+            scan, record = scans[key], previous.get(key)
+            if record and _is_fresh(record, scan.content_hash, hashes) and not (needs_data and needs_data(key, record)):
+                record["stat"] = scan.stat
+                fresh[key] = record
+            else:
+                recipe_file = recipe_files[key]
+                source = scan.data if scan.data is not None else str(recipe_file.path)
+                tasks.append((key, (source, scan.content_hash, recipe_file.filename, recipe_file.category)))
+            scans[key] = scan._replace(data=None)
+
+        chunks = _chunks(tasks, min(STREAM_CHUNK, _chunksize(len(tasks))) if pool else STREAM_CHUNK)
+        if pool is not None:
+            jobs = (([task for _, task in chunk], derived, derived_hashes) for chunk in chunks)
+            computed: Iterator[List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]] = _pool_imap(pool, _compute_records_in_worker, jobs)
+        else:
+            assert table is not None
+            computed = (_compute_recipe_records([task for _, task in chunk], level_ingredients, table, hashes) for chunk in chunks)
+        # Yield in level order whichever recipes are fresh, so the order does not depend on what changed.
+        results = (result for chunk_results in computed for result in chunk_results)
+        for key in level:
+            if key in fresh:
+                record, data = fresh.pop(key), None
+            else:
+                record, data = next(results)
+                record["stat"] = scans[key].stat
+            records[key] = _compact_record(record)
+            yield key, record, data
+
+        for key in level:
+            per_100g = records[key]["per_100g"]
+            for name, reference in dependants.get(key, []) if per_100g else []:
+                row = _derived_ingredient(name, reference, per_100g, all_ingredients)
+                derived[row.name] = level_ingredients[row.name] = row
+                derived_hashes[row.name] = hashes[row.name] = _sha256(*astuple(row))
+        if table is not None:
+            table = extend_nutrient_table(table, derived)
+
+    ordered = {key: records[key] for key in recipe_files}
+    records.clear()
+    records.update(ordered)
+
+
+# An inverted index from ingredient name to a ``USAGE_FIELDS`` tuple per recipe line using it. Tuples
+# rather than dicts keep it small; pages and ingredient_usage.json get dicts (see ``_usage_dicts``).
+UsageIndex = Dict[str, List[Tuple[Any, ...]]]
+USAGE_FIELDS = ("recipe", "filename", "variant", "component", "quantity")
+
+
+def _usage_dicts(usages: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+    return [dict(zip(USAGE_FIELDS, usage)) for usage in usages]
+
+
+def recipe_summaries(
+    records: Dict[str, Dict[str, Any]], usage_index: Optional[UsageIndex] = None
+) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
+    """
+    The recipe summaries grouped by category and as one list, in catalogue order. When ``usage_index``
+    is given it is filled with every recipe line that uses each ingredient.
+    """
+    categories: Dict[str, List[Dict[str, Any]]] = {}
+    summaries = []
+    for record in records.values():
+        summary = record["summary"]
+        if summary is None:
+            continue
+        categories.setdefault(summary["category"], []).append(summary)
+        summaries.append(summary)
+        if usage_index is not None:
+            for name, variant, component, quantity in record["usages"]:
+                usage_index.setdefault(name, []).append((summary["name"], summary["filename"], variant, component, quantity))
+    return categories, summaries
+
+
+def referenced_ingredients(catalogue: Catalogue, records: Dict[str, Dict[str, Any]]) -> Set[str]:
+    """
+    The ingredient names the recipes of the catalogue use. A recipe whose file is unchanged since its
+    build record in ``records`` takes them from the record; others are parsed through the recipe
+    cache, which keeps the parse for ``iter_recipes``.
+    """
+    names: Set[str] = set()
+    for recipe_file in catalogue.recipe_files:
+        if len(recipe_file.relpath.parts) != 2 or recipe_file.filename == "ingredients.yaml":
+            continue
+        record = records.get(recipe_file.relpath.as_posix())
+        st = os.stat(recipe_file.path)
+        if record and record.get("stat") == [st.st_mtime_ns, st.st_size]:
+            names.update(usage[0] for usage in record["usages"])
+            continue
+        data = catalogue.load_recipe(recipe_file)
+        if isinstance(data, dict) and "recipe_name" in data:
+            names.update(usage["name"] for usage in ingredient_usages(data))
+    return names
+
+
+def load_ingredient_rows(catalogue: Catalogue, records: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    The ingredient rows a build needs: every row of ingredients.csv, or with an ingredient store (see
+    ``ingredient_store``) only the rows of ``referenced_ingredients``, looked up in batches.
+    """
+    if catalogue.store is None:
+        return catalogue.ingredient_records()
+    return catalogue.lookup_ingredients(referenced_ingredients(catalogue, records))
+
+
 def process_all_recipes(
-    directory: str,
-    all_ingredients: Dict[str, Dict[str, Any]],
+    catalogue: Catalogue,
+    all_ingredients: Dict[str, Ingredient],
+    records: Optional[Dict[str, Dict[str, Any]]] = None,
+    ingredient_hashes: Optional[Dict[str, str]] = None,
+    pool: "Optional[Executor]" = None,
+    usage_index: Optional[UsageIndex] = None,
 ) -> Tuple[Dict[str, List[Dict[str, Any]]], List[Dict[str, Any]]]:
-    categories = {}
-    all_recipes = []
-
-    for category in os.listdir(directory):
-        category_path = os.path.join(directory, category)
-        if os.path.isdir(category_path):
-            category_recipes = []
-            category_recipe_names = []
-
-            for filename in os.listdir(category_path):
-                if filename.endswith(".yaml") and filename != "ingredients.yaml":
-                    filepath = os.path.join(category_path, filename)
-                    with open(filepath, "r") as file:
-                        yaml_content = yaml.safe_load(file)
-
-                    if "recipe_name" in yaml_content:
-                        flat_ingredients = _get_flat_ingredients(yaml_content)
-                        (
-                            total_protein,
-                            total_calories,
-                            protein_100g,
-                            calories_100g,
-                            total_fat,
-                            total_carbs,
-                            fat_100g,
-                            carbs_100g,
-                            alcohol_percentage,
-                        ) = calculate_nutrition(flat_ingredients, all_ingredients)
-
-                        variants_data = None
-                        if "variants" in yaml_content:
-                            variants_data = {}
-                            for variant_name, variant_content in yaml_content["variants"].items():
-                                if "components" in variant_content:
-                                    v_ingr = [i for c in variant_content["components"] for i in c.get("ingredients", [])]
-                                else:
-                                    v_ingr = variant_content.get("ingredients", [])
-                                (vtp, vtc, vp100, vc100, vtf, vtcarb, vf100, vcarb100, _) = calculate_nutrition(v_ingr, all_ingredients)
-                                variants_data[variant_name] = {
-                                    "components": _build_display_components(variant_content, all_ingredients),
-                                    "total_protein": vtp,
-                                    "total_calories": vtc,
-                                    "protein_100g": vp100,
-                                    "calories_100g": vc100,
-                                    "total_fat": vtf,
-                                    "total_carbs": vtcarb,
-                                    "fat_100g": vf100,
-                                    "carbs_100g": vcarb100,
-                                }
-
-                        recipe_data = {
-                            "name": yaml_content["recipe_name"],
-                            "description": yaml_content.get("description", ""),
-                            "protein_100g": protein_100g,
-                            "calories_100g": calories_100g,
-                            "total_protein": total_protein,
-                            "total_calories": total_calories,
-                            "fat_100g": fat_100g,
-                            "carbs_100g": carbs_100g,
-                            "total_fat": total_fat,
-                            "total_carbs": total_carbs,
-                            "components": next(iter(variants_data.values()))["components"]
-                            if variants_data
-                            else _build_display_components(yaml_content, all_ingredients),
-                            "steps": yaml_content.get("steps", []),
-                            "rating": yaml_content.get("rating", 0),
-                            "spice_level": yaml_content.get("spice_level", 0),
-                            "preparation_time": yaml_content.get("preparation_time"),
-                            "filename": filename.replace(".yaml", ".html"),
-                            "dietary_labels": yaml_content.get("dietary_labels", []),
-                            "category": category.title(),
-                            "variants": variants_data,
-                        }
-
-                        labels = recipe_data["dietary_labels"]
-                        if "alcoholic" in labels or "non_alcoholic" in labels:
-                            recipe_data["alcohol_percentage"] = alcohol_percentage
-
-                        category_recipe_names.append(recipe_data)
-                        category_recipes.append(recipe_data)
-                        all_recipes.append(recipe_data)
-
-            if category_recipe_names:
-                categories[category.title()] = category_recipe_names
-
-    return categories, all_recipes
-
-
-def generate_static_pages() -> None:
-    all_ingredients = load_ingredients_csv(INGREDIENTS_FILE)
-    categories, recipes = process_all_recipes(CONFIG_DIR, all_ingredients)
-
-    index_template = env.get_template("index.html")
-    with open(os.path.join(OUTPUT_DIR, "index.html"), "w") as file:
-        file.write(index_template.render(categories=categories, recipes=recipes))
-
-    recipe_template = env.get_template("recipe_detail.html")
-    for recipe in recipes:
-        with open(os.path.join(OUTPUT_DIR, recipe["filename"]), "w") as file:
-            file.write(recipe_template.render(recipe=recipe))
-
-    ingredients_dir = os.path.join(OUTPUT_DIR, "ingredients")
-    os.makedirs(ingredients_dir, exist_ok=True)
-    ingredient_template = env.get_template("ingredient_detail.html")
-    for ingredient in all_ingredients.values():
-        slug = slugify(ingredient["name"])
-        with open(os.path.join(ingredients_dir, f"{slug}.html"), "w") as file:
-            file.write(ingredient_template.render(ingredient=ingredient))
+    """
+    Compute every recipe (see ``iter_recipes``) without keeping the page data, and return the recipe
+    summaries grouped by category and as one list (see ``recipe_summaries``).
+    """
+    if records is None:
+        records = {}
+    for _ in iter_recipes(catalogue, all_ingredients, records, ingredient_hashes, pool):
+        pass
+    return recipe_summaries(records, usage_index)
+
+
+def _render_page(target: str, relpath: str, template_name: str, context: Dict[str, Any], previous_output: Optional[str]) -> Tuple[str, bool]:
+    """
+    Render a page of a target and write it unless the rendered bytes equal ``previous_output`` (the
+    hash of what is already on disk), so unchanged files keep their mtime. Returns the output hash
+    and whether the file was written.
+    """
+    with profiler.span("render", template=template_name, page=relpath, target=target):
+        content = get_env(target).get_template(template_name).render(**context)
+    output_hash = _sha256(content.encode())
+    path = os.path.join(TARGETS[target].output_dir, relpath)
+    if previous_output == output_hash and os.path.exists(path):
+        return output_hash, False
+    with profiler.span("write"), open(path, "w") as file:
+        file.write(content)
+    return output_hash, True
+
+
+def _write_artefact(relpath: str, content: str, previous: Optional[Dict[str, str]], output_dir: str = OUTPUT_DIR) -> Tuple[str, bool]:
+    """Write a generated non-page file unless it is byte-identical to the previous build's."""
+    output_hash = _sha256(content.encode())
+    path = os.path.join(output_dir, relpath)
+    if previous and previous["output"] == output_hash and os.path.exists(path):
+        return output_hash, False
+    with profiler.span("write"), open(path, "w") as file:
+        file.write(content)
+    return output_hash, True
+
+
+# A page to render: (target, relpath, template, context, hash of the file on disk).
+RenderTask = Tuple[str, str, str, Dict[str, Any], Optional[str]]
+
+
+def _render_pages_task(tasks: List[RenderTask]) -> List[Tuple[str, str, str, bool]]:
+    return [(task[0], task[1], *_render_page(*task)) for task in tasks]
+
+
+def copy_static_files(output_dir: str) -> int:
+    """Copy the hand-maintained ``STATIC_FILES`` of ``OUTPUT_DIR`` into another target's ``output_dir``; returns the number copied."""
+    copied = 0
+    for name in STATIC_FILES:
+        source = os.path.join(OUTPUT_DIR, name)
+        if not os.path.exists(source):
+            continue
+        sources = (
+            [os.path.join(root, filename) for root, _, filenames in os.walk(source) for filename in filenames] if os.path.isdir(source) else [source]
+        )
+        for path in sources:
+            destination = os.path.join(output_dir, os.path.relpath(path, OUTPUT_DIR))
+            if os.path.exists(destination) and filecmp.cmp(path, destination, shallow=False):
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            shutil.copyfile(path, destination)
+            copied += 1
+    return copied
+
+
+def _index_entry(recipe: Dict[str, Any]) -> Dict[str, Any]:
+    return {"filename": recipe["filename"], "name": recipe["name"], "dietary_labels": recipe["dietary_labels"]}
+
+
+def index_pages(categories: Dict[str, List[Dict[str, Any]]], page_size: int = 0) -> List[Tuple[str, str, Dict[str, Any]]]:
+    """
+    Return ``(relpath, template, context)`` for the index page and, when ``page_size`` is set, the
+    category shards it links to, each listing at most ``page_size`` recipes. Without a page size
+    the index lists every recipe itself. Categories and recipes are sorted here, once, rather than
+    in the templates, and contexts only carry what the listings show.
+    """
+    index_categories = []
+    shards = []
+    for category, recipes in sorted(categories.items()):
+        entries = [_index_entry(recipe) for recipe in sorted(recipes, key=lambda r: (r["filename"], r["name"]))]
+        if not page_size:
+            index_categories.append({"name": category, "recipes": entries, "pages": []})
+            continue
+        chunks = _chunks(entries, page_size)
+        slug = slugify(category)
+        hrefs = [f"/{CATEGORY_DIR}/{slug}.html"] + [f"/{CATEGORY_DIR}/{slug}-{number}.html" for number in range(2, len(chunks) + 1)]
+        page_links = [{"href": href, "first": chunk[0]["name"], "last": chunk[-1]["name"], "count": len(chunk)} for href, chunk in zip(hrefs, chunks)]
+        index_categories.append({"name": category, "recipes": [], "pages": page_links})
+        for number, (href, chunk) in enumerate(zip(hrefs, chunks), start=1):
+            shards.append((href[1:], "category.html", {"category": category, "recipes": chunk, "page": number, "pages": page_links}))
+    return [("index.html", "index.html", {"categories": index_categories})] + shards
+
+
+Page = Tuple[str, str, str, Dict[str, Any]]
+
+
+def recipe_page(record: Dict[str, Any], recipe: Optional[Dict[str, Any]], template_hashes: Dict[str, str]) -> Page:
+    """The recipe page of a build record as ``(relpath, input key, template, context)``; ``recipe`` is its page data."""
+    input_key = _sha256(template_hashes["recipe_detail.html"], record["hash"], json.dumps(record["ingredients"], sort_keys=True))
+    return record["summary"]["filename"], input_key, "recipe_detail.html", {"recipe": recipe}
+
+
+def recipe_api(record: Dict[str, Any]) -> Tuple[str, str]:
+    """The JSON API file of a build record as ``(relpath, input key)``; its content is the recipe's ``export``."""
+    input_key = _sha256(EXPORT_VERSION, record["hash"], json.dumps(record["ingredients"], sort_keys=True))
+    return recipe_api_path(record["summary"]["filename"]), input_key
+
+
+def _ingredient_page_rows(
+    all_ingredients: Dict[str, Ingredient], ingredient_hashes: Dict[str, str], derived: Dict[str, Ingredient]
+) -> Iterator[Tuple[Ingredient, Optional[str], str]]:
+    """
+    ``(row, recipe_reference or None, row hash)`` for every ingredient page. An ingredient made from a
+    component recipe shows the row derived from that recipe, like the recipes using it, rather than
+    its ingredients.csv row; one made from several recipes keeps the csv row when it has one.
+    """
+    references: Dict[str, List[Tuple[str, Ingredient]]] = {}
+    for key, row in derived.items():
+        name, reference = _split_reference_key(key)
+        references.setdefault(name, []).append((reference, row))
+    for name in dict.fromkeys([*all_ingredients, *references]):
+        sources = references.get(name, [])
+        if len(sources) == 1 or (sources and name not in all_ingredients):
+            reference, row = min(sources, key=lambda source: source[0])
+            yield replace(row, name=name), reference, _sha256(*astuple(row))
+        else:
+            yield all_ingredients[name], None, ingredient_hashes[name]
+
+
+def site_pages(
+    all_ingredients: Dict[str, Ingredient],
+    ingredient_hashes: Dict[str, str],
+    usage_index: UsageIndex,
+    categories: Dict[str, List[Dict[str, Any]]],
+    template_hashes: Dict[str, str],
+    page_size: int = 0,
+    derived: Optional[Dict[str, Ingredient]] = None,
+) -> Iterator[Page]:
+    """
+    Every page of the site except the recipe pages (see ``recipe_page``) as ``(relpath, input key,
+    template, context)``. The input key changes whenever anything the page is rendered from does.
+    ``derived`` holds the rows ``iter_recipes`` derived from component recipes (see ``_ingredient_page_rows``).
+    """
+    for ingredient, reference, row_hash in _ingredient_page_rows(all_ingredients, ingredient_hashes, derived or {}):
+        usages = usage_index.get(ingredient.name, [])
+        input_key = _sha256(template_hashes["ingredient_detail.html"], row_hash, json.dumps(usages))
+        yield (
+            f"ingredients/{slugify(ingredient.name)}.html",
+            input_key,
+            "ingredient_detail.html",
+            {"ingredient": ingredient, "recipe_reference": reference, "usages": _usage_dicts(usages)},
+        )
+    for relpath, template_name, context in index_pages(categories, page_size):
+        yield relpath, _sha256(template_hashes[template_name], json.dumps(context, sort_keys=True)), template_name, context
+
+
+def _usage_index_json(usage_index: UsageIndex) -> str:
+    """``json.dumps(..., sort_keys=True)`` of the index with dict usages, expanding one ingredient at a time."""
+    items = (
+        f"{json.dumps(name, ensure_ascii=False)}: {json.dumps(_usage_dicts(usages), sort_keys=True, ensure_ascii=False)}"
+        for name, usages in sorted(usage_index.items())
+    )
+    return "{" + ", ".join(items) + "}"
+
+
+def site_artefacts(recipes: List[Dict[str, Any]], usage_index: UsageIndex) -> Dict[str, str]:
+    """The generated non-page files of the site, by path relative to ``OUTPUT_DIR``."""
+    ingredients_by_recipe: Dict[str, List[str]] = {}
+    for name, usages in sorted(usage_index.items()):
+        for usage in usages:
+            ingredients_by_recipe.setdefault(usage[1], []).append(name)
+    return {
+        USAGE_INDEX_FILE: _usage_index_json(usage_index),
+        SEARCH_INDEX_FILE: json.dumps(build_search_index(recipes, ingredients_by_recipe), ensure_ascii=False, separators=(",", ":")),
+    }
+
+
+def generate_static_pages(
+    force: bool = False,
+    jobs: int = 1,
+    catalogue: Optional[Catalogue] = None,
+    page_size: int = 0,
+    store_file: Optional[str] = None,
+    targets: Sequence[str] = (DEFAULT_TARGET,),
+) -> None:
+    """
+    Build the site incrementally.
+
+    A manifest in ``CACHE_DIR`` records the hash of every input (recipe YAML, the ingredients.csv
+    rows it uses, each template) and of every output page; only pages whose inputs changed are
+    re-rendered and pages that disappeared from the catalogue are removed. ``force`` ignores the
+    manifest and rebuilds everything. With ``jobs`` > 1, recipe loading and page rendering are
+    spread over that many worker processes. Pass a ``catalogue`` that is already loaded (e.g. by
+    the validator) to reuse its parsed CSV and recipes. With a ``page_size`` the index only links
+    to per-category pages of at most that many recipes (see ``index_pages``). Shared CSS/JS is
+    written as a fingerprinted bundle and compressible files get precompressed siblings (see
+    ``asset_bundle``). With a ``store_file`` the ingredients come from that ingredient store and only
+    the ones the recipes use get a page (see ``load_ingredient_rows``). Every recipe also gets a JSON
+    API file, and the computed nutrition of all of them is exported as tables (see ``nutrition_export``).
+
+    ``targets`` names the ``TARGETS`` flavours to write. Recipes are computed once and every page
+    is rendered for each target with its own templates into its own output directory, in the same
+    render batches, so the targets render side by side on the worker processes. The nutrition
+    export goes into the first target; the manifest keeps the outputs of targets this build skips.
+
+    The build streams: each recipe is computed, rendered and written in a small batch and only its
+    build record is kept, so peak memory does not grow with the size of the recipe pages.
+    """
+    sites = [TARGETS[name] for name in dict.fromkeys(targets)]
+    primary = sites[0].name
+    for site in sites:
+        if not os.path.exists(site.output_dir):
+            os.makedirs(site.output_dir)
+            print(f"'{site.output_dir}' didn't exist yet, folder created! Moving on...")
+    if catalogue is None:
+        with profiler.span("load catalogue"):
+            catalogue = Catalogue(Path(CONFIG_DIR), Path(INGREDIENTS_FILE), store_file=Path(store_file) if store_file else None)
+    with profiler.span("load manifest"):
+        manifest = _empty_manifest() if force else load_manifest(MANIFEST_FILE)
+    with profiler.span("ingredient table"):
+        ingredient_rows = load_ingredient_rows(catalogue, manifest["recipes"])
+        ingredient_hashes = ingredient_hashes_from_rows(ingredient_rows)
+        all_ingredients = ingredients_from_rows(ingredient_rows)
+    template_hashes: Dict[str, Dict[str, str]] = {}
+    asset_urls: Dict[str, Dict[str, str]] = {}
+    asset_files: Dict[str, Dict[str, str]] = {}
+    with profiler.span("prepare templates"):
+        for site in sites:
+            template_hashes[site.name], asset_urls[site.name], asset_files[site.name] = prepare_templates(site.name)
+    for site in sites:
+        os.makedirs(os.path.join(site.output_dir, "ingredients"), exist_ok=True)
+        os.makedirs(os.path.join(site.output_dir, ASSET_URL_DIR), exist_ok=True)
+        if page_size:
+            os.makedirs(os.path.join(site.output_dir, CATEGORY_DIR), exist_ok=True)
+        if site.output_dir != OUTPUT_DIR:
+            copy_static_files(site.output_dir)
+    export_dir = TARGETS[primary].output_dir
+    os.makedirs(os.path.join(export_dir, RECIPE_API_DIR), exist_ok=True)
+
+    records = manifest["recipes"]
+    previous_outputs: Dict[str, Dict[str, Dict[str, str]]] = {site.name: manifest["outputs"].get(site.name, {}) for site in sites}
+    outputs: Dict[str, Dict[str, Dict[str, str]]] = {site.name: {} for site in sites}
+    usage_index: UsageIndex = {}
+    derived: Dict[str, Ingredient] = {}
+    summaries: List[Dict[str, Any]] = []
+    exporter = ExportWriter(export_dir)
+    written = 0
+
+    def is_stale(target: str, relpath: str, input_key: str) -> bool:
+        previous = previous_outputs[target].get(relpath)
+        return force or not previous or previous["inputs"] != input_key or not os.path.exists(os.path.join(TARGETS[target].output_dir, relpath))
+
+    def needs_page(key: str, record: Dict[str, Any]) -> bool:
+        if record["summary"] is None:
+            return False
+        return is_stale(primary, *recipe_api(record)) or any(
+            is_stale(site.name, *recipe_page(record, None, template_hashes[site.name])[:2]) for site in sites
+        )
+
+    def export(record: Dict[str, Any], recipe: Optional[Dict[str, Any]]) -> None:
+        nonlocal written
+        relpath, input_key = recipe_api(record)
+        if recipe is None:
+            outputs[primary][relpath] = previous_outputs[primary][relpath]
+            exporter.add(relpath, None)
+            return
+        data = recipe.pop("export")
+        output_hash, api_written = _write_artefact(relpath, api_json(data), previous_outputs[primary].get(relpath), export_dir)
+        outputs[primary][relpath] = {"inputs": input_key, "output": output_hash}
+        written += api_written
+        exporter.add(relpath, data)
+
+    def all_pages(pool: "Optional[Executor]") -> Iterator[Tuple[str, Page]]:
+        # Recipe pages stream out of iter_recipes; the other pages need every record, so they follow.
+        for _, record, recipe in iter_recipes(catalogue, all_ingredients, records, ingredient_hashes, pool, needs_page, derived):
+            if record["summary"] is not None:
+                export(record, recipe)
+                for site in sites:
+                    yield site.name, recipe_page(record, recipe, template_hashes[site.name])
+        categories, recipes = recipe_summaries(records, usage_index)
+        summaries.extend(recipes)
+        for site in sites:
+            for page in site_pages(all_ingredients, ingredient_hashes, usage_index, categories, template_hashes[site.name], page_size, derived):
+                yield site.name, page
+
+    def pending(pages: Iterator[Tuple[str, Page]]) -> Iterator[RenderTask]:
+        for target, (relpath, input_key, template_name, context) in pages:
+            previous = previous_outputs[target].get(relpath)
+            if is_stale(target, relpath, input_key):
+                outputs[target][relpath] = {"inputs": input_key}
+                yield target, relpath, template_name, context, None if force or not previous else previous["output"]
+            else:
+                outputs[target][relpath] = previous_outputs[target][relpath]
+
+    pool: "Optional[Executor]" = None
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(all_ingredients, ingredient_hashes, asset_urls))
+
+    with pool or nullcontext(), profiler.span("compute and render"):
+        batches = _batched(pending(all_pages(pool)), RENDER_BATCH)
+        for rendered in _pool_imap(pool, _render_pages_task, batches) if pool else map(_render_pages_task, batches):
+            for target, relpath, output_hash, page_written in rendered:
+                outputs[target][relpath]["output"] = output_hash
+                written += page_written
+    with profiler.span("save recipe cache"):
+        catalogue.save()
+
+    with profiler.span("artefacts"):
+        shared_artefacts = site_artefacts(summaries, usage_index)
+    for site in sites:
+        for relpath, content in {**asset_files[site.name], **shared_artefacts}.items():
+            output_hash, artefact_written = _write_artefact(relpath, content, previous_outputs[site.name].get(relpath), site.output_dir)
+            outputs[site.name][relpath] = {"inputs": output_hash, "output": output_hash}
+            written += artefact_written
+
+    with profiler.span("export"):
+        primary_previous = previous_outputs[primary]
+        removed_recipes = any(relpath.startswith(RECIPE_API_DIR + "/") for relpath in primary_previous.keys() - outputs[primary].keys())
+        missing = any(relpath not in primary_previous or not os.path.exists(os.path.join(export_dir, relpath)) for relpath in exporter.relpaths)
+        previous_hashes = {relpath: primary_previous[relpath]["output"] for relpath in exporter.relpaths if relpath in primary_previous}
+        export_hashes = exporter.close(removed_recipes or missing, previous_hashes)
+    for relpath in exporter.relpaths:
+        if export_hashes is None:
+            outputs[primary][relpath] = primary_previous[relpath]
+        else:
+            outputs[primary][relpath] = {"inputs": export_hashes[relpath], "output": export_hashes[relpath]}
+            written += previous_hashes.get(relpath) != export_hashes[relpath]
+
+    removed = 0
+    for site in sites:
+        for relpath in previous_outputs[site.name].keys() - outputs[site.name].keys():
+            path = os.path.join(site.output_dir, relpath)
+            if os.path.exists(path):
+                os.remove(path)
+                removed += 1
+
+    manifest["outputs"] = {**manifest["outputs"], **outputs}
+    with profiler.span("save manifest"):
+        save_manifest(MANIFEST_FILE, manifest)
+    compressed = 0
+    with profiler.span("precompress"):
+        for site in sites:
+            compressed += precompress(site.output_dir)[0]
+    unchanged = sum(map(len, outputs.values())) - written
+    print(f"{written} page(s) written, {unchanged} unchanged, {removed} removed; {compressed} compressed file(s) updated.")
 
 
 if __name__ == "__main__":
-    generate_static_pages()
+    parser = argparse.ArgumentParser(description="Generate the NomStats static site.")
+    parser.add_argument("--force", action="store_true", help="ignore the build manifest and rebuild every page")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="load and render recipes in N worker processes (default: 1)")
+    parser.add_argument(
+        "--page-size", type=int, default=0, metavar="N", help="list recipes on per-category pages of at most N recipes instead of on the index"
+    )
+    parser.add_argument(
+        "--ingredient-store",
+        nargs="?",
+        const=str(STORE_FILE),
+        metavar="FILE",
+        help=f"read ingredients from an SQLite ingredient store kept in sync with ingredients.csv (default: {STORE_FILE})",
+    )
+    parser.add_argument(
+        "--target",
+        action="append",
+        choices=list(TARGETS),
+        help=f"flavour of the site to write, repeat for several; the first also gets the nutrition export (default: {DEFAULT_TARGET})",
+    )
+    parser.add_argument(
+        "--precompile-templates",
+        action="store_true",
+        help=f"compile the templates of the targets into Python modules in {COMPILED_TEMPLATES_DIR}*, used until a template changes, and exit",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const=DEFAULT_TRACE_FILE,
+        metavar="TRACE",
+        help=f"time every build stage, print a summary and write a Chrome trace (default: {DEFAULT_TRACE_FILE})",
+    )
+    args = parser.parse_args()
+    targets = args.target or [DEFAULT_TARGET]
+    if args.precompile_templates:
+        for target in targets:
+            print(f"{precompile_templates(target)} template(s) compiled into {_compiled_dir(target)}.")
+        sys.exit(0)
+    profiler.enabled = bool(args.profile)
+    with profiler.span("build"):
+        generate_static_pages(force=args.force, jobs=args.jobs, page_size=args.page_size, store_file=args.ingredient_store, targets=targets)
+    if args.profile:
+        profiler.write_trace(args.profile)
+        print(profiler.summary())
+        print(f"Trace written to {args.profile}")
@@ -0,0 +1,312 @@
+"""
+SQLite ingredient store, for ingredient tables too large to keep in ingredients.csv.
+
+The store holds the ingredients.csv columns as text, so its rows parse and hash exactly like CSV
+rows, plus the source each row came from, in a table keyed (and so indexed) by name. The build and
+the validator look up only the names the recipe tree references, in batches (``lookup``), instead
+of loading every row.
+
+ingredients.csv stays the curated source: a ``Catalogue`` with a store mirrors it into the store
+whenever its contents change (``sync_csv``), and its rows take precedence over imported ones.
+Food-composition datasets are added with ``import_rows`` (``python ingredient_store.py import``),
+which streams the file, maps its columns onto ours, converts units and skips duplicate names.
+
+Usage:
+    python ingredient_store.py import nevo.csv --delimiter ';' --decimal , --source NEVO \\
+        --map 'name=Voedingsmiddelnaam' --map 'calories_per_100g=ENERCC' --map 'protein_per_100g=PROT' \\
+        --map 'fat_per_100g=FAT' --map 'carbohydrates_per_100g=CHO' --map 'alcohol_percentage=ALC:g'
+    python ingredient_store.py stats
+"""
+
+import argparse
+import csv
+import hashlib
+import re
+import sqlite3
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+STORE_FILE = Path(__file__).parent / "configuration" / "ingredients.sqlite"
+STORE_VERSION = 1
+CSV_SOURCE = "ingredients.csv"
+COLUMNS = [
+    "name",
+    "measurement_unit",
+    "weight_per_unit",
+    "protein_per_100g",
+    "calories_per_100g",
+    "fat_per_100g",
+    "carbohydrates_per_100g",
+    "alcohol_percentage",
+]
+MACRO_COLUMNS = ["protein_per_100g", "calories_per_100g", "fat_per_100g", "carbohydrates_per_100g"]
+LOOKUP_BATCH = 500  # bound parameters per query; SQLite before 3.32 allows at most 999
+IMPORT_BATCH = 5000
+
+# Conversion factors to our units (grams per 100 g, kcal per 100 g, % alcohol by volume), by source unit.
+UNIT_FACTORS = {
+    "calories_per_100g": {"kcal": 1.0, "kj": 1 / 4.184},
+    "alcohol_percentage": {"%": 1.0, "vol": 1.0, "g": 1 / 0.789},  # g ethanol per 100 g, at a density of about 1
+    **{column: {"g": 1.0, "mg": 0.001, "ug": 0.000001, "µg": 0.000001} for column in MACRO_COLUMNS if column != "calories_per_100g"},
+}
+DEFAULT_UNITS = {"calories_per_100g": "kcal", "alcohol_percentage": "%"}
+MEASUREMENT_UNITS = {
+    "g": "g",
+    "gr": "g",
+    "gram": "g",
+    "grams": "g",
+    "100g": "g",
+    "ml": "ml",
+    "milliliter": "ml",
+    "millilitre": "ml",
+    "100ml": "ml",
+    "stuk": "stuks",
+    "stuks": "stuks",
+    "piece": "stuks",
+    "pieces": "stuks",
+}
+TRACE = re.compile(r"^(tr|trace|sp|sporen|<.*)$", re.IGNORECASE)  # trace amounts count as zero
+MISSING = {"", "-", "na", "n/a", "nan", "?"}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS ingredients (
+    name TEXT PRIMARY KEY,
+    {", ".join(f"{column} TEXT" for column in COLUMNS[1:])},
+    source TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ingredients_source ON ingredients (source);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class ImportStats:
+    read: int = 0
+    imported: int = 0
+    duplicates: int = 0  # names seen earlier in the file, or already in the store
+    invalid: int = 0  # rows without a name or a required macro
+
+
+def normalize_name(name: str) -> str:
+    """Imported names follow ingredients.csv: lower case, single spaces."""
+    return " ".join(name.split()).lower()
+
+
+def _number(value: str | None, decimal: str) -> float | None:
+    text = (value or "").strip()
+    if text.lower() in MISSING:
+        return None
+    if TRACE.match(text):
+        return 0.0
+    try:
+        return float(text.replace(decimal, ".") if decimal != "." else text)
+    except ValueError:
+        return None
+
+
+def _number_text(value: float) -> str:
+    return f"{round(value, 2):g}"
+
+
+def parse_mapping(specs: Iterable[str]) -> dict[str, tuple[str, str | None]]:
+    """
+    Parse ``COLUMN=SOURCE[:UNIT]`` specs into ``{column: (source column, unit)}``. Raises ValueError
+    for unknown columns or units.
+    """
+    mapping: dict[str, tuple[str, str | None]] = {}
+    for spec in specs:
+        column, _, source = spec.partition("=")
+        unit = None
+        if ":" in source:
+            source, unit = source.rsplit(":", 1)
+            unit = unit.lower()
+        if column not in COLUMNS or not source:
+            raise ValueError(f"invalid mapping {spec!r}: expected COLUMN=SOURCE[:UNIT] with COLUMN one of {', '.join(COLUMNS)}")
+        if unit is not None and unit not in UNIT_FACTORS.get(column, {}):
+            raise ValueError(f"invalid mapping {spec!r}: unit of {column} must be one of {', '.join(UNIT_FACTORS.get(column, {})) or 'none'}")
+        mapping[column] = (source, unit)
+    return mapping
+
+
+class IngredientStore:
+    def __init__(self, path: str | Path = STORE_FILE) -> None:
+        self.path = Path(path)
+        self.connection = sqlite3.connect(self.path)
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, STORE_VERSION):
+                raise ValueError(f"{self.path} is an ingredient store of version {version}, expected {STORE_VERSION}")
+            self.connection.execute(f"PRAGMA user_version = {STORE_VERSION}")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return int(self.connection.execute("SELECT count(*) FROM ingredients").fetchone()[0])
+
+    def lookup(self, names: Iterable[str]) -> list[dict[str, str]]:
+        """The rows of the ingredients called ``names`` (those that exist), by name, as ``csv.DictReader`` would return them."""
+        wanted = sorted(set(names))
+        rows: list[dict[str, str]] = []
+        select = f"SELECT {', '.join(COLUMNS)} FROM ingredients WHERE name IN"
+        for start in range(0, len(wanted), LOOKUP_BATCH):
+            batch = wanted[start : start + LOOKUP_BATCH]
+            cursor = self.connection.execute(f"{select} ({', '.join('?' * len(batch))}) ORDER BY name", batch)
+            rows.extend(dict(zip(COLUMNS, values)) for values in cursor)
+        return rows
+
+    def names(self) -> list[str]:
+        return [name for (name,) in self.connection.execute("SELECT name FROM ingredients ORDER BY name")]
+
+    def sources(self) -> dict[str, int]:
+        """The number of rows per source."""
+        return dict(self.connection.execute("SELECT source, count(*) FROM ingredients GROUP BY source ORDER BY source"))
+
+    def sync_csv(self, records: list[dict[str, str | None]], text: str) -> bool:
+        """
+        Mirror the ingredients.csv ``records`` into the store, replacing the rows of its previous
+        version and any imported rows of the same names. ``text`` is the file's contents: nothing
+        happens while it is unchanged. Returns True if the store was updated.
+        """
+        content_hash = hashlib.sha256(text.encode()).hexdigest()
+        row = self.connection.execute("SELECT value FROM meta WHERE key = 'csv_hash'").fetchone()
+        if row and row[0] == content_hash:
+            return False
+        rows = [[record.get(column) or "" for column in COLUMNS] + [CSV_SOURCE] for record in records if record.get("name")]
+        with self.connection:
+            self.connection.execute("DELETE FROM ingredients WHERE source = ?", (CSV_SOURCE,))
+            self.connection.executemany(f"INSERT OR REPLACE INTO ingredients VALUES ({', '.join('?' * (len(COLUMNS) + 1))})", rows)
+            self.connection.execute("INSERT OR REPLACE INTO meta VALUES ('csv_hash', ?)", (content_hash,))
+        return True
+
+    def import_rows(
+        self,
+        rows: Iterable[dict[str, str]],
+        mapping: dict[str, tuple[str, str | None]],
+        source: str,
+        decimal: str = ".",
+        replace: bool = False,
+    ) -> ImportStats:
+        """
+        Stream ``rows`` (dicts by source column, e.g. from ``csv.DictReader``) into the store.
+
+        ``mapping`` maps our columns onto source columns and units (see ``parse_mapping``); values
+        are converted to grams, kcal and % alcohol per 100 g and names are normalized. Only the
+        first row of a name is kept. Names already in the store keep their row, unless ``replace``
+        is set and the row was imported too: rows from ingredients.csv are never replaced. Rows are
+        written in batches within one transaction. Returns what happened to the rows.
+        """
+        if "name" not in mapping:
+            raise ValueError("the mapping needs a source column for 'name'")
+        stats = ImportStats()
+        seen: set[str] = set()
+        conflict = (
+            f"DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in COLUMNS[1:])}, source = excluded.source "
+            f"WHERE ingredients.source != '{CSV_SOURCE}'"
+            if replace
+            else "DO NOTHING"
+        )
+        insert = f"INSERT INTO ingredients VALUES ({', '.join('?' * (len(COLUMNS) + 1))}) ON CONFLICT (name) {conflict}"
+
+        def converted() -> Iterator[list[str]]:
+            for row in rows:
+                stats.read += 1
+                name = normalize_name(row.get(mapping["name"][0]) or "")
+                values = self._convert(row, mapping, decimal)
+                if not name or values is None:
+                    stats.invalid += 1
+                elif name in seen:
+                    stats.duplicates += 1
+                else:
+                    seen.add(name)
+                    yield [name, *values, source]
+
+        batch: list[list[str]] = []
+        with self.connection:
+            before = self.connection.total_changes
+            for values in converted():
+                batch.append(values)
+                if len(batch) == IMPORT_BATCH:
+                    self.connection.executemany(insert, batch)
+                    batch = []
+            self.connection.executemany(insert, batch)
+            stats.imported = self.connection.total_changes - before
+        stats.duplicates += len(seen) - stats.imported
+        return stats
+
+    @staticmethod
+    def _convert(row: dict[str, str], mapping: dict[str, tuple[str, str | None]], decimal: str) -> list[str] | None:
+        """Our columns after ``name`` for one source row, or None when a macro is missing."""
+        unit_source = mapping.get("measurement_unit")
+        unit = (row.get(unit_source[0]) or "").strip().lower().replace(" ", "") if unit_source else "g"
+        unit = MEASUREMENT_UNITS.get(unit.removeprefix("per"), unit) or "g"
+        weight_source = mapping.get("weight_per_unit")
+        weight = _number(row.get(weight_source[0]), decimal) if weight_source else None
+
+        values = [unit, _number_text(weight) if weight else ""]
+        for column in COLUMNS[3:]:
+            if column not in mapping:
+                if column in MACRO_COLUMNS:
+                    return None
+                values.append("0")
+                continue
+            source_column, source_unit = mapping[column]
+            value = _number(row.get(source_column), decimal)
+            if value is None:
+                if column in MACRO_COLUMNS:
+                    return None
+                value = 0.0
+            factor = UNIT_FACTORS[column][source_unit or DEFAULT_UNITS.get(column, "g")]
+            values.append(_number_text(value * factor))
+        return values
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Manage the SQLite ingredient store.")
+    parser.add_argument("--store", default=str(STORE_FILE), help=f"store file (default: {STORE_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="import a food-composition dataset (CSV)")
+    importer.add_argument("file")
+    importer.add_argument(
+        "--map",
+        action="append",
+        default=[],
+        metavar="COLUMN=SOURCE[:UNIT]",
+        help="read COLUMN from the SOURCE column, in UNIT (e.g. calories_per_100g=ENERCJ:kJ); defaults to our own column names",
+    )
+    importer.add_argument("--source", help="name recorded for the imported rows (default: the file name)")
+    importer.add_argument("--delimiter", default=",")
+    importer.add_argument("--decimal", default=".", help="decimal separator of the numbers (default: .)")
+    importer.add_argument("--encoding", default="utf-8-sig")
+    importer.add_argument("--replace", action="store_true", help="replace earlier imported rows of the same name (never ingredients.csv rows)")
+    commands.add_parser("stats", help="print the number of ingredients per source")
+    args = parser.parse_args()
+
+    store = IngredientStore(args.store)
+    if args.command == "stats":
+        for source, count in store.sources().items():
+            print(f"{source}: {count} ingredient(s)")
+        print(f"{len(store)} ingredient(s) in {args.store}")
+        return 0
+
+    mapping: dict[str, tuple[str, str | None]] = {column: (column, None) for column in COLUMNS}
+    try:
+        if args.map:
+            mapping = parse_mapping(args.map)
+    except ValueError as e:
+        parser.error(str(e))
+    with open(args.file, newline="", encoding=args.encoding) as f:
+        reader = csv.DictReader(f, delimiter=args.delimiter)
+        missing = [source for source, _ in mapping.values() if source not in (reader.fieldnames or [])]
+        if missing:
+            parser.error(f"{args.file} has no column(s) {', '.join(missing)}")
+        stats = store.import_rows(reader, mapping, args.source or Path(args.file).name, args.decimal, args.replace)
+    print(f"{stats.read} row(s) read: {stats.imported} imported, {stats.duplicates} duplicate(s) skipped, {stats.invalid} invalid row(s) skipped.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Typed data model of the catalogue, shared by generate_static_website.py and check_data_entries.py.
+
+``Ingredient`` is one ingredients.csv row with its four macros as fields, so reading a value is an
+attribute lookup instead of a scan over a list of ``{"name", "quantity_per_100_g"}`` dicts. A
+``Recipe`` is built from a recipe's parsed YAML once it passed validation: recipes and variants
+both consist of ``Component``s (a single unnamed one when the ingredients are listed directly),
+which hold ``RecipeIngredient`` lines. All classes are frozen and slotted, and names are interned,
+so the thousands of objects a large catalogue creates share their strings and carry no ``__dict__``.
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+MACROS = ("protein", "calories", "fat", "carbohydrates")
+
+
+def _float(value: Any) -> float:
+    return float(value) if value else 0
+
+
+@dataclass(frozen=True, slots=True)
+class Ingredient:
+    name: str
+    measurement_unit: str
+    weight_per_unit: float  # grams per unit; 0 when quantities are already in grams or millilitres
+    protein: float  # macros per 100 g
+    calories: float
+    fat: float
+    carbohydrates: float
+    alcohol_percentage: float = 0
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "Ingredient":
+        """Build an ingredient from an ingredients.csv row as ``csv.DictReader`` returns it."""
+        return cls(
+            name=sys.intern(row["name"]),
+            measurement_unit=sys.intern(row["measurement_unit"]),
+            weight_per_unit=_float(row["weight_per_unit"]),
+            protein=_float(row.get("protein_per_100g")),
+            calories=_float(row.get("calories_per_100g")),
+            fat=_float(row.get("fat_per_100g")),
+            carbohydrates=_float(row.get("carbohydrates_per_100g")),
+            alcohol_percentage=_float(row.get("alcohol_percentage")),
+        )
+
+    @property
+    def macros(self) -> tuple[float, float, float, float]:
+        """The macros per 100 g in ``MACROS`` order."""
+        return self.protein, self.calories, self.fat, self.carbohydrates
+
+
+@dataclass(frozen=True, slots=True)
+class RecipeIngredient:
+    name: str
+    quantity: float = 0
+    recipe_reference: str | None = None  # filename (without extension) of the recipe this line is made from
+
+    @classmethod
+    def from_yaml(cls, item: dict[str, Any]) -> "RecipeIngredient":
+        reference = item.get("recipe_reference")
+        return cls(sys.intern(item["name"]), item.get("quantity", 0), sys.intern(reference) if reference else None)
+
+
+@dataclass(frozen=True, slots=True)
+class Component:
+    name: str | None  # None when the recipe or variant lists its ingredients directly
+    ingredients: tuple[RecipeIngredient, ...]
+
+
+def _components(content: dict[str, Any]) -> tuple[Component, ...]:
+    if "components" in content:
+        return tuple(
+            Component(sys.intern(c["name"]), tuple(RecipeIngredient.from_yaml(item) for item in c.get("ingredients", [])))
+            for c in content["components"]
+        )
+    return (Component(None, tuple(RecipeIngredient.from_yaml(item) for item in content.get("ingredients", []))),)
+
+
+def _lines(components: tuple[Component, ...]) -> list[RecipeIngredient]:
+    return [line for component in components for line in component.ingredients]
+
+
+@dataclass(frozen=True, slots=True)
+class Variant:
+    name: str
+    components: tuple[Component, ...]
+
+    @property
+    def ingredients(self) -> list[RecipeIngredient]:
+        """Every ingredient line of the variant, across its components."""
+        return _lines(self.components)
+
+
+@dataclass(frozen=True, slots=True)
+class Recipe:
+    name: str
+    components: tuple[Component, ...]  # the recipe's own, or those of its first variant
+    variants: tuple[Variant, ...] = ()
+    description: str = ""
+    steps: tuple[str, ...] = ()
+    rating: int = 0
+    spice_level: int = 0
+    preparation_time: int | None = None
+    dietary_labels: tuple[str, ...] = ()
+
+    @classmethod
+    def from_yaml(cls, data: dict[str, Any]) -> "Recipe":
+        """Build a recipe from its parsed YAML, which must pass ``check_data_entries.check_recipe_data``."""
+        variants = tuple(Variant(sys.intern(name), _components(content)) for name, content in data.get("variants", {}).items())
+        return cls(
+            name=data["recipe_name"],
+            components=variants[0].components if variants else _components(data),
+            variants=variants,
+            description=data.get("description", ""),
+            steps=tuple(data.get("steps", [])),
+            rating=data.get("rating", 0),
+            spice_level=data.get("spice_level", 0),
+            preparation_time=data.get("preparation_time"),
+            dietary_labels=tuple(sys.intern(label) for label in data.get("dietary_labels", [])),
+        )
+
+    @property
+    def ingredients(self) -> list[RecipeIngredient]:
+        """The ingredient lines of ``components``: the whole recipe, or its first variant."""
+        return _lines(self.components)
+
+    def lines(self) -> Iterator[tuple[str | None, Component, RecipeIngredient]]:
+        """Yield ``(variant name or None, component, line)`` for every ingredient line of every variant."""
+        sources = [(variant.name, variant.components) for variant in self.variants] if self.variants else [(None, self.components)]
+        for variant_name, components in sources:
+            for component in components:
+                for line in component.ingredients:
+                    yield variant_name, component, line
+
+    def references(self) -> list[tuple[str, str]]:
+        """The distinct ``(ingredient name, referenced recipe)`` pairs, like ``catalogue.recipe_references``."""
+        return sorted({(line.name, line.recipe_reference) for _, _, line in self.lines() if line.recipe_reference})
@@ -0,0 +1,192 @@
+"""
+Machine-readable export of the computed nutrition, written by the build next to the pages.
+
+Every recipe gets a static JSON API file, ``api/recipes/<recipe>.json``, with its attributes, the
+macros of each variant and every ingredient line (see ``generate_static_website._recipe_export``).
+The same rows are streamed into two tables under ``api/export/`` for bulk use, one row per recipe
+variant (``recipe_variants``) and one per recipe-ingredient line (``recipe_lines``), as CSV and
+NDJSON, and as Parquet when pyarrow is installed (``pip install .[export]``).
+
+``ExportWriter`` gets the recipes in catalogue order while the build computes and renders them.
+A recipe the build did not recompute contributes the rows of its API file from an earlier build,
+and the tables are only opened once a recomputed recipe comes along, so a build that changed no
+recipe does not read or write them at all.
+"""
+
+import csv
+import hashlib
+import json
+import os
+from typing import IO, Any
+
+API_DIR = "api"
+RECIPE_API_DIR = f"{API_DIR}/recipes"
+EXPORT_DIR = f"{API_DIR}/export"
+EXPORT_VERSION = 1  # bump when the rows change shape, so every API file is rewritten
+
+RECIPE_FIELDS = ("recipe", "name", "category")
+VARIANT_FIELDS = (
+    "variant",
+    "total_calories",
+    "total_protein",
+    "total_fat",
+    "total_carbs",
+    "calories_100g",
+    "protein_100g",
+    "fat_100g",
+    "carbs_100g",
+    "alcohol_percentage",
+)
+LINE_FIELDS = ("variant", "component", "ingredient", "recipe_reference", "quantity", "unit", "grams", "calories", "protein", "fat", "carbs")
+TEXT_FIELDS = {"recipe", "name", "category", "variant", "component", "ingredient", "recipe_reference", "unit"}
+TABLES = {
+    "recipe_variants": ("variants", RECIPE_FIELDS + VARIANT_FIELDS),
+    "recipe_lines": ("lines", RECIPE_FIELDS[:1] + LINE_FIELDS),
+}
+PARQUET_BATCH = 10_000  # rows buffered per Parquet row group
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def recipe_api_path(filename: str) -> str:
+    """The API file of the recipe page ``filename``, relative to the site root."""
+    return f"{RECIPE_API_DIR}/{os.path.splitext(filename)[0]}.json"
+
+
+def api_json(export: dict[str, Any]) -> str:
+    return json.dumps(export, ensure_ascii=False, separators=(",", ":"))
+
+
+def export_paths(parquet: bool | None = None) -> list[str]:
+    """The table files the build writes, relative to the site root."""
+    formats = ["csv", "ndjson"] + (["parquet"] if (parquet_available() if parquet is None else parquet) else [])
+    return [f"{EXPORT_DIR}/{table}.{suffix}" for table in TABLES for suffix in formats]
+
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Table:
+    """One table being written to temporary files next to its CSV, NDJSON and optional Parquet files."""
+
+    def __init__(self, base: str, fields: tuple[str, ...], parquet: bool) -> None:
+        self.base = base
+        self.fields = fields
+        self.files: dict[str, IO[str]] = {suffix: open(f"{base}.{suffix}.tmp", "w", newline="", encoding="utf-8") for suffix in ("csv", "ndjson")}
+        self.csv = csv.writer(self.files["csv"])
+        self.csv.writerow(fields)
+        self.parquet: Any = None
+        self.batch: list[dict[str, Any]] = []
+        if parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(field, pa.string() if field in TEXT_FIELDS else pa.float64()) for field in fields])
+            self.parquet = pq.ParquetWriter(f"{base}.parquet.tmp", schema)
+
+    def write(self, rows: list[dict[str, Any]]) -> None:
+        for row in rows:
+            self.csv.writerow([row[field] for field in self.fields])
+            self.files["ndjson"].write(json.dumps({field: row[field] for field in self.fields}, ensure_ascii=False) + "\n")
+        if self.parquet is not None:
+            self.batch.extend(rows)
+            if len(self.batch) >= PARQUET_BATCH:
+                self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        self.parquet.write_table(pa.Table.from_pylist(self.batch, schema=self.parquet.schema))
+        self.batch = []
+
+    def close(self) -> list[str]:
+        """Close the temporary files; their paths."""
+        for file in self.files.values():
+            file.close()
+        suffixes = list(self.files)
+        if self.parquet is not None:
+            if self.batch:
+                self._flush()
+            self.parquet.close()
+            suffixes.append("parquet")
+        return [f"{self.base}.{suffix}.tmp" for suffix in suffixes]
+
+
+class ExportWriter:
+    """Streams the per-recipe exports into the bulk tables under ``output_dir``; see the module docstring."""
+
+    def __init__(self, output_dir: str, parquet: bool | None = None) -> None:
+        self.output_dir = output_dir
+        self.parquet = parquet_available() if parquet is None else parquet
+        self._waiting: list[str] = []  # API files of recipes added before the tables were opened
+        self._tables: dict[str, _Table] | None = None
+
+    @property
+    def relpaths(self) -> list[str]:
+        return export_paths(self.parquet)
+
+    def add(self, api_relpath: str, export: dict[str, Any] | None) -> None:
+        """Append a recipe's rows: ``export`` if it was recomputed, else those of its API file at ``api_relpath``."""
+        if export is None:
+            if self._tables is None:
+                self._waiting.append(api_relpath)
+                return
+            export = self._read(api_relpath)
+        elif self._tables is None:
+            self._open()
+        self._write(export)
+
+    def close(self, rewrite: bool, previous_hashes: dict[str, str]) -> dict[str, str] | None:
+        """
+        Finish the tables and return the hash of each file by relpath, or None if no recipe was
+        recomputed and ``rewrite`` (e.g. because a recipe was removed) is false: the files are as before.
+        A file whose content equals ``previous_hashes`` is left untouched on disk.
+        """
+        if self._tables is None:
+            if not rewrite:
+                return None
+            self._open()
+        assert self._tables is not None
+        hashes = {}
+        for table in self._tables.values():
+            for temporary in table.close():
+                path = temporary[: -len(".tmp")]
+                relpath = os.path.relpath(path, self.output_dir).replace(os.sep, "/")
+                hashes[relpath] = _file_hash(temporary)
+                if previous_hashes.get(relpath) == hashes[relpath] and os.path.exists(path):
+                    os.remove(temporary)
+                else:
+                    os.replace(temporary, path)
+        self._tables = None
+        return hashes
+
+    def _open(self) -> None:
+        os.makedirs(os.path.join(self.output_dir, EXPORT_DIR), exist_ok=True)
+        self._tables = {
+            table: _Table(os.path.join(self.output_dir, EXPORT_DIR, table), fields, self.parquet) for table, (_, fields) in TABLES.items()
+        }
+        waiting, self._waiting = self._waiting, []
+        for api_relpath in waiting:
+            self._write(self._read(api_relpath))
+
+    def _read(self, api_relpath: str) -> dict[str, Any]:
+        with open(os.path.join(self.output_dir, api_relpath), encoding="utf-8") as f:
+            export: dict[str, Any] = json.load(f)
+        return export
+
+    def _write(self, export: dict[str, Any]) -> None:
+        assert self._tables is not None
+        recipe = {field: export[field] for field in RECIPE_FIELDS}
+        for table, (key, _) in TABLES.items():
+            self._tables[table].write([{**recipe, **row} for row in export[key]])
@@ -0,0 +1,98 @@
+"""
+Build instrumentation for ``--profile``.
+
+Code marks stages with ``profiler.span(name, **args)``; while the profiler is disabled (the default)
+a span costs a single attribute check. When enabled, every span records its wall and CPU time,
+process and thread. ``write_trace`` exports them as Chrome trace-event JSON (open it in
+chrome://tracing or https://ui.perfetto.dev) and ``summary`` renders per-stage totals plus the
+slowest spans per ``recipe``/``template`` argument as a table.
+
+Spans recorded in worker processes are shipped back with the task results via ``collect``.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+T = TypeVar("T")
+DEFAULT_TRACE_FILE = os.path.join(".nomstats_cache", "profile.trace.json")
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.events: list[dict[str, Any]] = []
+
+    @contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        wall_start, cpu_start = time.perf_counter_ns(), time.thread_time_ns()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter_ns() - wall_start, time.thread_time_ns() - cpu_start
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": wall_start / 1000,  # the monotonic clock is shared by all processes
+                    "dur": wall / 1000,
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "args": {**args, "cpu_ms": round(cpu / 1e6, 3)},
+                }
+            )
+
+    def drain(self) -> list[dict[str, Any]]:
+        events, self.events = self.events, []
+        return events
+
+    def absorb(self, events: list[dict[str, Any]]) -> None:
+        """Add spans recorded by another process (see ``collect``)."""
+        self.events.extend(events)
+
+    def write_trace(self, path: str = DEFAULT_TRACE_FILE) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+
+    def summary(self, slowest: int = 5) -> str:
+        stages: dict[str, list[float]] = {}
+        for event in self.events:
+            totals = stages.setdefault(event["name"], [0, 0.0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += event["dur"] / 1000
+            totals[2] += event["args"]["cpu_ms"]
+            totals[3] = max(totals[3], event["dur"] / 1000)
+
+        lines = [f"{'stage':<28}{'count':>7}{'wall ms':>11}{'cpu ms':>11}{'max ms':>10}"]
+        for name, (count, wall, cpu, longest) in sorted(stages.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<28}{count:>7}{wall:>11.1f}{cpu:>11.1f}{longest:>10.2f}")
+
+        for key in ("recipe", "template", "page"):
+            per_key: dict[str, float] = {}
+            for event in self.events:
+                if key in event["args"]:
+                    per_key[event["args"][key]] = per_key.get(event["args"][key], 0) + event["dur"] / 1000
+            if per_key:
+                lines.append(f"\nslowest by {key}:")
+                top = sorted(per_key.items(), key=lambda item: -item[1])[:slowest]
+                width = max(len(value) for value, _ in top) + 2
+                for value, wall in top:
+                    lines.append(f"  {value:<{width}}{wall:>10.2f} ms")
+        return "\n".join(lines)
+
+
+profiler = Profiler()
+
+
+def collect(function: Callable[[Any], T], argument: Any) -> tuple[T, list[dict[str, Any]]]:
+    """Run ``function(argument)`` in a worker with profiling on and return its result with the recorded spans."""
+    profiler.enabled = True
+    result = function(argument)
+    return result, profiler.drain()
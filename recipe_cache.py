@@ -0,0 +1,115 @@
+"""
+On-disk cache of parsed recipe YAML, shared by generate_static_website.py and check_data_entries.py.
+
+Entries are keyed by absolute path and validated per file: an unchanged mtime and size are trusted
+without reading the file, otherwise the content hash decides whether the cached parse still applies.
+A warm run over an unchanged tree therefore never invokes the YAML parser.
+"""
+
+import hashlib
+import os
+import pickle
+from typing import Any, NamedTuple
+
+import yaml
+
+from profiling import profiler
+
+CACHE_DIR = ".nomstats_cache"
+CACHE_FILE = os.path.join(CACHE_DIR, "recipes.pickle")
+CACHE_VERSION = 1
+
+# libyaml's C loader is an order of magnitude faster than the pure-Python one when it is available.
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def parse_yaml(raw: bytes | str) -> Any:
+    with profiler.span("yaml parse"):
+        return yaml.load(raw, Loader=YamlLoader)
+
+
+class CacheLookup(NamedTuple):
+    """Result of ``RecipeCache.lookup``: ``raw`` holds the file contents on a miss and is None on a hit."""
+
+    content_hash: str
+    data: Any
+    raw: bytes | None
+    stat: tuple[int, int]
+
+
+def read_recipe_file(path: str | os.PathLike[str]) -> CacheLookup:
+    """Read and hash a recipe file without consulting any cache (always a miss)."""
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    return CacheLookup(hashlib.sha256(raw).hexdigest(), None, raw, (st.st_mtime_ns, st.st_size))
+
+
+class RecipeCache:
+    def __init__(self, path: str = CACHE_FILE) -> None:
+        self.path = path
+        self._entries: dict[str, tuple[int, int, str, Any]] | None = None
+        self.dirty = False
+
+    @property
+    def entries(self) -> dict[str, tuple[int, int, str, Any]]:
+        """The cached entries, read from disk on first use so that processes that never look anything up skip it."""
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, "rb") as f:
+                    cached = pickle.load(f)
+                if cached.get("version") == CACHE_VERSION:
+                    self._entries = cached["entries"]
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+                pass
+        return self._entries
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def lookup(self, path: str | os.PathLike[str]) -> CacheLookup:
+        key = os.path.abspath(path)
+        entry = self.entries.get(key)
+        st = os.stat(path)
+        stat = (st.st_mtime_ns, st.st_size)
+        if entry and entry[:2] == stat:
+            return CacheLookup(entry[2], entry[3], None, stat)
+
+        lookup = read_recipe_file(path)
+        if entry and entry[2] == lookup.content_hash:
+            # Touched but not modified: refresh the stat key and keep the parsed data.
+            self.entries[key] = (*lookup.stat, entry[2], entry[3])
+            self.dirty = True
+            return lookup._replace(data=entry[3], raw=None)
+        return lookup
+
+    def store(self, path: str | os.PathLike[str], lookup: CacheLookup, data: Any) -> None:
+        self.entries[os.path.abspath(path)] = (*lookup.stat, lookup.content_hash, data)
+        self.dirty = True
+
+    def load(self, path: str | os.PathLike[str]) -> Any:
+        """Return the parsed YAML of ``path``, parsing and caching it on a miss."""
+        lookup = self.lookup(path)
+        if lookup.raw is None:
+            return lookup.data
+        data = parse_yaml(lookup.raw)
+        self.store(path, lookup, data)
+        return data
+
+    def save(self) -> None:
+        """Write the cache back to disk, dropping entries for files that no longer exist."""
+        if self._entries is None:
+            return
+        stale = [key for key in self.entries if not os.path.exists(key)]
+        for key in stale:
+            del self.entries[key]
+        if not (self.dirty or stale):
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "entries": self.entries}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,600 @@
+"""
+Query the computed recipes by their macros and plan meals that hit macro targets.
+
+``RecipeTable`` is a columnar table with one row per recipe variant (one row for a recipe without
+variants), built from the build records: the totals of the whole recipe, the per-100g macros,
+spice level, preparation time and rating as numpy columns, dietary labels as a bitmask per row and
+the category as a code. Filters are vectorised comparisons on those columns and top-k queries use
+``argpartition``, so a query over 100k rows takes milliseconds.
+
+Filters are written like the search page's macro terms, e.g. ``protein>=30`` or ``spice_level<=2``,
+but ``calories``/``kcal``, ``protein``, ``fat`` and ``carbs`` refer to the totals of the recipe (what
+one meal of it holds); the per-100g values are ``protein_100g`` etc. A servings multiplier scales the
+totals, like the servings field on the recipe pages.
+
+``plan_meals`` picks a number of meals whose summed totals meet constraints such as
+``protein>=150`` and ``calories<=2000`` and that maximise (or minimise) one total: a knapsack with
+a fixed number of items, solved by branch and bound over the matching rows at every allowed serving
+size. Its bound is the Lagrangian relaxation of the constraints (the linear programming bound, with
+multipliers fitted once per query), which also proves most infeasible queries infeasible before the
+search starts; cheaper order-based bounds (the next meals by score, the smallest remaining values)
+cut further. Every search node screens its candidates in one vectorised pass and hands only the
+survivors down, and the last meal is picked by a single vectorised scan, so Python only loops over
+branches that can still lead to a better plan. The search stops improving plans by less than a
+relative gap (1% by default, 0 for an exhaustive search): with 100k rows many plans lie within a
+fraction of a percent of each other and of the bound, and proving which is best takes far longer
+than finding them.
+
+Usage:
+    python recipe_query.py find [FILTER ...] [--label LABEL] [--category CATEGORY] [--top COLUMN] [--limit 10]
+    python recipe_query.py plan [FILTER ...] --total protein>=150 --total calories<=2000 [--meals 3] [--maximize protein] [--gap 0.01]
+"""
+
+import argparse
+import heapq
+import itertools
+import re
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+
+from catalogue import Catalogue
+from generate_static_website import (
+    CONFIG_DIR,
+    INGREDIENTS_FILE,
+    MANIFEST_FILE,
+    QUERY_FIELDS,
+    ingredient_hashes_from_rows,
+    ingredients_from_rows,
+    iter_recipes,
+    load_manifest,
+)
+
+TOTAL_COLUMNS = ("calories", "protein", "fat", "carbs")
+COLUMNS = TOTAL_COLUMNS + ("calories_100g", "protein_100g", "fat_100g", "carbs_100g", "spice_level", "preparation_time", "rating")
+COLUMN_ALIASES = {
+    "kcal": "calories",
+    "eiwit": "protein",
+    "vet": "fat",
+    "carbohydrates": "carbs",
+    "koolhydraten": "carbs",
+    "spice": "spice_level",
+    "time": "preparation_time",
+}
+COMPARISONS = {"<=": np.less_equal, ">=": np.greater_equal, "<": np.less, ">": np.greater, "=": np.equal}  # search_index.OPERATORS, vectorised
+QUERY_FILTER = re.compile(r"^([a-z_0-9]+)(<=|>=|<|>|=)(\d+(?:[.,]\d+)?)$")
+
+TOTALS_PRECISION = 6  # decimals plan totals are rounded to before they are compared
+TOLERANCE = 10.0**-TOTALS_PRECISION  # slack for rounding errors in the bounds the plan search prunes with
+
+DEFAULT_GAP = 0.01  # plans may be this fraction worse than the best possible (see plan_meals)
+
+Filter = tuple[str, str, float]  # (column, operator, bound)
+
+
+def parse_filter(term: str) -> Filter:
+    """Parse a term like ``protein>=30`` into ``(column, operator, bound)``; raises ValueError when it is not one."""
+    match = QUERY_FILTER.match(term.replace(" ", "").lower())
+    if not match:
+        raise ValueError(f"not a filter: {term!r} (expected e.g. protein>=30)")
+    column = COLUMN_ALIASES.get(match.group(1), match.group(1))
+    if column not in COLUMNS:
+        raise ValueError(f"unknown column {match.group(1)!r} in {term!r}; columns: {', '.join(COLUMNS)}")
+    return column, match.group(2), float(match.group(3).replace(",", "."))
+
+
+class RecipeTable:
+    def __init__(self, rows: Iterable[dict[str, Any]]) -> None:
+        """
+        Build the table from row dicts with ``filename``, ``name``, ``variant`` (or None), ``category``,
+        ``dietary_labels`` and every column of ``COLUMNS`` (``preparation_time`` may be None).
+        """
+        rows = list(rows)
+        self.filename = [row["filename"] for row in rows]
+        self.name = [row["name"] for row in rows]
+        self.variant = [row["variant"] for row in rows]
+        self.categories = sorted({row["category"] for row in rows})
+        self.labels = sorted({label for row in rows for label in row["dietary_labels"]})
+        self.columns = {column: np.array([np.nan if row[column] is None else row[column] for row in rows], dtype=np.float64) for column in COLUMNS}
+        category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.category = np.array([category_codes[row["category"]] for row in rows], dtype=np.int32)
+        label_bits = {label: 1 << bit for bit, label in enumerate(self.labels)}
+        self.label_mask = np.array([sum(label_bits[label] for label in set(row["dietary_labels"])) for row in rows], dtype=np.uint64)
+        recipe_ids = {filename: recipe_id for recipe_id, filename in enumerate(dict.fromkeys(self.filename))}
+        self.recipe_id = np.array([recipe_ids[filename] for filename in self.filename], dtype=np.int64)
+
+    @classmethod
+    def from_records(cls, records: dict[str, dict[str, Any]]) -> "RecipeTable":
+        """Build the table from build records (see ``generate_static_website._query_record``)."""
+        rows = []
+        for record in records.values():
+            summary, query = record["summary"], record.get("query")
+            if summary is None or query is None:
+                continue
+            for values in query["variants"]:
+                row = dict(zip(QUERY_FIELDS, values))
+                rows.append(
+                    {
+                        "filename": summary["filename"],
+                        "name": summary["name"],
+                        "variant": row["variant"],
+                        "category": summary["category"],
+                        "dietary_labels": summary["dietary_labels"],
+                        "calories": row["total_calories"],
+                        "protein": row["total_protein"],
+                        "fat": row["total_fat"],
+                        "carbs": row["total_carbs"],
+                        **{column: row[column] for column in ("calories_100g", "protein_100g", "fat_100g", "carbs_100g")},
+                        "spice_level": query["spice_level"],
+                        "preparation_time": query["preparation_time"],
+                        "rating": query["rating"],
+                    }
+                )
+        return cls(rows)
+
+    def __len__(self) -> int:
+        return len(self.filename)
+
+    def values(self, column: str, servings: float = 1) -> np.ndarray:
+        """A column, with the totals scaled by ``servings``."""
+        return self.columns[column] * servings if column in TOTAL_COLUMNS and servings != 1 else self.columns[column]
+
+    def mask(self, filters: Sequence[str] = (), labels: Sequence[str] = (), category: str | None = None, servings: float = 1) -> np.ndarray:
+        """
+        A boolean mask of the rows that pass every filter, carry every one of ``labels`` and are in
+        ``category`` (case-insensitive). Rows without a preparation time never pass a filter on it.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for column, op, bound in map(parse_filter, filters):
+            mask &= COMPARISONS[op](self.values(column, servings), bound)
+        if labels:
+            if not set(labels) <= set(self.labels):
+                return np.zeros(len(self), dtype=bool)
+            required = np.uint64(sum(1 << self.labels.index(label) for label in set(labels)))
+            mask &= (self.label_mask & required) == required
+        if category is not None:
+            codes = [code for code, name in enumerate(self.categories) if name.lower() == category.lower()]
+            mask &= self.category == (codes[0] if codes else -1)
+        return mask
+
+    def top(self, rows: np.ndarray, column: str, k: int, ascending: bool = False, servings: float = 1) -> np.ndarray:
+        """The (at most) ``k`` of ``rows`` with the highest (lowest) ``column``, best first; rows without a value come last."""
+        values = self.values(column, servings)[rows]
+        keys = np.nan_to_num(values if ascending else -values, nan=np.inf)
+        if k < len(rows):
+            best = np.argpartition(keys, k)[:k]
+            rows, keys = rows[best], keys[best]
+        return rows[np.argsort(keys, kind="stable")]
+
+    def row(self, index: int, servings: float = 1) -> dict[str, Any]:
+        """Row ``index`` as a dict, with the totals scaled by ``servings``."""
+        row: dict[str, Any] = {
+            "filename": self.filename[index],
+            "name": self.name[index],
+            "variant": self.variant[index],
+            "category": self.categories[self.category[index]],
+            "dietary_labels": [label for bit, label in enumerate(self.labels) if int(self.label_mask[index]) >> bit & 1],
+            "servings": servings,
+        }
+        for column in COLUMNS:
+            value = float(self.columns[column][index]) * (servings if column in TOTAL_COLUMNS else 1)
+            row[column] = None if np.isnan(value) else value
+        return row
+
+    def find(
+        self,
+        filters: Sequence[str] = (),
+        labels: Sequence[str] = (),
+        category: str | None = None,
+        order_by: str | None = None,
+        ascending: bool = False,
+        limit: int | None = None,
+        servings: float = 1,
+    ) -> list[dict[str, Any]]:
+        """The rows matching ``mask(filters, labels, category)``, optionally the ``limit`` best by ``order_by``."""
+        rows = np.flatnonzero(self.mask(filters, labels, category, servings))
+        if order_by is not None:
+            column = COLUMN_ALIASES.get(order_by, order_by)
+            if column not in COLUMNS:
+                raise ValueError(f"unknown column {order_by!r}; columns: {', '.join(COLUMNS)}")
+            rows = self.top(rows, column, len(rows) if limit is None else limit, ascending, servings)
+        elif limit is not None:
+            rows = rows[:limit]
+        return [self.row(int(index), servings) for index in rows]
+
+
+@dataclass(frozen=True)
+class MealPlan:
+    meals: tuple[tuple[int, float], ...]  # (table row, servings) per meal
+    totals: dict[str, float]  # summed TOTAL_COLUMNS
+
+
+def _top_sum(values: np.ndarray, k: int) -> float:
+    """The sum of the ``k`` largest ``values``."""
+    if k <= 0:
+        return 0.0
+    if k >= len(values):
+        return float(values.sum())
+    return float(np.partition(values, len(values) - k)[len(values) - k :].sum())
+
+
+def _lagrange_multipliers(score: np.ndarray, a: np.ndarray, b: np.ndarray, picks: int, iterations: int = 16, sample: int = 8192) -> np.ndarray:
+    """
+    Multipliers ``λ >= 0`` for the constraints ``sum(a[c]) <= b[c]`` on ``picks`` candidates that make
+    ``λ·b + top_sum(score - λ·a, picks)`` small. That is an upper bound on the score of every pick that
+    meets the constraints for any ``λ >= 0`` (the bound of the linear relaxation when minimal), so the
+    multipliers only need to be good, not exact: they are fitted on at most ``sample`` candidates (the
+    best half by score and a random half), by a golden-section search along each constraint from
+    zero, continued coordinate by coordinate from the best of those.
+    """
+    multipliers = np.zeros(len(b))
+    if not len(b) or len(score) < picks:
+        return multipliers
+    if len(score) > sample:
+        best = np.argpartition(-score, sample // 2)[: sample // 2]
+        others = np.random.default_rng(0).choice(len(score), sample // 2, replace=False)
+        subset = np.union1d(best, others)
+        score, a = score[subset], a[:, subset]
+    golden = (np.sqrt(5) - 1) / 2
+    scale = 2 * picks * (float(np.abs(score).max()) + 1)
+
+    def bound(candidate: np.ndarray) -> float:
+        return float(candidate @ b) + _top_sum(score - candidate @ a, picks)
+
+    def line_search(start: np.ndarray, c: int) -> np.ndarray:
+        low, high = 0.0, scale / max(abs(float(b[c])), 1)
+        for _ in range(iterations):
+            left, right = start.copy(), start.copy()
+            left[c], right[c] = high - golden * (high - low), low + golden * (high - low)
+            if bound(left) <= bound(right):
+                high = right[c]
+            else:
+                low = left[c]
+        result: np.ndarray = start.copy()
+        result[c] = (low + high) / 2
+        return result
+
+    multipliers = min((line_search(multipliers, c) for c in range(len(b))), key=bound)
+    for _ in range(2 if len(b) > 1 else 0):
+        for c in range(len(b)):
+            candidate = line_search(multipliers, c)
+            if bound(candidate) < bound(multipliers):
+                multipliers = candidate
+    return multipliers
+
+
+def _provably_infeasible(a: np.ndarray, b: np.ndarray, picks: int, iterations: int = 20) -> bool:
+    """
+    True when no ``picks`` candidates meet ``sum(a[c]) <= b[c]`` for every constraint: some ``μ >= 0``
+    makes the ``picks`` smallest values of ``μ·a`` exceed ``μ·b``. ``μ`` is searched per constraint
+    in ``[0, 1]`` after scaling every row of ``a`` to the same magnitude (the test is scale-free).
+    """
+    if not len(b) or a.shape[1] < picks:
+        return bool(a.shape[1] < picks)
+    scale = np.maximum(np.maximum(np.abs(a).max(axis=1), np.abs(b)), 1.0)
+    a, b = a / scale[:, None], b / scale
+    golden = (np.sqrt(5) - 1) / 2
+
+    def slack(weights: np.ndarray) -> float:
+        return -_top_sum(-(weights @ a), picks) - float(weights @ b)
+
+    weights = np.full(len(b), 1.0)
+    for c in range(len(b)):
+        if slack(weights) > TOLERANCE:
+            return True
+        low, high = 0.0, 1.0
+        for _ in range(iterations):
+            left, right = high - golden * (high - low), low + golden * (high - low)
+            at_left, at_right = weights.copy(), weights.copy()
+            at_left[c], at_right[c] = left, right
+            if slack(at_left) >= slack(at_right):
+                high = right
+            else:
+                low = left
+        weights[c] = (low + high) / 2
+    return slack(weights) > TOLERANCE
+
+
+class _PlanSearch:
+    """
+    The state of one ``plan_meals`` search. Candidates are sorted by score, best first; a plan is a
+    set of candidate indices, extended in increasing order.
+    """
+
+    def __init__(
+        self,
+        score: np.ndarray,
+        values: dict[str, np.ndarray],
+        constraints: list[Filter],
+        recipe_id: np.ndarray | None,
+        meals: int,
+        limit: int,
+        gap: float,
+    ) -> None:
+        self.score, self.values, self.constraints, self.recipe_id = score, values, constraints, recipe_id
+        self.meals, self.limit, self.gap = meals, limit, gap
+        self.maximum: dict[str, float] = {}
+        self.minimum: dict[str, float] = {}
+        for column, op, bound in constraints:
+            if op in ("<=", "<", "="):
+                self.maximum[column] = min(bound, self.maximum.get(column, np.inf))
+            if op in (">=", ">", "="):
+                self.minimum[column] = max(bound, self.minimum.get(column, -np.inf))
+
+        # Every constraint as sum(a) <= b (minima negated), folded into one column with the multipliers:
+        # a plan can only meet them if its ``weighted`` sum stays within ``budget``, and its score is at
+        # most ``budget`` minus that sum plus its ``relaxed`` sum.
+        limits = [(values[c], bound) for c, bound in self.maximum.items()] + [(-values[c], -bound) for c, bound in self.minimum.items()]
+        a = np.array([column for column, _ in limits]).reshape(len(limits), len(score))
+        b = np.array([bound for _, bound in limits], dtype=np.float64)
+        self.infeasible = _provably_infeasible(a, b, meals)
+        multipliers = _lagrange_multipliers(score, a, b, meals)
+        self.weighted = multipliers @ a if limits else np.zeros(len(score))
+        self.relaxed = score - self.weighted
+        self.budget = float(multipliers @ b)
+
+        self.best: list[tuple[float, int, tuple[int, ...]]] = []  # min-heap of (score, tiebreak, candidates)
+        self.nodes = 0
+        self._found = itertools.count()
+
+    def threshold(self) -> float:
+        """The score a plan must beat to be kept."""
+        return self.best[0][0] if len(self.best) == self.limit else -np.inf
+
+    def cutoff(self) -> float:
+        """The bound a branch must beat to be searched: ``threshold`` raised by the optimality gap."""
+        threshold = self.threshold()
+        return threshold + self.gap * abs(threshold) if threshold > -np.inf else threshold
+
+    def _add(self, plan_score: float, chosen: tuple[int, ...]) -> None:
+        entry = (plan_score, -next(self._found), chosen)  # ties: the plan found first wins
+        if len(self.best) < self.limit:
+            heapq.heappush(self.best, entry)
+        else:
+            heapq.heapreplace(self.best, entry)
+
+    def search(
+        self,
+        candidates: np.ndarray,
+        partial: dict[str, float],
+        partial_score: float = 0.0,
+        partial_weight: float = 0.0,
+        chosen: tuple[int, ...] = (),
+    ) -> None:
+        """
+        Find the plans that extend ``chosen`` (whose totals are ``partial``) with candidates from
+        ``candidates``, ascending indices that can still be part of a better plan.
+        """
+        self.nodes += 1
+        if self.recipe_id is not None and chosen:
+            candidates = candidates[self.recipe_id[candidates] != self.recipe_id[chosen[-1]]]
+        remaining = self.meals - len(chosen)
+        if len(candidates) < remaining:
+            return
+
+        if remaining == 1:
+            ok = np.ones(len(candidates), dtype=bool)
+            for column, op, bound in self.constraints:
+                # Rounded, so a plan's totals do not depend on the order they are summed in.
+                ok &= COMPARISONS[op](np.round(partial[column] + self.values[column][candidates], TOTALS_PRECISION), bound)
+            for index in candidates[ok][: self.limit]:
+                plan_score = partial_score + float(self.score[index])
+                if plan_score <= self.threshold():
+                    break
+                self._add(plan_score, chosen + (int(index),))
+            return
+
+        # Bounds on every plan that takes a candidate as any of the remaining meals: those failing them
+        # are dropped from the whole subtree.
+        budget = self.budget - partial_weight
+        weighted, relaxed = self.weighted[candidates], self.relaxed[candidates]
+        ok = weighted - _top_sum(-weighted, remaining - 1) <= budget + TOLERANCE * (1 + abs(budget))
+        upper = partial_score + budget + relaxed + _top_sum(relaxed, remaining - 1) + TOLERANCE
+        ok &= upper > self.cutoff()
+        candidates, upper = candidates[ok], upper[ok]
+        if len(candidates) < remaining:
+            return
+
+        # Bounds on plans that take a candidate as the next meal, so the others come after it: they
+        # must leave room for the smallest (largest) later values and score at most the next few.
+        first = np.ones(len(candidates), dtype=bool)
+        for column, bound in self.maximum.items():
+            column_values = self.values[column][candidates]
+            later = np.append(np.minimum.accumulate(column_values[::-1])[::-1][1:], np.inf)
+            first &= partial[column] + column_values + (remaining - 1) * later <= bound + TOLERANCE
+        for column, bound in self.minimum.items():
+            column_values = self.values[column][candidates]
+            later = np.append(np.maximum.accumulate(column_values[::-1])[::-1][1:], -np.inf)
+            first &= partial[column] + column_values + (remaining - 1) * later >= bound - TOLERANCE
+        prefix = np.concatenate(([0.0], np.cumsum(self.score[candidates])))
+        window = np.full(len(candidates), -np.inf)
+        window[: len(candidates) - remaining + 1] = prefix[remaining:] - prefix[:-remaining]
+        first_upper = np.minimum(upper, partial_score + window + TOLERANCE)
+
+        # Best bound first, so good plans are found early and raise the cutoff for the rest. When it
+        # rose, the candidates whose bound no longer beats it are dropped before the next branch.
+        positions = np.flatnonzero(first)
+        order = candidates[positions[np.argsort(-first_upper[positions], kind="stable")]]
+        order_upper = np.sort(first_upper[positions])[::-1]
+        cutoff = self.cutoff()
+        for index, index_upper in zip(order.tolist(), order_upper.tolist()):
+            if index_upper <= self.cutoff():
+                break
+            if self.cutoff() > cutoff:
+                cutoff = self.cutoff()
+                keep = upper > cutoff
+                candidates, upper = candidates[keep], upper[keep]
+            self.search(
+                candidates[np.searchsorted(candidates, index, side="right") :],
+                {c: partial[c] + float(self.values[c][index]) for c in self.values},
+                partial_score + float(self.score[index]),
+                partial_weight + float(self.weighted[index]),
+                chosen + (index,),
+            )
+
+
+def plan_meals(
+    table: RecipeTable,
+    totals: Sequence[str] = (),
+    meals: int = 3,
+    filters: Sequence[str] = (),
+    labels: Sequence[str] = (),
+    category: str | None = None,
+    objective: str = "protein",
+    minimize: bool = False,
+    servings: Sequence[float] = (1,),
+    distinct: bool = True,
+    limit: int = 1,
+    gap: float = DEFAULT_GAP,
+    stats: dict[str, int] | None = None,
+) -> list[MealPlan]:
+    """
+    The (at most) ``limit`` best plans of ``meals`` meals whose summed totals meet every constraint
+    in ``totals`` (filters on ``TOTAL_COLUMNS``), best first by the summed ``objective``. Every meal is
+    a row that passes ``filters``, ``labels`` and ``category`` at one of the ``servings`` multipliers;
+    with ``distinct`` no recipe appears twice, not even as another variant or serving size.
+    Branches are only searched when they can beat the plans found so far by more than the relative
+    ``gap``, so a returned plan is at most that fraction worse than the best possible one; with a gap
+    of 0 the search is exhaustive. ``stats``, when given, receives the number of candidates and of
+    search nodes visited.
+    """
+    constraints = [parse_filter(term) for term in totals]
+    objective = COLUMN_ALIASES.get(objective, objective)
+    for column in [objective] + [column for column, _, _ in constraints]:
+        if column not in TOTAL_COLUMNS:
+            raise ValueError(f"meal plans sum totals only; {column!r} is not one of {', '.join(TOTAL_COLUMNS)}")
+    if meals < 1:
+        raise ValueError("a meal plan needs at least one meal")
+
+    rows = np.flatnonzero(table.mask(filters, labels, category))
+    candidate_rows = np.tile(rows, len(servings))
+    candidate_servings = np.repeat(np.asarray(servings, dtype=np.float64), len(rows))
+    columns = {objective} | {column for column, _, _ in constraints}
+    values = {column: table.columns[column][candidate_rows] * candidate_servings for column in columns}
+    score = -values[objective] if minimize else values[objective]
+    order = np.argsort(-score, kind="stable")
+    search = _PlanSearch(
+        score[order],
+        {column: column_values[order] for column, column_values in values.items()},
+        constraints,
+        table.recipe_id[candidate_rows[order]] if distinct else None,
+        meals,
+        limit,
+        gap,
+    )
+    if not search.infeasible:
+        search.search(np.arange(len(score)), {column: 0.0 for column in columns})
+    if stats is not None:
+        stats.update(candidates=len(score), nodes=search.nodes)
+
+    plans = []
+    for _, _, candidates in sorted(search.best, reverse=True):
+        chosen = [(int(candidate_rows[order[c]]), float(candidate_servings[order[c]])) for c in candidates]
+        plan_totals = {
+            column: round(sum(float(table.columns[column][row]) * amount for row, amount in chosen), TOTALS_PRECISION) for column in TOTAL_COLUMNS
+        }
+        plans.append(MealPlan(tuple(chosen), plan_totals))
+    return plans
+
+
+def load_table(catalogue: Catalogue | None = None, manifest_file: str = MANIFEST_FILE) -> RecipeTable:
+    """
+    The table of the current catalogue. The records of the last build are reused and only recipes
+    that changed since are computed; nothing is written.
+    """
+    if catalogue is None:
+        catalogue = Catalogue(Path(CONFIG_DIR), Path(INGREDIENTS_FILE))
+    rows = catalogue.ingredient_records()
+    records = load_manifest(manifest_file)["recipes"]
+    for _ in iter_recipes(catalogue, ingredients_from_rows(rows), records, ingredient_hashes_from_rows(rows)):
+        pass
+    return RecipeTable.from_records(records)
+
+
+def _format(value: float | None) -> str:
+    return "-" if value is None else f"{value:g}"
+
+
+def _print_rows(rows: list[dict[str, Any]]) -> None:
+    print(f"{'recipe':<44}{'kcal':>8}{'protein':>9}{'fat':>7}{'carbs':>7}{'spice':>7}{'min':>6}  category")
+    for row in rows:
+        label = row["name"] + (f" ({row['variant']})" if row["variant"] else "") + (f" x{row['servings']:g}" if row["servings"] != 1 else "")
+        print(
+            f"{label[:43]:<44}{row['calories']:>8.0f}{row['protein']:>9.1f}{row['fat']:>7.1f}{row['carbs']:>7.1f}"
+            f"{_format(row['spice_level']):>7}{_format(row['preparation_time']):>6}  {row['category']}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    find_parser = commands.add_parser("find", help="list the recipe variants that match filters")
+    plan_parser = commands.add_parser("plan", help="find meal plans whose summed totals meet targets")
+    for command in (find_parser, plan_parser):
+        command.add_argument("filters", nargs="*", metavar="FILTER", help="per-recipe filter, e.g. protein>=30 spice_level<=2")
+        command.add_argument("--label", action="append", default=[], help="required dietary label (repeatable)")
+        command.add_argument("--category", help="only recipes in this category")
+        command.add_argument("--limit", type=int, default=10 if command is find_parser else 3, metavar="N")
+    find_parser.add_argument("--top", metavar="COLUMN", help="order by this column, highest first")
+    find_parser.add_argument("--ascending", action="store_true", help="with --top, lowest first")
+    find_parser.add_argument("--servings", type=float, default=1, help="scale the totals (default: 1)")
+    plan_parser.add_argument(
+        "--total", action="append", default=[], metavar="CONSTRAINT", help="constraint on the summed totals, e.g. calories<=2000"
+    )
+    plan_parser.add_argument("--meals", type=int, default=3, metavar="N", help="meals per plan (default: 3)")
+    goal = plan_parser.add_mutually_exclusive_group()
+    goal.add_argument("--maximize", metavar="TOTAL", help="total to maximise (default: protein)")
+    goal.add_argument("--minimize", metavar="TOTAL", help="total to minimise")
+    plan_parser.add_argument("--servings", type=float, nargs="+", default=[1], help="serving multipliers a meal may use (default: 1)")
+    plan_parser.add_argument(
+        "--gap",
+        type=float,
+        default=DEFAULT_GAP,
+        help=f"accept plans this fraction short of the best possible (default: {DEFAULT_GAP}; 0 = exhaustive)",
+    )
+    plan_parser.add_argument("--allow-repeats", action="store_true", help="allow a recipe in more than one meal (as another variant or serving size)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    table = load_table()
+    loaded = time.perf_counter()
+    try:
+        if args.command == "find":
+            rows = table.find(args.filters, args.label, args.category, args.top, args.ascending, args.limit, args.servings)
+            _print_rows(rows)
+            matches = int(table.mask(args.filters, args.label, args.category, args.servings).sum())
+            print(f"{len(rows)} of {matches} matching row(s) shown", end="")
+        else:
+            stats: dict[str, int] = {}
+            plans = plan_meals(
+                table,
+                args.total,
+                args.meals,
+                args.filters,
+                args.label,
+                args.category,
+                args.minimize or args.maximize or "protein",
+                bool(args.minimize),
+                args.servings,
+                not args.allow_repeats,
+                args.limit,
+                args.gap,
+                stats,
+            )
+            for number, plan in enumerate(plans, 1):
+                print(f"Plan {number}: " + ", ".join(f"{column} {value:.0f}" for column, value in plan.totals.items()))
+                _print_rows([table.row(row, amount) for row, amount in plan.meals])
+                print()
+            print(f"{len(plans)} plan(s) from {stats['candidates']} candidate meal(s), {stats['nodes']} search node(s)", end="")
+    except ValueError as error:
+        parser.error(str(error))
+    print(f" ({len(table)} rows loaded in {(loaded - start) * 1000:.0f} ms, query took {(time.perf_counter() - loaded) * 1000:.1f} ms).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
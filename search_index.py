@@ -0,0 +1,128 @@
+"""
+Prebuilt search index for the index page.
+
+The generator writes the index to ``static_site/search_index.json``; ``templates/index.html`` loads it
+on first use and answers queries from it instead of scanning the recipe links. ``search`` is the
+Python counterpart of the page's query code, used by the benchmark and handy for checking results.
+
+Every recipe is tokenized (name, description, ingredients, category, dietary labels) into a shared
+vocabulary. A query term matches every token that contains it: the term's trigrams narrow the
+vocabulary down to a few candidates, which are then checked with a substring test. All terms of a
+query must match, and terms such as ``protein>20`` or ``kcal<=300`` filter on the per-100g macros.
+"""
+
+import operator
+import re
+import unicodedata
+from typing import Any, Callable, Iterable
+
+SEARCH_INDEX_FILE = "search_index.json"
+SEARCH_INDEX_VERSION = 1
+
+DOC_FIELDS = ["filename", "name", "category", "dietary_labels", "protein_100g", "calories_100g", "fat_100g", "carbs_100g"]
+MACRO_ALIASES = {
+    "protein": "protein_100g",
+    "eiwit": "protein_100g",
+    "calories": "calories_100g",
+    "kcal": "calories_100g",
+    "fat": "fat_100g",
+    "vet": "fat_100g",
+    "carbs": "carbs_100g",
+    "koolhydraten": "carbs_100g",
+}
+OPERATORS: dict[str, Callable[[float, float], bool]] = {
+    "<=": operator.le,
+    ">=": operator.ge,
+    "<": operator.lt,
+    ">": operator.gt,
+    "=": operator.eq,
+}
+MACRO_FILTER = re.compile(r"^([a-z]+)(<=|>=|<|>|=)(\d+(?:[.,]\d+)?)$")
+TOKEN_SEPARATOR = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """Lower-case ``text`` and strip accents, so that 'crème' is found by 'creme'."""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    return [token for token in TOKEN_SEPARATOR.split(normalize(text)) if token]
+
+
+def trigrams(token: str) -> set[str]:
+    return {token[i : i + 3] for i in range(len(token) - 2)}
+
+
+def build_search_index(recipes: Iterable[dict[str, Any]], ingredients_by_recipe: dict[str, list[str]]) -> dict[str, Any]:
+    """
+    Build the index for ``recipes`` (the recipe data dicts of the build); documents are ordered by filename.
+    ``ingredients_by_recipe`` maps a recipe's output filename to the ingredient names it uses.
+
+    Documents are stored as rows of ``DOC_FIELDS``; ``postings[i]`` lists the documents containing
+    ``tokens[i]`` and ``trigrams`` maps each trigram to the tokens containing it.
+    """
+    docs = []
+    token_docs: dict[str, set[int]] = {}
+    for doc_id, recipe in enumerate(sorted(recipes, key=lambda r: r["filename"])):
+        docs.append([recipe[field] for field in DOC_FIELDS])
+        text = [
+            recipe["name"],
+            recipe["description"] or "",
+            recipe["category"],
+            *recipe["dietary_labels"],
+            *ingredients_by_recipe.get(recipe["filename"], []),
+        ]
+        for token in tokenize(" ".join(text)):
+            token_docs.setdefault(token, set()).add(doc_id)
+
+    tokens = sorted(token_docs)
+    token_trigrams: dict[str, list[int]] = {}
+    for token_id, token in enumerate(tokens):
+        for trigram in sorted(trigrams(token)):
+            token_trigrams.setdefault(trigram, []).append(token_id)
+
+    return {
+        "version": SEARCH_INDEX_VERSION,
+        "fields": DOC_FIELDS,
+        "docs": docs,
+        "tokens": tokens,
+        "postings": [sorted(token_docs[token]) for token in tokens],
+        "trigrams": dict(sorted(token_trigrams.items())),
+    }
+
+
+def _matching_docs(index: dict[str, Any], term: str) -> set[int]:
+    """Documents with a token containing ``term``."""
+    if len(term) < 3:
+        candidates: Iterable[int] = range(len(index["tokens"]))
+    else:
+        candidate_set: set[int] | None = None
+        for trigram in trigrams(term):
+            token_ids = set(index["trigrams"].get(trigram, ()))
+            candidate_set = token_ids if candidate_set is None else candidate_set & token_ids
+            if not candidate_set:
+                return set()
+        candidates = candidate_set or ()
+    docs: set[int] = set()
+    for token_id in candidates:
+        if term in index["tokens"][token_id]:
+            docs.update(index["postings"][token_id])
+    return docs
+
+
+def search(index: dict[str, Any], query: str) -> list[str]:
+    """Return the filenames of the recipes matching ``query``, in index order."""
+    result: set[int] = set(range(len(index["docs"])))
+    fields = index["fields"]
+    for term in normalize(query).split():
+        match = MACRO_FILTER.match(term)
+        if match and match.group(1) in MACRO_ALIASES:
+            column = fields.index(MACRO_ALIASES[match.group(1)])
+            compare, bound = OPERATORS[match.group(2)], float(match.group(3).replace(",", "."))
+            result = {doc_id for doc_id in result if compare(index["docs"][doc_id][column], bound)}
+            continue
+        for word in tokenize(term):
+            result &= _matching_docs(index, word)
+    return [index["docs"][doc_id][0] for doc_id in sorted(result)]
@@ -0,0 +1,267 @@
+"""
+Preview the NomStats site from memory, optionally rebuilding and live-reloading on every edit.
+
+The ingredient table, the computed recipes and the Jinja environment stay resident between
+rebuilds. A rebuild runs the same incremental ``iter_recipes`` as the static build against the
+in-memory records, so only edited recipes and the recipes that reference them are recomputed; the
+page data of every recipe is kept next to its record.
+Pages are rendered on request and kept in an LRU keyed by their input key, so a page is only
+rendered again once something it depends on changed. Nothing is written to ``static_site/``; files
+that are not generated (icons, 404.html) are served from it as they are.
+
+With ``--watch``, ``configuration/``, ``templates/`` and ``assets/`` are polled for changes and open pages reload
+themselves after each rebuild.
+
+Usage: python serve.py [--watch] [--port 8000] [--page-size N] [--ingredient-store [FILE]]
+"""
+
+import argparse
+import html
+import mimetypes
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from asset_bundle import ASSET_SOURCE_DIR
+from catalogue import Catalogue
+from generate_static_website import (
+    CONFIG_DIR,
+    DEFAULT_TARGET,
+    INGREDIENTS_FILE,
+    TARGETS,
+    UsageIndex,
+    get_env,
+    ingredient_hashes_from_rows,
+    ingredients_from_rows,
+    iter_recipes,
+    load_ingredient_rows,
+    prepare_templates,
+    recipe_api,
+    recipe_page,
+    recipe_summaries,
+    site_artefacts,
+    site_pages,
+)
+from ingredient_store import STORE_FILE
+from models import Ingredient
+from nutrition_export import api_json
+
+RELOAD_SCRIPT = "<script>new EventSource('/__events?since={version}').onmessage = () => location.reload();</script>"
+
+
+def _snapshot(*directories: str) -> dict[str, tuple[int, int]]:
+    """``(mtime, size)`` of every file below ``directories``, to detect edits by polling."""
+    snapshot = {}
+    for directory in directories:
+        for path in Path(directory).rglob("*"):
+            if path.is_file():
+                st = path.stat()
+                snapshot[str(path)] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+class Preview:
+    def __init__(
+        self, page_size: int = 0, live_reload: bool = False, max_pages: int = 512, store_file: str | None = None, target: str = DEFAULT_TARGET
+    ) -> None:
+        self.page_size = page_size
+        self.target = target
+        self.store_file = store_file
+        self.live_reload = live_reload
+        self.max_pages = max_pages
+        self.records: dict[str, dict[str, Any]] = {}
+        self.recipe_data: dict[str, dict[str, Any]] = {}
+        self.pages: dict[str, tuple[str, str, dict[str, Any]]] = {}
+        self.rendered: OrderedDict[tuple[str, str], bytes] = OrderedDict()
+        self.recipes: list[dict[str, Any]] = []
+        self.usage_index: UsageIndex = {}
+        self.asset_files: dict[str, str] = {}
+        self.artefacts: dict[str, bytes] | None = None
+        self.error: str | None = None
+        self.version = 0
+        self.changed = threading.Condition()
+        self.lock = threading.Lock()
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        """Bring the in-memory site up to date with the files on disk; on errors the last good state is kept."""
+        start = time.perf_counter()
+        try:
+            catalogue = Catalogue(Path(CONFIG_DIR), Path(INGREDIENTS_FILE), store_file=Path(self.store_file) if self.store_file else None)
+            records = {key: dict(record) for key, record in self.records.items()}
+            rows = load_ingredient_rows(catalogue, records)
+            ingredient_hashes = ingredient_hashes_from_rows(rows)
+            all_ingredients = ingredients_from_rows(rows)
+            recipe_data = dict(self.recipe_data)
+            derived: dict[str, Ingredient] = {}
+            recomputed = 0
+            for key, record, recipe in iter_recipes(
+                catalogue,
+                all_ingredients,
+                records,
+                ingredient_hashes,
+                needs_data=lambda key, record: record["summary"] is not None and key not in recipe_data,
+                derived=derived,
+            ):
+                if recipe is not None:
+                    recipe_data[key] = recipe
+                    recomputed += 1
+            recipe_data = {key: recipe_data[key] for key, record in records.items() if record["summary"] is not None}
+            usage_index: UsageIndex = {}
+            categories, recipes = recipe_summaries(records, usage_index)
+            template_hashes, _, asset_files = prepare_templates(self.target)
+            pages = [recipe_page(records[key], recipe, template_hashes) for key, recipe in recipe_data.items()]
+            pages.extend(site_pages(all_ingredients, ingredient_hashes, usage_index, categories, template_hashes, self.page_size, derived))
+        except Exception:
+            self.error = traceback.format_exc()
+            print(self.error)
+        else:
+            with self.lock:
+                self.records, self.recipe_data = records, recipe_data
+                self.pages = {relpath: (input_key, template_name, context) for relpath, input_key, template_name, context in pages}
+                self.recipes, self.usage_index = recipes, usage_index
+                self.asset_files = asset_files
+                self.artefacts = None
+                self.error = None
+            print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms ({recomputed} recipe(s) recomputed).")
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+    def _with_reload(self, page: str) -> str:
+        if not self.live_reload:
+            return page
+        return page.replace("</body>", RELOAD_SCRIPT.format(version=self.version) + "\n</body>", 1)
+
+    def get(self, relpath: str) -> bytes | None:
+        """The body of the page or generated file at ``relpath``, or None if the site has no such file."""
+        with self.lock:
+            if self.error is not None and relpath.endswith(".html"):
+                return self._with_reload(f"<html><body><h1>Build failed</h1><pre>{html.escape(self.error)}</pre></body></html>").encode()
+            if relpath in self.pages:
+                input_key, template_name, context = self.pages[relpath]
+                cached = self.rendered.get((relpath, input_key))
+                if cached is not None:
+                    self.rendered.move_to_end((relpath, input_key))
+                    return cached
+            else:
+                if self.artefacts is None:
+                    artefacts = {**self.asset_files, **site_artefacts(self.recipes, self.usage_index)}
+                    artefacts.update((recipe_api(self.records[key])[0], api_json(recipe["export"])) for key, recipe in self.recipe_data.items())
+                    self.artefacts = {path: content.encode() for path, content in artefacts.items()}
+                return self.artefacts.get(relpath)
+
+        body = self._with_reload(get_env(self.target).get_template(template_name).render(**context)).encode()
+        with self.lock:
+            self.rendered[(relpath, input_key)] = body
+            while len(self.rendered) > self.max_pages:
+                self.rendered.popitem(last=False)
+        return body
+
+    def watch(self, interval: float = 0.3) -> None:
+        """Rebuild whenever a file in the configuration, template or asset directory changes. Runs forever."""
+        template_dir = TARGETS[self.target].template_dir
+        snapshot = _snapshot(CONFIG_DIR, template_dir, ASSET_SOURCE_DIR)
+        while True:
+            time.sleep(interval)
+            current = _snapshot(CONFIG_DIR, template_dir, ASSET_SOURCE_DIR)
+            if current != snapshot:
+                snapshot = current
+                self.rebuild()
+
+    def wait_for_change(self, since: int, timeout: float) -> bool:
+        with self.changed:
+            return self.changed.wait_for(lambda: self.version > since, timeout)
+
+
+class PreviewHandler(BaseHTTPRequestHandler):
+    preview: Preview
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/__events":
+            self._events(int(parse_qs(url.query).get("since", ["0"])[0]))
+            return
+        relpath = url.path.lstrip("/") or "index.html"
+        body = self.preview.get(relpath)
+        if body is None:
+            body = self._static_file(relpath)
+        if body is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", mimetypes.guess_type(relpath)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _static_file(self, relpath: str) -> bytes | None:
+        root = os.path.realpath(TARGETS[self.preview.target].output_dir)
+        path = os.path.realpath(os.path.join(root, relpath))
+        if not path.startswith(root + os.sep) or not os.path.isfile(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _events(self, since: int) -> None:
+        """Server-sent events: one message per rebuild after version ``since``."""
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        try:
+            self.wfile.write(b"retry: 500\n\n")
+            while True:
+                if self.preview.wait_for_change(since, timeout=15):
+                    since = self.preview.version
+                    self.wfile.write(f"data: {since}\n\n".encode())
+                else:
+                    self.wfile.write(b": keep-alive\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.path.startswith("/__events"):
+            super().log_message(format, *args)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Preview the NomStats site from memory.")
+    parser.add_argument(
+        "--watch", action="store_true", help="rebuild on changes to configuration/, templates/ and assets/ and live-reload open pages"
+    )
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--page-size", type=int, default=0, metavar="N", help="list recipes on per-category pages of at most N recipes")
+    parser.add_argument(
+        "--ingredient-store",
+        nargs="?",
+        const=str(STORE_FILE),
+        metavar="FILE",
+        help=f"read ingredients from an SQLite ingredient store kept in sync with ingredients.csv (default: {STORE_FILE})",
+    )
+    parser.add_argument("--target", default=DEFAULT_TARGET, choices=list(TARGETS), help=f"flavour of the site to preview (default: {DEFAULT_TARGET})")
+    args = parser.parse_args()
+
+    PreviewHandler.preview = Preview(page_size=args.page_size, live_reload=args.watch, store_file=args.ingredient_store, target=args.target)
+    if args.watch:
+        threading.Thread(target=PreviewHandler.preview.watch, daemon=True).start()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), PreviewHandler)
+    server.daemon_threads = True
+    print(f"Serving on http://127.0.0.1:{args.port}/" + (" (watching for changes)" if args.watch else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
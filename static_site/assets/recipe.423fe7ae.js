@@ -0,0 +1,84 @@
+let servings = 1;
+const MAX_SERVINGS = 100;
+let warningTimeout = null;
+function updateDisplay() {
+document.getElementById("servings").textContent = servings;
+["total-calories", "total-protein", "total-fat", "total-carbs"].forEach(id => {
+const el = document.getElementById(id);
+const baseValue = parseFloat(el.dataset.base);
+if (!isNaN(baseValue)) {
+const isCalories = id.includes("calories");
+el.textContent = Math.round(baseValue * servings) + (isCalories ? "" : " g");
+}
+});
+document.querySelectorAll(".ingredients-list li").forEach(el => {
+const baseText = el.dataset.base;
+const match = baseText.match(/^([\d\.]+)\s*(.*)$/);  // find number + unit/name
+const newText = match
+? (parseFloat(match[1]) * servings).toFixed(2).replace(/\.00$/, "") + " " + match[2]
+: baseText;
+const a = el.querySelector('a');
+if (a) {
+a.textContent = newText;
+} else {
+el.textContent = newText;
+}
+});
+}
+function showWarningMessage() {
+const container = document.querySelector(".servings-control");
+let warning = document.getElementById("serving-warning");
+if (!warning) {
+warning = document.createElement("div");
+warning.id = "serving-warning";
+warning.style.color = "#e57373";
+warning.style.fontSize = "0.95rem";
+warning.style.marginTop = "0.5rem";
+warning.style.fontWeight = "normal";
+container.insertAdjacentElement("afterend", warning);
+}
+warning.textContent = `Misschien moet je maar een restaurant openen! Laten we het onder de ${MAX_SERVINGS} porties houden, oké?`;
+warning.style.opacity = 1;
+if (warningTimeout) clearTimeout(warningTimeout);
+warningTimeout = setTimeout(() => {
+warning.style.opacity = 0;
+}, 3000);
+}
+function increaseServings() {
+servings++;
+if (servings > MAX_SERVINGS) {
+servings = 1;
+showWarningMessage();
+}
+updateDisplay();
+}
+function decreaseServings() {
+if (servings > 1) {
+servings--;
+updateDisplay();
+}
+}
+function toggleVariant() {
+const variantKeys = Object.keys(variantData);
+const active = document.querySelector('.variant-btn.active').dataset.variant;
+const nextIdx = (variantKeys.indexOf(active) + 1) % variantKeys.length;
+switchVariant(variantKeys[nextIdx]);
+}
+function switchVariant(name) {
+const data = variantData[name];
+document.getElementById('total-calories').dataset.base = data.total_calories;
+document.getElementById('total-protein').dataset.base = data.total_protein;
+document.getElementById('total-fat').dataset.base = data.total_fat;
+document.getElementById('total-carbs').dataset.base = data.total_carbs;
+document.getElementById('calories-100g').textContent = Math.round(data.calories_100g);
+document.getElementById('protein-100g').textContent = Math.round(data.protein_100g) + ' g';
+document.getElementById('fat-100g').textContent = Math.round(data.fat_100g) + ' g';
+document.getElementById('carbs-100g').textContent = Math.round(data.carbs_100g) + ' g';
+const container = document.getElementById('ingredients-container');
+container.innerHTML = document.getElementById('variant-html-' + name).innerHTML;
+const btns = Array.from(document.querySelectorAll('.variant-btn'));
+const idx = btns.findIndex(btn => btn.dataset.variant === name);
+document.querySelector('.toggle-thumb').style.left = (idx * (100 / btns.length)) + '%';
+btns.forEach(btn => btn.classList.toggle('active', btn.dataset.variant === name));
+updateDisplay();
+}
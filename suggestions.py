@@ -0,0 +1,103 @@
+"""
+"Did you mean" suggestions for misspelt names, such as unknown ingredient references.
+
+``SuggestionIndex`` splits every name into trigrams after normalizing it (lower case, no accents, see
+``search_index.normalize``) and padding it with spaces, so that short names and word boundaries get
+trigrams too; each trigram has a posting list of the names containing it. A name within edit
+distance ``k`` of a query shares at least ``len(query trigrams) - 3k`` of its trigrams (one edit
+changes at most three), so it must contain one of the query's rarest ``3k + 1`` trigrams. A lookup
+therefore only walks the posting lists of those rare trigrams, counts the shared trigrams of the
+names it finds there and computes edit distances for the few that share enough: its cost follows
+the posting lists of a handful of rare trigrams, not the number of names.
+
+Suggestions are ranked by edit distance between the normalized names, then by shared trigrams.
+"""
+
+import math
+from typing import Iterable
+
+from search_index import normalize
+
+MAX_SUGGESTIONS = 3
+MIN_SIMILARITY = 0.8  # share of the query's trigrams a name must contain to be suggested regardless of its edit distance
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text}  "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def max_distance(text: str) -> int:
+    """The edit distance up to which a name is taken to be a typo of ``text``: 1 per 4 characters, at least 1 and at most 3."""
+    return max(1, min(3, len(text) // 4))
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """Levenshtein distance between ``a`` and ``b``; with ``limit``, any distance above it is returned as ``limit + 1``."""
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SuggestionIndex:
+    """A trigram index over ``names``; it is built on the first lookup, so an index that is never queried costs nothing."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = sorted(set(names))
+        self._normalized: list[str] = []
+        self._grams: list[set[str]] = []
+        self._postings: dict[str, list[int]] | None = None
+
+    def _build(self) -> dict[str, list[int]]:
+        postings: dict[str, list[int]] = {}
+        self._normalized = [normalize(name).strip() for name in self.names]
+        self._grams = [_trigrams(text) for text in self._normalized]
+        for name_id, grams in enumerate(self._grams):
+            for gram in grams:
+                postings.setdefault(gram, []).append(name_id)
+        self._postings = postings
+        return postings
+
+    def ranked(self, name: str) -> list[tuple[int, int, str]]:
+        """``(edit distance, shared trigrams, name)`` of every close match of ``name``, best first."""
+        postings = self._postings if self._postings is not None else self._build()
+        query = normalize(name).strip()
+        grams = _trigrams(query)
+        # Names within max_distance share `needed` trigrams; others must share MIN_SIMILARITY of them.
+        needed = max(1, min(len(grams) - 3 * max_distance(query), math.ceil(len(grams) * MIN_SIMILARITY)))
+        rare = sorted(grams, key=lambda gram: len(postings.get(gram, ())))[: len(grams) - needed + 1]
+        candidates = {name_id for gram in rare for name_id in postings.get(gram, ())}
+
+        matches = []
+        for name_id in candidates:
+            shared = len(grams & self._grams[name_id])
+            if shared < needed:
+                continue
+            if shared >= len(grams) * MIN_SIMILARITY:
+                matches.append((edit_distance(query, self._normalized[name_id]), -shared, self.names[name_id]))
+            elif (distance := edit_distance(query, self._normalized[name_id], max_distance(query))) <= max_distance(query):
+                matches.append((distance, -shared, self.names[name_id]))
+        return [(distance, -negative_shared, match) for distance, negative_shared, match in sorted(matches)]
+
+    def suggest(self, name: str, limit: int = MAX_SUGGESTIONS) -> list[str]:
+        """The names closest to ``name``, best first; empty if nothing is close."""
+        return [match for _, _, match in self.ranked(name)[:limit]]
+
+    def correction(self, name: str) -> str | None:
+        """The name ``name`` is an unambiguous typo of: the single closest match within ``max_distance``, or None."""
+        ranked = self.ranked(name)
+        if not ranked or ranked[0][0] > max_distance(normalize(name).strip()):
+            return None
+        if len(ranked) > 1 and ranked[1][0] == ranked[0][0]:
+            return None
+        return ranked[0][2]
@@ -0,0 +1,42 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from asset_bundle import ASSET_SOURCE_DIR, minify_js
+
+ASSETS = Path(__file__).resolve().parent.parent / ASSET_SOURCE_DIR
+
+
+def test_drops_indentation_blank_lines_and_comments() -> None:
+    source = "function f(a) {\n    // explain\n\n    return a + 1;  // trailing\n    /* block */\n}\n"
+
+    assert minify_js(source) == "function f(a) {\nreturn a + 1;\n}\n"
+
+
+def test_template_literal_is_kept_as_written() -> None:
+    source = "const html = `\n    <p>\n    // not a comment\n    </p>\n    ${items.map((item) => `<li>${item}</li>`).join('')}\n`;\n"
+
+    assert minify_js(source) == source
+
+
+def test_strings_regexes_and_division_survive() -> None:
+    source = "const url = 'https://example.org'; // site\nconst slash = /\\/\\/[a-z/]+/g;\nconst half = total / 2 / count;\n"
+
+    assert minify_js(source) == "const url = 'https://example.org';\nconst slash = /\\/\\/[a-z/]+/g;\nconst half = total / 2 / count;\n"
+
+
+def test_substitution_with_braces_resumes_the_template() -> None:
+    source = "const s = `a ${ {x: 1}.x } // b`;\n"
+
+    assert minify_js(source) == source
+
+
+@pytest.mark.parametrize("name", ["index.js", "recipe.js", "theme.js"])
+def test_site_scripts_still_parse(name: str) -> None:
+    minified = minify_js((ASSETS / name).read_text(encoding="utf-8"))
+    try:
+        result = subprocess.run(["node", "--check", "-"], input=minified, capture_output=True, text=True)
+    except FileNotFoundError:
+        pytest.skip("node is not installed")
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import pytest
+
+from check_data_entries import (
+    CSV_SCHEMA,
+    _is_number,
+    check_derived_macros,
+    check_derived_rows,
+    check_recipe_data,
+    check_rows,
+    fix_ingredient_typos,
+)
+from models import Ingredient, Recipe
+from suggestions import SuggestionIndex
+
+HEADER = [str(col["column"]) for col in CSV_SCHEMA]
+
+
+def row(**values: str) -> list[str]:
+    defaults = {
+        "name": "havermout",
+        "measurement_unit": "g",
+        "weight_per_unit": "",
+        "protein_per_100g": "13.5",
+        "fat_per_100g": "7",
+        "carbohydrates_per_100g": "58.7",
+        "calories_per_100g": "372",
+        "alcohol_percentage": "0",
+    }
+    return [{**defaults, **values}[column] for column in HEADER]
+
+
+@pytest.mark.parametrize("value", ["0", "12", "0.5", "372.25"])
+def test_plain_decimals_are_numbers(value: str) -> None:
+    assert _is_number(value)
+
+
+@pytest.mark.parametrize("value", ["-5", "1e3", " 5", "5 ", "1.2.3", "inf", "nan", ""])
+def test_signs_exponents_and_whitespace_are_not_numbers(value: str) -> None:
+    assert not _is_number(value)
+
+
+def test_clean_row_has_no_issues() -> None:
+    assert check_rows(HEADER, [row()], CSV_SCHEMA) == []
+
+
+def test_negative_value_is_non_numeric_and_negative() -> None:
+    assert check_rows(HEADER, [row(fat_per_100g="-5")], CSV_SCHEMA) == [
+        "Column 'fat_per_100g' contains non-numeric values.",
+        "Column 'fat_per_100g' contains negative values.",
+    ]
+
+
+def test_exponent_is_non_numeric() -> None:
+    assert check_rows(HEADER, [row(calories_per_100g="1e3")], CSV_SCHEMA) == ["Column 'calories_per_100g' contains non-numeric values."]
+
+
+KNOWN = {"gehakt", "passata", "geraspte kaas 20+", "geraspte kaas 30+"}
+RECIPE = """\
+recipe_name: 'Gehakd pasata'  # gehakd in the title stays
+description: "gehakd is tasty"
+ingredients:
+  - name: 'gehakd'  # typo
+    quantity: 250
+  - name:   "pasata"
+    quantity: 100
+  - name: geraspte kaas 40+
+    quantity: 75
+  - name: xyzzy
+    quantity: 1
+steps:
+  - "Bak de gehakd"
+"""
+
+
+def test_fix_only_rewrites_unambiguous_name_lines(tmp_path: Path) -> None:
+    path = tmp_path / "recipe.yaml"
+    path.write_text(RECIPE, encoding="utf-8")
+
+    fixed = fix_ingredient_typos([path], KNOWN, SuggestionIndex(KNOWN))
+
+    assert fixed == {path: {"gehakd": "gehakt", "pasata": "passata"}}
+    assert path.read_text(encoding="utf-8") == RECIPE.replace("name: 'gehakd'  # typo", "name: 'gehakt'  # typo").replace(
+        'name:   "pasata"', 'name:   "passata"'
+    )
+
+
+def test_fix_leaves_ambiguous_and_unmatched_names_alone(tmp_path: Path) -> None:
+    path = tmp_path / "recipe.yaml"
+    text = "recipe_name: Kaas\ningredients:\n  - name: geraspte kaas 40+  # 20+ or 30+?\n    quantity: 75\n  - name: xyzzy\n    quantity: 1\n"
+    path.write_text(text, encoding="utf-8")
+
+    assert fix_ingredient_typos([path], KNOWN, SuggestionIndex(KNOWN)) == {}
+    assert path.read_text(encoding="utf-8") == text
+
+
+def test_fix_does_not_write_a_file_it_cannot_rewrite_line_by_line(tmp_path: Path) -> None:
+    path = tmp_path / "recipe.yaml"
+    text = "recipe_name: Gehakt\ningredients:\n  - {name: gehakd, quantity: 250}\n"
+    path.write_text(text, encoding="utf-8")
+
+    assert fix_ingredient_typos([path], KNOWN, SuggestionIndex(KNOWN)) == {}
+    assert path.read_text(encoding="utf-8") == text
+
+
+GLAZE = {"recipe_name": "Glaze", "ingredients": [{"name": "honing", "quantity": 100}, {"name": "azijn", "quantity": 100}]}
+RIBS = {
+    "recipe_name": "Ribs",
+    "ingredients": [{"name": "varkensribben", "quantity": 600}, {"name": "glaze", "quantity": 50, "recipe_reference": "glaze"}],
+}
+ROWS = {
+    "honing": Ingredient("honing", "g", 0, protein=0, calories=300, fat=0, carbohydrates=80),
+    "azijn": Ingredient("azijn", "g", 0, protein=0, calories=20, fat=0, carbohydrates=0),
+    "varkensribben": Ingredient("varkensribben", "g", 0, protein=18, calories=250, fat=20, carbohydrates=0),
+}
+
+
+def test_row_may_leave_all_its_macros_to_a_component_recipe() -> None:
+    derived = row(name="glaze", protein_per_100g="", fat_per_100g="", carbohydrates_per_100g="", calories_per_100g="", alcohol_percentage="")
+    assert check_rows(HEADER, [derived], CSV_SCHEMA) == []
+    assert check_rows(HEADER, [row(protein_per_100g="")], CSV_SCHEMA) == ["Line 2: missing value for 'protein_per_100g' (ingredient 'havermout')"]
+
+
+def test_component_recipe_lines_need_no_csv_row() -> None:
+    assert check_recipe_data("ribs.yaml", RIBS, set(ROWS)) == []
+    unreferenced = {"recipe_name": "Ribs", "ingredients": [{"name": "glaze", "quantity": 50}]}
+    assert check_recipe_data("ribs.yaml", unreferenced, set(ROWS)) == ["ribs.yaml: ingredient 'glaze' not found in ingredients.csv"]
+
+
+def test_rows_without_macros_are_only_used_through_a_reference() -> None:
+    recipes = {
+        Path("ribs.yaml"): Recipe.from_yaml(RIBS),
+        Path("saus.yaml"): Recipe.from_yaml({"recipe_name": "Saus", "ingredients": [{"name": "glaze"}]}),
+    }
+
+    assert check_derived_rows(recipes, {"glaze"}) == [
+        "saus.yaml: ingredient 'glaze' has no macros in ingredients.csv; fill them in or add a recipe_reference"
+    ]
+
+
+def test_warns_when_a_rows_macros_disagree_with_its_component_recipe() -> None:
+    recipes = {Path("glaze.yaml"): Recipe.from_yaml(GLAZE), Path("ribs.yaml"): Recipe.from_yaml(RIBS)}
+    # The glaze works out to 160 kcal and 40 g carbohydrates per 100 g.
+    close = Ingredient("glaze", "g", 0, protein=0, calories=158, fat=0, carbohydrates=40.5)
+    stale = Ingredient("glaze", "g", 0, protein=0, calories=270, fat=0, carbohydrates=66)
+
+    assert check_derived_macros(recipes, {**ROWS, "glaze": close}, set()) == []
+    assert check_derived_macros(recipes, ROWS, set()) == []
+    assert check_derived_macros(recipes, {**ROWS, "glaze": stale}, {"glaze"}) == []
+    assert check_derived_macros(recipes, {**ROWS, "glaze": stale}, set()) == [
+        "Warning: ingredient 'glaze' in ingredients.csv has 270 kcal, 0 g protein, 0 g fat, 66 g carbohydrates per 100 g, but recipe 'glaze' "
+        "works out to 160 kcal, 0 g protein, 0 g fat, 40 g carbohydrates; leave its macro columns empty to use the computed values"
+    ]
@@ -0,0 +1,136 @@
+import gzip
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("azure.storage.blob")
+
+from azure.core.exceptions import ResourceNotFoundError  # noqa: E402
+
+from deploy import IMMUTABLE, REVALIDATE, deploy, manifest_blob, plan_deploy, site_blobs  # noqa: E402
+
+
+class FakeContainer:
+    """The parts of ``azure.storage.blob.ContainerClient`` deploy.py uses, kept in a dict."""
+
+    def __init__(self, name: str, blobs: dict[str, bytes] | None = None) -> None:
+        self.container_name = name
+        self.blobs = dict(blobs or {})
+        self.settings: dict[str, Any] = {}
+        self.uploads: list[str] = []
+        self.deletes: list[str] = []
+
+    def list_blobs(self) -> list[SimpleNamespace]:
+        return [SimpleNamespace(name=name) for name in sorted(self.blobs)]
+
+    def download_blob(self, name: str) -> SimpleNamespace:
+        if name not in self.blobs:
+            raise ResourceNotFoundError(f"{name} not found")
+        return SimpleNamespace(readall=lambda: self.blobs[name])
+
+    def upload_blob(self, name: str, data: bytes, overwrite: bool = False, content_settings: Any = None) -> None:
+        self.blobs[name] = data
+        self.settings[name] = content_settings
+        self.uploads.append(name)
+
+    def delete_blob(self, name: str) -> None:
+        if name not in self.blobs:
+            raise ResourceNotFoundError(f"{name} not found")
+        del self.blobs[name]
+        self.deletes.append(name)
+
+
+def fake_container(name: str, blobs: dict[str, bytes] | None = None) -> Any:
+    """A ``FakeContainer``, typed to stand in for a ``ContainerClient``."""
+    return FakeContainer(name, blobs)
+
+
+@pytest.fixture
+def site(tmp_path: Path) -> Path:
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "recipe.0123abcd.js").write_text("let servings = 1;")
+    (tmp_path / "index.html").write_text("<h1>NomStats</h1>")
+    (tmp_path / "index.html.gz").write_bytes(gzip.compress(b"<h1>NomStats</h1>"))
+    (tmp_path / "chili.html").write_text("<h1>Chili</h1>")
+    return tmp_path
+
+
+def test_site_blobs_use_the_gzip_sibling_and_cache_fingerprinted_assets(site: Path) -> None:
+    blobs = site_blobs(str(site))
+
+    assert sorted(blobs) == ["assets/recipe.0123abcd.js", "chili.html", "index.html"]
+    assert blobs["index.html"].path == str(site / "index.html.gz")
+    assert blobs["index.html"].content_encoding == "gzip"
+    assert blobs["chili.html"].content_encoding is None
+    assert blobs["assets/recipe.0123abcd.js"].cache_control == IMMUTABLE
+    assert blobs["index.html"].cache_control == REVALIDATE
+
+
+def test_plan_uploads_changed_files_before_pages_and_deletes_removed_blobs(site: Path) -> None:
+    local = site_blobs(str(site))
+    deployed = {"index.html": local["index.html"].key, "chili.html": "stale", "old.html": "gone"}
+
+    files, pages, deletes = plan_deploy(local, deployed)
+
+    assert [blob.name for blob in files] == ["assets/recipe.0123abcd.js"]
+    assert [blob.name for blob in pages] == ["chili.html"]
+    assert deletes == ["old.html"]
+
+
+def test_first_deploy_uploads_everything_and_keeps_the_manifest_private(site: Path) -> None:
+    web = fake_container("$web", {"leftover.html": b"", ".deploy/manifest.json": b"{}"})
+    private = fake_container("nomstats-deploy")
+
+    uploaded, uploaded_bytes, deleted, unchanged = deploy(web, private, site_blobs(str(site)), workers=2)
+
+    assert (uploaded, deleted, unchanged) == (3, 2, 0)
+    assert uploaded_bytes == sum(len(web.blobs[name]) for name in web.uploads)
+    assert sorted(web.blobs) == ["assets/recipe.0123abcd.js", "chili.html", "index.html"]
+    assert web.settings["index.html"].content_encoding == "gzip"
+    assert list(private.blobs) == [manifest_blob(web)]
+    manifest = json.loads(private.blobs[manifest_blob(web)])
+    assert sorted(manifest["blobs"]) == sorted(web.blobs)
+
+
+def test_redeploy_only_touches_what_changed(site: Path) -> None:
+    web, private = fake_container("$web"), fake_container("nomstats-deploy")
+    deploy(web, private, site_blobs(str(site)), workers=2)
+    web.uploads.clear()
+
+    (site / "chili.html").write_text("<h1>Chili sin carne</h1>")
+    (site / "assets" / "recipe.0123abcd.js").unlink()
+    uploaded, _, deleted, unchanged = deploy(web, private, site_blobs(str(site)), workers=2)
+
+    assert (uploaded, deleted, unchanged) == (1, 1, 1)
+    assert web.uploads == ["chili.html"]
+    assert web.deletes == ["assets/recipe.0123abcd.js"]
+    assert web.blobs["chili.html"] == b"<h1>Chili sin carne</h1>"
+    assert sorted(json.loads(private.blobs[manifest_blob(web)])["blobs"]) == ["chili.html", "index.html"]
+
+
+def test_dry_run_changes_nothing(site: Path) -> None:
+    web, private = fake_container("$web", {"leftover.html": b""}), fake_container("nomstats-deploy")
+
+    uploaded, _, deleted, _ = deploy(web, private, site_blobs(str(site)), dry_run=True)
+
+    assert (uploaded, deleted) == (3, 1)
+    assert web.blobs == {"leftover.html": b""}
+    assert private.blobs == {}
+
+
+def test_key_covers_the_uploaded_gzip_body(site: Path) -> None:
+    before = site_blobs(str(site))["index.html"].key
+
+    (site / "index.html.gz").write_bytes(gzip.compress(b"<h1>NomStats</h1>", compresslevel=1))
+
+    assert site_blobs(str(site))["index.html"].key != before
+
+
+def test_key_depends_only_on_the_bytes_and_headers(site: Path, tmp_path_factory: pytest.TempPathFactory) -> None:
+    copy = tmp_path_factory.mktemp("copy")
+    (copy / "chili.html").write_bytes((site / "chili.html").read_bytes())
+
+    assert site_blobs(str(copy))["chili.html"].key == site_blobs(str(site))["chili.html"].key
@@ -0,0 +1,113 @@
+import random
+
+from generate_static_website import (
+    INGREDIENTS_FILE,
+    _build_display_components,
+    _ingredient_page_rows,
+    _reference_key,
+    build_nutrient_table,
+    calculate_nutrition,
+    calculate_nutrition_batch,
+    derived_ingredients,
+    extend_nutrient_table,
+    load_ingredients_csv,
+)
+from models import Ingredient, Recipe, RecipeIngredient
+
+INGREDIENTS = {
+    "kip": Ingredient("kip", "g", 0, protein=24, calories=103, fat=1.8, carbohydrates=0),
+    "ui": Ingredient("ui", "stuks", 100, protein=1.3, calories=37, fat=0.2, carbohydrates=6.3),
+    "rum": Ingredient("rum", "ml", 0, protein=0, calories=231, fat=0, carbohydrates=0, alcohol_percentage=40),
+}
+
+
+def test_batch_matches_the_loop_on_a_synthetic_catalogue() -> None:
+    all_ingredients = load_ingredients_csv(INGREDIENTS_FILE)
+    names = list(all_ingredients)
+    rng = random.Random(0)
+    lists = [
+        [RecipeIngredient(name, rng.choice([rng.randint(1, 500), round(rng.uniform(0.5, 4), 1)])) for name in rng.sample(names, rng.randint(1, 15))]
+        for _ in range(500)
+    ]
+
+    expected = [calculate_nutrition(ingredient_list, all_ingredients) for ingredient_list in lists]
+    actual = calculate_nutrition_batch(lists, build_nutrient_table(all_ingredients))
+
+    assert repr(actual) == repr(expected)  # also tells int 0 from 0.0
+
+
+def test_unknown_ingredients_and_empty_lists() -> None:
+    lists = [[], [RecipeIngredient("onbekend", 100)], [RecipeIngredient("onbekend", 100), RecipeIngredient("ui", 1.5)], [RecipeIngredient("rum", 40)]]
+
+    actual = calculate_nutrition_batch(lists, build_nutrient_table(INGREDIENTS))
+
+    assert repr(actual) == repr([calculate_nutrition(ingredient_list, INGREDIENTS) for ingredient_list in lists])
+    assert actual[0] == (0, 0, 0, 0, 0, 0, 0, 0, 0)
+    assert calculate_nutrition_batch([], build_nutrient_table(INGREDIENTS)) == []
+
+
+def test_extended_table_equals_a_rebuilt_one() -> None:
+    table = build_nutrient_table({name: INGREDIENTS[name] for name in ("kip", "ui")})
+    derived = Ingredient("saus <saus>", "g", 0, protein=2, calories=80, fat=5, carbohydrates=7)
+    extended = extend_nutrient_table(table, {"rum": INGREDIENTS["rum"], "saus <saus>": derived})
+    rebuilt = build_nutrient_table({**INGREDIENTS, "saus <saus>": derived})
+
+    assert extended.positions == rebuilt.positions
+    assert extended.macros.tolist() == rebuilt.macros.tolist()
+    assert extended.weight_per_unit.tolist() == rebuilt.weight_per_unit.tolist()
+    assert extended.alcohol_percentage.tolist() == rebuilt.alcohol_percentage.tolist()
+    assert extend_nutrient_table(extended, {"kip": INGREDIENTS["kip"]}) is extended
+
+
+SAUS = Recipe.from_yaml({"recipe_name": "Saus", "ingredients": [{"name": "ui", "quantity": 1}, {"name": "rum", "quantity": 100}]})
+KIP = Recipe.from_yaml(
+    {
+        "recipe_name": "Kip",
+        "ingredients": [
+            {"name": "kip", "quantity": 300},
+            {"name": "saus", "quantity": 50, "recipe_reference": "saus"},
+            {"name": "ui", "quantity": 1, "recipe_reference": "saus"},
+        ],
+    }
+)
+
+
+def test_derived_rows_keep_the_csv_unit_or_fall_back_to_grams() -> None:
+    derived = derived_ingredients({"saus": SAUS, "kip": KIP}, INGREDIENTS)
+
+    assert sorted(derived) == [("saus", "saus"), ("ui", "saus")]
+    # 200 g of sauce: 1 g protein, 268 kcal, 0 g fat and 6 g carbohydrates, 20% alcohol.
+    saus = derived[("saus", "saus")]
+    assert (saus.name, saus.measurement_unit, saus.weight_per_unit) == ("saus <saus>", "g", 0)
+    assert (saus.macros, saus.alcohol_percentage) == ((0.5, 134, 0.0, 3.0), 20.0)
+    ui = derived[("ui", "saus")]
+    assert (ui.measurement_unit, ui.weight_per_unit, ui.macros) == ("stuks", 100, saus.macros)
+
+
+def test_component_lines_without_a_csv_row_are_shown_with_the_derived_row() -> None:
+    derived = derived_ingredients({"saus": SAUS, "kip": KIP}, INGREDIENTS)
+    ingredients = {**INGREDIENTS, **{row.name: row for row in derived.values()}}
+
+    [component] = _build_display_components(KIP.components, ingredients)
+
+    assert [(line["name"], line["unit"], line["recipe_reference"]) for line in component["ingredients"]] == [
+        ("kip", "g", None),
+        ("saus", "g", "saus"),
+        ("ui", "stuks", "saus"),
+    ]
+
+
+def test_ingredient_pages_show_the_derived_row_of_a_component_recipe() -> None:
+    derived = {
+        _reference_key(name, reference): row for (name, reference), row in derived_ingredients({"saus": SAUS, "kip": KIP}, INGREDIENTS).items()
+    }
+    hashes = {name: name for name in INGREDIENTS}
+
+    pages = {row.name: (row, reference, row_hash) for row, reference, row_hash in _ingredient_page_rows(INGREDIENTS, hashes, derived)}
+
+    assert list(pages) == ["kip", "ui", "rum", "saus"]
+    assert pages["kip"] == (INGREDIENTS["kip"], None, "kip")
+    for name in ("ui", "saus"):
+        row, reference, row_hash = pages[name]
+        assert (row.macros, reference) == (derived[_reference_key(name, "saus")].macros, "saus")
+        assert row_hash != hashes.get(name)
@@ -0,0 +1,173 @@
+import itertools
+import random
+from typing import Any
+
+import numpy as np
+import pytest
+
+from recipe_query import COMPARISONS, TOTAL_COLUMNS, TOTALS_PRECISION, RecipeTable, parse_filter, plan_meals
+
+
+def random_table(rng: random.Random, n_recipes: int) -> RecipeTable:
+    rows: list[dict[str, Any]] = []
+    for recipe in range(n_recipes):
+        for variant in [None] if rng.random() < 0.6 else ["lean", "bulk"]:
+            rows.append(
+                {
+                    "filename": f"recipe_{recipe}.html",
+                    "name": f"Recipe {recipe}",
+                    "variant": variant,
+                    "category": rng.choice(["pasta", "curry"]),
+                    "dietary_labels": rng.sample(["vegetarian", "non_alcoholic"], rng.randint(0, 2)),
+                    "calories": rng.randint(200, 900),
+                    "protein": rng.randint(5, 60),
+                    "fat": rng.randint(0, 40),
+                    "carbs": rng.randint(0, 120),
+                    "calories_100g": 150,
+                    "protein_100g": 10,
+                    "fat_100g": 5,
+                    "carbs_100g": 20,
+                    "spice_level": rng.randint(0, 3),
+                    "preparation_time": rng.choice([None, 20, 45]),
+                    "rating": rng.randint(1, 5),
+                }
+            )
+    return RecipeTable(rows)
+
+
+def brute_force(
+    table: RecipeTable, totals: list[str], meals: int, objective: str, minimize: bool, servings: tuple[float, ...], distinct: bool
+) -> list[float]:
+    """The objective of every feasible plan, best first, by trying every combination of candidates."""
+    candidates = [(row, amount) for amount in servings for row in range(len(table))]
+    constraints = [parse_filter(term) for term in totals]
+    scores = []
+    for plan in itertools.combinations(candidates, meals):
+        if distinct and len({int(table.recipe_id[row]) for row, _ in plan}) < meals:
+            continue
+        plan_totals = {
+            column: round(sum(float(table.columns[column][row]) * amount for row, amount in plan), TOTALS_PRECISION) for column in TOTAL_COLUMNS
+        }
+        if all(COMPARISONS[op](plan_totals[column], bound) for column, op, bound in constraints):
+            scores.append(plan_totals[objective])
+    return sorted(scores, reverse=not minimize)
+
+
+def check_plans(table: RecipeTable, plans: list[Any], totals: list[str], meals: int, servings: tuple[float, ...], distinct: bool) -> None:
+    seen = set()
+    for plan in plans:
+        assert len(plan.meals) == meals
+        assert all(amount in servings for _, amount in plan.meals)
+        if distinct:
+            assert len({int(table.recipe_id[row]) for row, _ in plan.meals}) == meals
+        for column, op, bound in map(parse_filter, totals):
+            assert COMPARISONS[op](plan.totals[column], bound)
+        key = frozenset(plan.meals)
+        assert key not in seen
+        seen.add(key)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_exhaustive_search_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    table = random_table(rng, rng.randint(2, 7))
+    meals = rng.randint(1, 3)
+    servings = rng.choice([(1.0,), (0.5, 1.0), (1.0, 1.5)])
+    distinct = rng.random() < 0.7
+    minimize = rng.random() < 0.3
+    objective = rng.choice(TOTAL_COLUMNS)
+    totals = [f"calories<={rng.randint(400, 2500) * meals // 3}", f"protein>={rng.randint(0, 90) * meals // 3}"]
+    totals = rng.sample(totals, rng.randint(0, 2))
+    limit = rng.randint(1, 4)
+
+    plans = plan_meals(table, totals, meals, objective=objective, minimize=minimize, servings=servings, distinct=distinct, limit=limit, gap=0)
+
+    expected = brute_force(table, totals, meals, objective, minimize, servings, distinct)
+    assert [plan.totals[objective] for plan in plans] == pytest.approx(expected[:limit])
+    check_plans(table, plans, totals, meals, servings, distinct)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_gap_bounds_how_far_the_plan_is_from_the_best(seed: int) -> None:
+    rng = random.Random(1000 + seed)
+    table = random_table(rng, 8)
+    totals = ["calories<=1800", "protein>=60"]
+
+    plans = plan_meals(table, totals, meals=3, objective="protein", gap=0.05)
+
+    expected = brute_force(table, totals, 3, "protein", False, (1,), True)
+    if not expected:
+        assert plans == []
+        return
+    assert plans[0].totals["protein"] >= (1 - 0.05) * expected[0] - 1e-9
+    check_plans(table, plans, totals, 3, (1,), True)
+
+
+def test_filters_labels_and_category_limit_the_candidates() -> None:
+    table = random_table(random.Random(7), 7)
+    filters, labels, category = ["spice_level<=2"], ["vegetarian"], "pasta"
+    allowed = set(np.flatnonzero(table.mask(filters, labels, category)).tolist())
+
+    plans = plan_meals(table, [], meals=2, filters=filters, labels=labels, category=category, limit=5, gap=0)
+
+    assert all(row in allowed for plan in plans for row, _ in plan.meals)
+
+
+@pytest.mark.parametrize(
+    "totals",
+    [
+        ["protein>=100000"],
+        ["calories<=10"],
+        ["calories<=500", "calories>=600"],
+    ],
+)
+def test_infeasible_targets_give_no_plans(totals: list[str]) -> None:
+    assert plan_meals(random_table(random.Random(3), 6), totals, meals=2, gap=0) == []
+
+
+def test_empty_catalogue_and_too_few_candidates_give_no_plans() -> None:
+    assert plan_meals(RecipeTable([]), ["calories<=2000"], meals=3) == []
+    table = random_table(random.Random(4), 2)
+    assert plan_meals(table, [], meals=3) == []
+    assert plan_meals(table, [], meals=2, labels=["no such label"]) == []
+
+
+def test_ties_give_distinct_plans_in_a_stable_order() -> None:
+    rows: list[dict[str, Any]] = [
+        {
+            "filename": f"recipe_{i}.html",
+            "name": f"Recipe {i}",
+            "variant": None,
+            "category": "pasta",
+            "dietary_labels": [],
+            "calories": 500,
+            "protein": 30,
+            "fat": 10,
+            "carbs": 50,
+            "calories_100g": 150,
+            "protein_100g": 10,
+            "fat_100g": 5,
+            "carbs_100g": 20,
+            "spice_level": 1,
+            "preparation_time": 30,
+            "rating": 4,
+        }
+        for i in range(5)
+    ]
+    table = RecipeTable(rows)
+
+    plans = plan_meals(table, ["calories<=1500"], meals=3, limit=4, gap=0)
+
+    assert [plan.totals["protein"] for plan in plans] == [90, 90, 90, 90]
+    check_plans(table, plans, ["calories<=1500"], 3, (1,), True)
+    assert plans == plan_meals(table, ["calories<=1500"], meals=3, limit=4, gap=0)
+
+
+def test_rejects_plans_over_non_total_columns_and_no_meals() -> None:
+    table = random_table(random.Random(5), 3)
+    with pytest.raises(ValueError):
+        plan_meals(table, ["protein_100g>=10"])
+    with pytest.raises(ValueError):
+        plan_meals(table, [], objective="rating")
+    with pytest.raises(ValueError):
+        plan_meals(table, [], meals=0)
@@ -0,0 +1,45 @@
+"""
+Run the pre-commit data checks and the site build in one process.
+
+Both share a single ``Catalogue``, so ingredients.csv and the recipe tree are read and parsed once
+instead of once per script. The build only runs when every check passes.
+
+Usage: python validate_and_build.py [--force] [--jobs N] [--ingredient-store [FILE]]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from catalogue import Catalogue
+from check_data_entries import INGREDIENTS_CSV, RECIPES_DIR, run_checks
+from generate_static_website import DEFAULT_TARGET, TARGETS, generate_static_pages
+from ingredient_store import STORE_FILE
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Validate the configuration and generate the NomStats static site.")
+    parser.add_argument("--force", action="store_true", help="ignore the build manifest and rebuild every page")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N", help="load and render recipes in N worker processes (default: 1)")
+    parser.add_argument(
+        "--ingredient-store",
+        nargs="?",
+        const=str(STORE_FILE),
+        metavar="FILE",
+        help=f"read ingredients from an SQLite ingredient store kept in sync with ingredients.csv (default: {STORE_FILE})",
+    )
+    parser.add_argument(
+        "--target", action="append", choices=list(TARGETS), help=f"flavour of the site to write, repeat for several (default: {DEFAULT_TARGET})"
+    )
+    args = parser.parse_args()
+
+    catalogue = Catalogue(RECIPES_DIR, INGREDIENTS_CSV, store_file=Path(args.ingredient_store) if args.ingredient_store else None)
+    exit_code = run_checks(catalogue)
+    if exit_code:
+        return exit_code
+    generate_static_pages(force=args.force, jobs=args.jobs, catalogue=catalogue, targets=args.target or [DEFAULT_TARGET])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())